@@ -18,9 +18,13 @@ os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 import torch
 import numpy as np
 from PIL import Image, ImageFilter
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, List
 import math
 
+from .radiance_ops import (counter_normal, counter_uniform, gaussian_blur, cached_grid,
+                           linspace_grid, pixel_centre_axes, transformed_sampling_grid,
+                           fft_convolve, STREAM_NOISE, STREAM_SHAKE)
+
 
 # =============================================================================
 # GPU UTILITY FUNCTIONS
@@ -35,46 +39,161 @@ def get_device(use_gpu: bool = True) -> torch.device:
 
 def gpu_gaussian_blur(tensor: torch.Tensor, sigma: float, 
                       kernel_size: int = None) -> torch.Tensor:
-    """GPU-accelerated Gaussian blur."""
-    if sigma < 0.1:
-        return tensor
-    
-    if kernel_size is None:
-        kernel_size = int(sigma * 6) | 1
-        kernel_size = max(3, min(kernel_size, 31))
-    
-    device = tensor.device
-    dtype = tensor.dtype
-    
-    x = torch.arange(kernel_size, device=device, dtype=dtype) - kernel_size // 2
-    kernel_1d = torch.exp(-x ** 2 / (2 * sigma ** 2))
-    kernel_1d = kernel_1d / kernel_1d.sum()
-    
-    kernel_h = kernel_1d.view(1, 1, 1, kernel_size)
-    kernel_v = kernel_1d.view(1, 1, kernel_size, 1)
-    
-    was_bhwc = tensor.dim() == 4 and tensor.shape[-1] in [1, 3, 4]
-    if was_bhwc:
-        tensor = tensor.permute(0, 3, 1, 2)
-    
-    b, c, h, w = tensor.shape
-    
-    kernel_h = kernel_h.expand(c, 1, 1, kernel_size)
-    kernel_v = kernel_v.expand(c, 1, kernel_size, 1)
-    
-    pad_h = kernel_size // 2
-    pad_v = kernel_size // 2
-    
-    tensor_padded = torch.nn.functional.pad(tensor, (pad_h, pad_h, 0, 0), mode='reflect')
-    blurred = torch.nn.functional.conv2d(tensor_padded, kernel_h, groups=c)
-    
-    blurred_padded = torch.nn.functional.pad(blurred, (0, 0, pad_v, pad_v), mode='reflect')
-    blurred = torch.nn.functional.conv2d(blurred_padded, kernel_v, groups=c)
-    
-    if was_bhwc:
-        blurred = blurred.permute(0, 2, 3, 1)
-    
-    return blurred
+    """GPU-accelerated Gaussian blur of any radius (see radiance_ops.gaussian_blur)."""
+    return gaussian_blur(tensor, sigma, kernel_size=kernel_size)
+
+
+def radial_distance_map(h: int, w: int, device: torch.device,
+                        dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """Cached (H, W) distance from the frame centre on the linspace(-1, 1) grid."""
+    def build():
+        yy, xx = linspace_grid(h, w, device, dtype)
+        return torch.sqrt(xx ** 2 + yy ** 2)
+    return cached_grid("radial_distance", h, w, device, dtype, (), build)
+
+
+# =============================================================================
+# WARP COMPOSITION
+# =============================================================================
+# Geometric effects are written as coordinate maps (output -> source, in
+# grid_sample's normalised pixel-centre space) and chained analytically, so a
+# stack of warps costs a single grid_sample instead of one per effect and the
+# image is only interpolated once. Edge handling between stages is done on
+# the coordinates (clamping or mirroring them); the first effect's padding
+# is left to grid_sample itself.
+#
+# Coordinates are carried as separate x and y fields of shape (B, G, H, W):
+# B is 1 until a per-frame stage (camera shake) runs, G is 1 until a
+# per-channel stage (chromatic aberration) splits the channels.
+
+# Frames per composed grid_sample are limited so the sampling fields stay
+# under this budget; on CPU smaller chunks stay in cache
+WARP_FIELD_CHUNK_MB = 1024
+WARP_FIELD_CPU_CHUNK_MB = 64
+
+
+def pixel_centre_coords(h: int, w: int, device: torch.device,
+                        dtype: torch.dtype = torch.float32) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Identity x and y fields, broadcastable views of shape (1, 1, H, W)."""
+    ys, xs = pixel_centre_axes(h, w, device, dtype)
+    return xs.view(1, 1, 1, w).expand(1, 1, h, w), ys.view(1, 1, h, 1).expand(1, 1, h, w)
+
+
+def border_warp_coords(x: torch.Tensor, y: torch.Tensor,
+                       h: int, w: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """grid_sample padding_mode='border' expressed on the coordinates."""
+    return x.clamp_(-1 + 1 / w, 1 - 1 / w), y.clamp_(-1 + 1 / h, 1 - 1 / h)
+
+
+def reflect_warp_coords(x: torch.Tensor, y: torch.Tensor,
+                        h: int, w: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """grid_sample padding_mode='reflection' expressed on the coordinates."""
+    def fold(v):
+        # Triangle wave with period 4: mirrors about -1 and 1 repeatedly
+        return torch.remainder(v + 1, 4).sub_(2).abs_().neg_().add_(1)
+    return border_warp_coords(fold(x), fold(y), h, w)
+
+
+def radial_distortion_warp(k1: float, k2: float = 0.0, padding: str = "reflection"):
+    """Stage: polynomial lens distortion, source = p * (1 + k1 r^2 + k2 r^4)."""
+    def stage(x, y, frames):
+        r2 = x * x + y * y
+        factor = (r2 * k2 + k1).mul_(r2).add_(1)
+        return x * factor, y * factor
+    return ("warp", stage, padding)
+
+
+def channel_scale_warp(scales: Tuple[float, ...], padding: str = "border"):
+    """Stage: per-channel radial scale (chromatic aberration), splits G to len(scales)."""
+    def stage(x, y, frames):
+        factors = torch.tensor(scales, device=x.device, dtype=x.dtype).view(1, -1, 1, 1)
+        return x * factors, y * factors
+    return ("warp", stage, padding)
+
+
+def row_shift_warp(skew: float, wobble: float, w: int, padding: str = "border"):
+    """Stage: rolling shutter, each row shifted horizontally by skew and wobble pixels."""
+    def stage(x, y, frames):
+        shift = y * (skew / w)
+        if wobble > 0:
+            shift += torch.sin(y * (8 * math.pi)).mul_(wobble / w)
+        return x + shift, y.clone()
+    return ("warp", stage, padding)
+
+
+def affine_warp(thetas: torch.Tensor, padding: str = "border"):
+    """Stage: per-frame affine map, ``thetas`` (B, 2, 3) as for affine_grid."""
+    def stage(x, y, frames):
+        theta = thetas[frames].to(device=x.device, dtype=x.dtype).view(-1, 6, 1, 1, 1)
+        new_x = x * theta[:, 0] + y * theta[:, 1] + theta[:, 2]
+        new_y = x * theta[:, 3] + y * theta[:, 4] + theta[:, 5]
+        return new_x, new_y
+    return ("warp", stage, padding)
+
+
+def gain_stage(mask_func):
+    """Stage: multiplicative mask ``mask_func(x, y)``, e.g. a vignette."""
+    return ("gain", mask_func, None)
+
+
+def compose_warp_field(stages: List, h: int, w: int, device: torch.device,
+                       dtype: torch.dtype = torch.float32,
+                       frames: slice = slice(None)) -> Tuple[torch.Tensor, Optional[torch.Tensor], str]:
+    """
+    Chain ``stages`` (in the order the effects apply to the image) into one
+    sampling grid for ``frames``. Gain stages are evaluated at the
+    coordinates their position in the chain sees, after the border or
+    reflection of the warp that follows them. Returns (grid, gain,
+    padding): grid (B, G, H, W, 2), gain (B, G, H, W) or None, and the
+    grid_sample padding mode of the first warp.
+    """
+    x, y = pixel_centre_coords(h, w, device, dtype)
+    gain = None
+    padding = None
+    # Padding of the warp just applied, not yet folded into the coordinates
+    pending = None
+    for kind, fn, stage_padding in reversed(stages):
+        if pending == "reflection":
+            x, y = reflect_warp_coords(x, y, h, w)
+        elif pending is not None:
+            x, y = border_warp_coords(x, y, h, w)
+        pending = None
+        if kind == "gain":
+            mask = fn(x, y)
+            gain = mask if gain is None else gain * mask
+            continue
+        x, y = fn(x, y, frames)
+        padding = pending = stage_padding
+    x, y = torch.broadcast_tensors(x, y)
+    return torch.stack([x, y], dim=-1), gain, padding or "border"
+
+
+def apply_composed_warp(img: torch.Tensor, stages: List) -> torch.Tensor:
+    """Resample a BHWC batch once through the composed ``stages``."""
+    if not stages:
+        return img
+    b, h, w, c = img.shape
+    budget_mb = WARP_FIELD_CHUNK_MB if img.is_cuda else WARP_FIELD_CPU_CHUNK_MB
+    chunk = max(1, int(budget_mb * 1024 * 1024 // (c * h * w * 2 * img.element_size())))
+    
+    output = torch.empty_like(img)
+    for start in range(0, b, chunk):
+        end = min(start + chunk, b)
+        n = end - start
+        coords, gain, padding = compose_warp_field(stages, h, w, img.device, img.dtype,
+                                                   slice(start, end))
+        groups = coords.shape[1]
+        grid = coords.expand(n, -1, -1, -1, -1).reshape(n * groups, h, w, 2)
+        source = img[start:end].permute(0, 3, 1, 2)
+        if groups > 1:
+            source = source.reshape(n * c, 1, h, w)
+        sampled = torch.nn.functional.grid_sample(source, grid, mode='bilinear',
+                                                  padding_mode=padding, align_corners=False)
+        sampled = sampled.reshape(n, c, h, w).permute(0, 2, 3, 1)
+        if gain is not None:
+            sampled = sampled * gain.permute(0, 2, 3, 1)
+        output[start:end] = sampled
+    return output
 
 
 # =============================================================================
@@ -247,6 +366,202 @@ class FXTDWhiteBalance:
                                            source_temperature, intensity, False)
 
 
+# =============================================================================
+# DEPTH OF FIELD ENGINES
+# =============================================================================
+# Variable-radius blur gathers from a Gaussian pyramid: level k holds the
+# frame blurred to sigma 2^k at 1/2^k resolution, so building it costs about
+# a third of a full-resolution pass whatever the largest circle of confusion.
+# Each pixel picks a fractional level from its own sigma and blends the two
+# neighbouring levels so the mix has the requested variance. The blend is
+# folded coarse to fine, each step at its own level's resolution, which keeps
+# the lookup cost flat as well.
+#
+# Bokeh rendering splits the frame into layers by signed circle of confusion
+# (negative in front of the focal plane, positive behind), convolves each
+# premultiplied layer and its coverage with the aperture shape via FFT, and
+# composites the layers back to front. Large apertures are convolved on a
+# 2^k reduced copy that still spans BOKEH_MIN_LEVEL_RADIUS pixels, so the
+# transforms stay small at 4K; kernel spectra are cached per shape, radius
+# and grid size.
+
+# FXTDDepthOfField keeps the original "levels" blend as its default so saved
+# graphs render as before; the other engines are opt-in.
+DOF_ENGINES = ["mip pyramid", "bokeh", "levels"]
+
+# The pyramid stops reducing once a level's short side would drop below this
+DOF_PYRAMID_MIN_SIZE = 16
+
+# A disc of radius 2 sigma has the same variance as a Gaussian of sigma
+BOKEH_RADIUS_PER_SIGMA = 2.0
+
+# Layers are at least this many pixels of CoC apart, and never more than
+# BOKEH_MAX_LAYERS across the frame's CoC range
+BOKEH_LAYER_STEP = 4.0
+BOKEH_MAX_LAYERS = 16
+
+# Smallest aperture radius, in level pixels, a layer is reduced to
+BOKEH_MIN_LEVEL_RADIUS = 8.0
+
+APERTURE_POLYGON_SIDES = {"Hexagon": 6, "Octagon": 8}
+
+# Width-to-height ratio of anamorphic (oval) bokeh
+ANAMORPHIC_SQUEEZE = 1.6
+
+
+def _pyramid_reduce(x: torch.Tensor) -> torch.Tensor:
+    """2x area reduction of a BCHW tensor, replicating an odd last row/column."""
+    pad = (0, x.shape[-1] % 2, 0, x.shape[-2] % 2)
+    if any(pad):
+        x = torch.nn.functional.pad(x, pad, mode='replicate')
+    return torch.nn.functional.avg_pool2d(x, 2)
+
+
+def _pyramid_expand(x: torch.Tensor, h: int, w: int) -> torch.Tensor:
+    """Bilinear 2x enlargement of a reduced level onto the h x w level above."""
+    up = torch.nn.functional.interpolate(x, scale_factor=2, mode='bilinear', align_corners=False)
+    return up[..., :h, :w]
+
+
+def _expand_variance(pitch: int) -> float:
+    """Variance (full-res px^2) the chain of 2x bilinear expands adds to a level."""
+    return 0.25 * (pitch ** 2 - 1)
+
+
+def variable_gaussian_blur(img: torch.Tensor, sigma_map: torch.Tensor) -> torch.Tensor:
+    """
+    Blur a BCHW tensor by a per-pixel sigma in pixels, given as (B, 1, H, W)
+    or broadcastable to it. Pixels with sigma 0 are returned unchanged.
+    """
+    max_sigma = float(sigma_map.max())
+    if max_sigma < 0.1:
+        return img
+    
+    # Level k: image, per-pixel variance, pixel pitch, sigma once expanded
+    levels = [img]
+    variances = [sigma_map.square().expand(img.shape[0], 1, -1, -1)]
+    pitches = [1]
+    sigmas = [0.0]
+    while sigmas[-1] < max_sigma:
+        x, pitch = levels[-1], pitches[-1]
+        if min(x.shape[-2:]) >= 2 * DOF_PYRAMID_MIN_SIZE:
+            next_pitch, next_sigma = 2 * pitch, 2.0 * pitch
+            variance = _pyramid_reduce(variances[-1])
+        else:
+            # Too small to reduce again: the last level is blurred in place
+            next_pitch, next_sigma = pitch, max_sigma
+            variance = variances[-1]
+        # Blur at this level that, with the box reduction, reaches the next
+        # level's stored variance (which leaves room for the expands)
+        stored = next_sigma ** 2 - _expand_variance(next_pitch)
+        current = sigmas[-1] ** 2 - _expand_variance(pitch)
+        box = 0.25 if next_pitch != pitch else 0.0
+        pre = math.sqrt(max((stored - current) / pitch ** 2 - box, 0.0))
+        x = gaussian_blur(x.movedim(1, -1), pre).movedim(-1, 1)
+        if next_pitch != pitch:
+            x = _pyramid_reduce(x)
+        levels.append(x)
+        variances.append(variance)
+        pitches.append(next_pitch)
+        sigmas.append(next_sigma)
+    
+    out = levels[-1]
+    for k in range(len(levels) - 2, -1, -1):
+        lo, hi = sigmas[k] ** 2, sigmas[k + 1] ** 2
+        weight = ((variances[k] - lo) / (hi - lo)).clamp_(0, 1)
+        if pitches[k + 1] != pitches[k]:
+            out = _pyramid_expand(out, *levels[k].shape[-2:])
+        out = torch.lerp(levels[k], out, weight)
+    return out
+
+
+def aperture_kernel(shape: str, radius: float, device: torch.device = None) -> torch.Tensor:
+    """Anti-aliased aperture of ``radius`` pixels, (2 ceil(radius) + 3)^2, summing to 1."""
+    r = int(math.ceil(radius)) + 1
+    taps = torch.arange(-r, r + 1, dtype=torch.float64, device=device)
+    y, x = taps.view(-1, 1), taps.view(1, -1)
+    if shape in APERTURE_POLYGON_SIDES:
+        # Inset of the nearest edge; flat top and bottom
+        n = APERTURE_POLYGON_SIDES[shape]
+        normals = (torch.arange(n, dtype=torch.float64, device=device) + 0.5) * (2 * math.pi / n)
+        reach = (x.unsqueeze(-1) * torch.cos(normals) + y.unsqueeze(-1) * torch.sin(normals)).amax(-1)
+        inside = radius * math.cos(math.pi / n) - reach
+    elif shape.startswith("Anamorphic"):
+        rx = radius / ANAMORPHIC_SQUEEZE
+        inside = (1.0 - torch.sqrt((x / rx) ** 2 + (y / radius) ** 2)) * rx
+    else:
+        inside = radius - torch.sqrt(x * x + y * y)
+    kernel = (inside + 0.5).clamp(0, 1)
+    return (kernel / kernel.sum()).float()
+
+
+def _aperture_convolve(x: torch.Tensor, shape: str, radius: float) -> torch.Tensor:
+    """Convolve a BCHW tensor with the aperture, on a reduced copy for large radii."""
+    h, w = x.shape[-2:]
+    scale = 1
+    while (radius / (2 * scale) >= BOKEH_MIN_LEVEL_RADIUS
+           and min(h, w) >= 2 * scale * DOF_PYRAMID_MIN_SIZE):
+        scale *= 2
+    small = x
+    if scale > 1:
+        pad = (0, -w % scale, 0, -h % scale)
+        if any(pad):
+            small = torch.nn.functional.pad(small, pad, mode='replicate')
+        small = torch.nn.functional.avg_pool2d(small, scale)
+    level_radius = radius / scale
+    out = fft_convolve(small, int(math.ceil(level_radius)) + 1, "aperture",
+                       (shape, round(level_radius, 3)),
+                       lambda: aperture_kernel(shape, level_radius, x.device))
+    if scale > 1:
+        out = torch.nn.functional.interpolate(out, scale_factor=scale, mode='bilinear',
+                                              align_corners=False)[..., :h, :w]
+    return out
+
+
+def bokeh_blur(img: torch.Tensor, coc: torch.Tensor, shape: str = "Circle") -> torch.Tensor:
+    """
+    Layered bokeh of a BCHW tensor. ``coc`` (B, 1, H, W) is the signed
+    circle-of-confusion radius in pixels: negative in front of the focal
+    plane, positive behind it.
+    """
+    lo, hi = float(coc.min()), float(coc.max())
+    if max(-lo, hi) < 0.5:
+        return img
+    step = max(BOKEH_LAYER_STEP, (hi - lo) / (BOKEH_MAX_LAYERS - 1))
+    
+    # Each pixel is split between the two layers either side of its CoC, so
+    # in-focus pixels (CoC 0) land wholly on the unblurred layer
+    position = coc.expand(img.shape[0], 1, -1, -1) / step
+    h, w = img.shape[-2:]
+    color = torch.zeros_like(img)
+    cover = torch.zeros_like(position)
+    buffer = img.new_empty(img.shape[0], img.shape[1] + 1, h, w)
+    for k in range(int(math.ceil(hi / step)), int(math.floor(lo / step)) - 1, -1):
+        weight = (1.0 - (position - k).abs()).clamp_(min=0)
+        rows = torch.nonzero(weight.amax(dim=(0, 1, 3))).flatten()
+        if rows.numel() == 0:
+            continue
+        cols = torch.nonzero(weight.amax(dim=(0, 1, 2))).flatten()
+        
+        # Work on the layer's bounding box grown by the aperture; everything
+        # outside it stays zero
+        radius = abs(k) * step
+        reach = int(math.ceil(radius)) + 1 if radius >= 0.5 else 0
+        y0, y1 = max(int(rows[0]) - reach, 0), min(int(rows[-1]) + 1 + reach, h)
+        x0, x1 = max(int(cols[0]) - reach, 0), min(int(cols[-1]) + 1 + reach, w)
+        weight = weight[..., y0:y1, x0:x1]
+        layer = buffer[..., :y1 - y0, :x1 - x0]
+        torch.mul(img[..., y0:y1, x0:x1], weight, out=layer[:, :-1])
+        layer[:, -1:] = weight
+        if radius >= 0.5:
+            layer = _aperture_convolve(layer, shape, radius)
+        alpha = layer[:, -1:].clamp(0, 1)
+        # Nearer layers go over what is behind them
+        color[..., y0:y1, x0:x1].mul_(1.0 - alpha).add_(layer[:, :-1])
+        cover[..., y0:y1, x0:x1].mul_(1.0 - alpha).add_(alpha)
+    return color / cover.clamp_(min=1e-6)
+
+
 # =============================================================================
 # DEPTH OF FIELD NODE
 # =============================================================================
@@ -301,6 +616,10 @@ class FXTDDepthOfField:
                 }),
                 "foreground_blur": ("BOOLEAN", {"default": True}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
+                "engine": (DOF_ENGINES, {
+                    "default": "levels",
+                    "tooltip": "mip pyramid: continuous per-pixel blur radius, cost nearly independent of blur_amount; bokeh: depth layers convolved with the bokeh_shape aperture (FFT); levels: five full-frame blurs blended by depth"
+                }),
             }
         }
     
@@ -316,7 +635,8 @@ class FXTDDepthOfField:
                   bokeh_shape: str = "Circle",
                   highlight_boost: float = 1.0,
                   foreground_blur: bool = True,
-                  use_gpu: bool = True):
+                  use_gpu: bool = True,
+                  engine: str = "levels"):
         
         if blur_amount < 0.1:
             return (image,)
@@ -342,10 +662,7 @@ class FXTDDepthOfField:
                     ).squeeze(1)
             else:
                 # Create radial depth (center focused)
-                y = torch.linspace(-1, 1, h, device=device)
-                x = torch.linspace(-1, 1, w, device=device)
-                yy, xx = torch.meshgrid(y, x, indexing='ij')
-                depth = torch.sqrt(xx ** 2 + yy ** 2)
+                depth = radial_distance_map(h, w, device)
                 depth = depth / depth.max()
                 depth = depth.unsqueeze(0).expand(batch_size, -1, -1)
             
@@ -358,21 +675,32 @@ class FXTDDepthOfField:
                 foreground_mask = depth < focus_distance
                 blur_mask = blur_mask * (~foreground_mask).float()
             
-            # Apply multi-pass blur with varying strengths
-            output = img.clone()
-            
-            # Create blur levels
-            num_levels = 5
-            for level in range(1, num_levels + 1):
-                level_sigma = blur_amount * level / num_levels
-                level_threshold = (level - 1) / num_levels
-                
-                # Blur the image
-                blurred = gpu_gaussian_blur(img, level_sigma)
+            if engine == "bokeh":
+                # Aperture radius matched to the Gaussian's spread; behind
+                # the focal plane positive, in front negative
+                coc = blur_mask * (blur_amount * BOKEH_RADIUS_PER_SIGMA)
+                coc = torch.where(depth < focus_distance, -coc, coc).unsqueeze(1)
+                output = bokeh_blur(img.permute(0, 3, 1, 2), coc, bokeh_shape).permute(0, 2, 3, 1)
+            elif engine != "levels":
+                # Per-pixel sigma from the blur mask, gathered from a pyramid
+                sigma_map = (blur_mask * blur_amount).unsqueeze(1)
+                output = variable_gaussian_blur(img.permute(0, 3, 1, 2), sigma_map).permute(0, 2, 3, 1)
+            else:
+                # Apply multi-pass blur with varying strengths
+                output = img.clone()
                 
-                # Blend based on blur mask
-                level_mask = (blur_mask >= level_threshold).float().unsqueeze(-1)
-                output = output * (1 - level_mask) + blurred * level_mask
+                # Create blur levels
+                num_levels = 5
+                for level in range(1, num_levels + 1):
+                    level_sigma = blur_amount * level / num_levels
+                    level_threshold = (level - 1) / num_levels
+                    
+                    # Blur the image
+                    blurred = gpu_gaussian_blur(img, level_sigma)
+                    
+                    # Blend based on blur mask
+                    level_mask = (blur_mask >= level_threshold).float().unsqueeze(-1)
+                    output = output * (1 - level_mask) + blurred * level_mask
             
             # Highlight boost (bokeh brightness)
             if highlight_boost > 1.0:
@@ -388,7 +716,221 @@ class FXTDDepthOfField:
             torch.cuda.empty_cache()
             return self.apply_dof(image, blur_amount, depth_map, focus_distance,
                                  focus_range, bokeh_shape, highlight_boost, 
-                                 foreground_blur, False)
+                                 foreground_blur, False, engine)
+
+
+# =============================================================================
+# MOTION BLUR ENGINES
+# =============================================================================
+# Directional blur is a line integral: the frame is resampled onto a canvas
+# aligned with the blur direction, every canvas row is box-filtered with a
+# prefix sum (so the cost does not depend on the blur length) and the result
+# is resampled back. Radial and zoom blur average N rotated / scaled copies;
+# those maps compose about a fixed centre (angles add, scales multiply), so
+# the average is built by repeated doubling in log2(N) passes. The offset to
+# the first tap is applied last, so every intermediate lookup lands on one
+# of the taps the sampled engine would read. The frame is first extended by
+# replication far enough that none of those lookups reaches the border:
+# clamping inside a pass would clamp each partial map rather than the
+# composed one, which is what the sampled engine clamps.
+
+MOTION_BLUR_ENGINES = ["line integral", "sampled"]
+
+
+def line_box_filter(x: torch.Tensor, length: float, dim: int = -1) -> torch.Tensor:
+    """
+    Mean of a BCHW tensor over a centred window of ``length`` pixels along
+    ``dim`` (-1 rows, -2 columns), integrating partial pixels exactly.
+    Edges replicate.
+    """
+    if length < 1e-3:
+        return x
+    n = x.shape[dim]
+    pad = int(math.ceil(length / 2)) + 1
+    padding = (pad, pad, 0, 0) if dim == -1 else (0, 0, pad, pad)
+    padded = torch.nn.functional.pad(x, padding, mode='replicate')
+    
+    # Prefix sums of the line minus its mean keep float32 precision on long lines
+    mean = padded.mean(dim=dim, keepdim=True)
+    centred = padded.sub_(mean)
+    prefix = torch.cumsum(centred, dim=dim)
+    
+    # The integral from the left edge up to position u is prefix[i - 1] +
+    # frac * centred[i] with i = floor(u + 0.5). Every output pixel uses the
+    # same fractional offsets, so the window is a few shifted slices.
+    hi = pad + 0.5 + length / 2
+    lo = pad + 0.5 - length / 2
+    i1, i0 = int(math.floor(hi)), int(math.floor(lo))
+    window = prefix.narrow(dim, i1 - 1, n) - prefix.narrow(dim, i0 - 1, n)
+    window.add_(centred.narrow(dim, i1, n), alpha=hi - i1)
+    window.sub_(centred.narrow(dim, i0, n), alpha=lo - i0)
+    return window.mul_(1.0 / length).add_(mean)
+
+
+def _motion_canvas_grids(h: int, w: int, length: float, angle: float,
+                         device: torch.device, dtype: torch.dtype):
+    """Sampling grids onto and back from a canvas whose rows follow ``angle``."""
+    def build():
+        dx, dy = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        pad = int(math.ceil(length / 2)) + 1
+        half_a = (w - 1) / 2 * abs(dx) + (h - 1) / 2 * abs(dy)
+        half_b = (w - 1) / 2 * abs(dy) + (h - 1) / 2 * abs(dx)
+        na = 2 * (int(math.ceil(half_a)) + pad) + 1
+        nb = 2 * int(math.ceil(half_b)) + 1
+        
+        # Canvas (a along the blur, b across it) -> frame pixel offsets from
+        # the centre -> grid_sample coordinates
+        a = torch.arange(na, device=device, dtype=dtype) - (na - 1) / 2
+        b = torch.arange(nb, device=device, dtype=dtype) - (nb - 1) / 2
+        px = a.view(1, na) * dx - b.view(nb, 1) * dy
+        py = a.view(1, na) * dy + b.view(nb, 1) * dx
+        to_canvas = torch.stack([px * (2 / w), py * (2 / h)], dim=-1).unsqueeze(0)
+        
+        # Frame pixel centres -> canvas coordinates
+        ys, xs = pixel_centre_axes(h, w, device, dtype)
+        fx = (xs * (w / 2)).view(1, w)
+        fy = (ys * (h / 2)).view(h, 1)
+        ca = fx * dx + fy * dy + (na - 1) / 2
+        cb = fy * dx - fx * dy + (nb - 1) / 2
+        from_canvas = torch.stack([(2 * ca + 1) / na - 1, (2 * cb + 1) / nb - 1], dim=-1).unsqueeze(0)
+        return to_canvas, from_canvas
+    return cached_grid("motion_canvas", h, w, device, dtype, (length, angle), build)
+
+
+def directional_blur_torch(img: torch.Tensor, length: float, angle: float) -> torch.Tensor:
+    """
+    Box motion blur of a BCHW tensor over ``length`` pixels along ``angle``
+    degrees (y down), with border-clamped edges.
+    """
+    if length < 1e-3:
+        return img
+    b, c, h, w = img.shape
+    angle = math.fmod(angle, 180.0)
+    if abs(math.sin(math.radians(angle))) < 1e-6:
+        return line_box_filter(img, length)
+    if abs(math.cos(math.radians(angle))) < 1e-6:
+        return line_box_filter(img, length, dim=-2)
+    
+    to_canvas, from_canvas = _motion_canvas_grids(h, w, length, angle, img.device, img.dtype)
+    canvas = torch.nn.functional.grid_sample(
+        img, to_canvas.expand(b, -1, -1, -1), mode='bilinear',
+        padding_mode='border', align_corners=False)
+    canvas = line_box_filter(canvas, length)
+    return torch.nn.functional.grid_sample(
+        canvas, from_canvas.expand(b, -1, -1, -1), mode='bilinear',
+        padding_mode='border', align_corners=False)
+
+
+def _doubling_passes(samples: int) -> int:
+    """Doubling passes for at least ``samples`` taps."""
+    return max(1, int(math.ceil(math.log2(max(samples, 2)))))
+
+
+def _affine_resample(img: torch.Tensor, theta) -> torch.Tensor:
+    b, c, h, w = img.shape
+    grid = transformed_sampling_grid(theta, h, w, img.device, img.dtype).expand(b, -1, -1, -1)
+    return torch.nn.functional.grid_sample(img, grid, mode='bilinear',
+                                           padding_mode='border', align_corners=False)
+
+
+def _tap_padding(h: int, w: int, thetas) -> Tuple[int, int, int, int]:
+    """
+    Replicate padding (left, right, top, bottom) in pixels that keeps every
+    bilinear lookup of the 2x3 grid-space maps ``thetas`` inside the frame.
+    """
+    corners = torch.tensor([(sx * (1 - 1 / w), sy * (1 - 1 / h))
+                            for sx in (-1, 1) for sy in (-1, 1)], dtype=torch.float64)
+    maps = torch.tensor(thetas, dtype=torch.float64)
+    src = corners @ maps[:, :, :2].transpose(1, 2) + maps[:, None, :, 2]
+    x = (src[..., 0] + 1) * (w / 2) - 0.5
+    y = (src[..., 1] + 1) * (h / 2) - 0.5
+    
+    def pad(overshoot):
+        # One extra pixel for the bilinear neighbour and the sampled arcs
+        return int(math.ceil(overshoot)) + 2 if overshoot > 1e-6 else 0
+    return (pad(-float(x.min())), pad(float(x.max()) - (w - 1)),
+            pad(-float(y.min())), pad(float(y.max()) - (h - 1)))
+
+
+def _padded_theta(theta, h: int, w: int, padding: Tuple[int, int, int, int]):
+    """``theta`` (grid coordinates of an h x w frame) re-expressed for the padded frame."""
+    left, right, top, bottom = padding
+    (a, b, tx), (c, d, ty) = theta
+    # Frame coordinate = scale * padded coordinate + offset, per axis
+    sx, sy = (w + left + right) / w, (h + top + bottom) / h
+    ox, oy = (right - left) / w, (bottom - top) / h
+    return ((a, b * sy / sx, (a * ox + b * oy + tx - ox) / sx),
+            (c * sx / sy, d, (c * ox + d * oy + ty - oy) / sy))
+
+
+def _doubled_affine_average(img: torch.Tensor, tap_map, tap_range) -> torch.Tensor:
+    """
+    Run ``tap_map(resample, x)`` on ``img`` replicate-padded so that none of
+    the maps ``tap_range`` spans reaches the border, then crop. ``resample(x,
+    theta)`` takes ``theta`` in the unpadded frame's grid coordinates.
+    """
+    b, c, h, w = img.shape
+    padding = _tap_padding(h, w, tap_range)
+    if not any(padding):
+        return tap_map(_affine_resample, img)
+    
+    left, right, top, bottom = padding
+    padded = torch.nn.functional.pad(img, padding, mode='replicate')
+    
+    def resample(x, theta):
+        return _affine_resample(x, _padded_theta(theta, h, w, padding))
+    return tap_map(resample, padded)[..., top:top + h, left:left + w]
+
+
+def radial_blur_torch(img: torch.Tensor, amount: float, cx: float, cy: float,
+                      samples: int = 16) -> torch.Tensor:
+    """
+    Rotational blur of a BCHW tensor about (cx, cy) in grid coordinates,
+    spanning amount * 0.02 radians, with 2^ceil(log2(samples)) taps built in
+    log2 passes.
+    """
+    passes = _doubling_passes(samples)
+    span = amount * 0.02
+    step = span / (2 ** passes - 1)
+    
+    def rotation(phi):
+        cos_r, sin_r = math.cos(phi), math.sin(phi)
+        return ((cos_r, -sin_r, cx * (1 - cos_r) + cy * sin_r),
+                (sin_r, cos_r, cy * (1 - cos_r) - cx * sin_r))
+    
+    def taps(resample, x):
+        for k in range(passes):
+            x = (x + resample(x, rotation(step * 2 ** k))) / 2
+        return resample(x, rotation(-span / 2))
+    
+    # Corners sweep arcs, so the padding is measured along the whole span
+    sweep = [rotation(span * (i / 64 - 0.5)) for i in range(65)]
+    return _doubled_affine_average(img, taps, sweep)
+
+
+def zoom_blur_torch(img: torch.Tensor, amount: float, cx: float, cy: float,
+                    samples: int = 16) -> torch.Tensor:
+    """
+    Zoom blur of a BCHW tensor about (cx, cy) in grid coordinates over
+    scales 1 -/+ amount * 0.005. Taps are spaced geometrically so they
+    compose by doubling, and weighted by scale to keep the uniform-in-scale
+    average of the sampled engine.
+    """
+    passes = _doubling_passes(samples)
+    low = max(1.0 - amount * 0.005, 1e-3)
+    high = 1.0 + amount * 0.005
+    ratio = (high / low) ** (1.0 / (2 ** passes - 1))
+    
+    def scaling(scale):
+        return ((scale, 0, cx * (1 - scale)), (0, scale, cy * (1 - scale)))
+    
+    def taps(resample, x):
+        for k in range(passes):
+            step = ratio ** (2 ** k)
+            x = (x + step * resample(x, scaling(step))) / (1 + step)
+        return resample(x, scaling(low))
+    
+    return _doubled_affine_average(img, taps, [scaling(low), scaling(high)])
 
 
 # =============================================================================
@@ -447,6 +989,9 @@ class FXTDMotionBlur:
                     "step": 4
                 }),
                 "use_gpu": ("BOOLEAN", {"default": True}),
+                "engine": (MOTION_BLUR_ENGINES, {
+                    "tooltip": "line integral: exact box blur for directional (cost independent of length), log2(samples) passes for radial/zoom; sampled: average of `samples` shifted copies"
+                }),
             }
         }
     
@@ -457,7 +1002,8 @@ class FXTDMotionBlur:
     
     def apply_motion_blur(self, image: torch.Tensor, blur_type: str, amount: float,
                           angle: float = 0.0, center_x: float = 0.5, center_y: float = 0.5,
-                          samples: int = 16, use_gpu: bool = True):
+                          samples: int = 16, use_gpu: bool = True,
+                          engine: str = "line integral"):
         
         if amount < 0.5:
             return (image,)
@@ -467,95 +1013,98 @@ class FXTDMotionBlur:
         
         try:
             img = image.to(device).float()
-            output = torch.zeros_like(img)
             
-            if blur_type == "Directional":
-                # Directional motion blur
-                angle_rad = math.radians(angle)
-                dx = math.cos(angle_rad) * amount / w
-                dy = math.sin(angle_rad) * amount / h
-                
-                for i in range(samples):
-                    t = (i / (samples - 1)) - 0.5  # -0.5 to 0.5
-                    offset_x = t * dx * 2
-                    offset_y = t * dy * 2
-                    
-                    # Create translation grid
-                    theta = torch.tensor([[[1, 0, offset_x], [0, 1, offset_y]]], 
-                                        device=device, dtype=img.dtype)
-                    theta = theta.expand(batch_size, -1, -1)
-                    grid = torch.nn.functional.affine_grid(theta, img.permute(0, 3, 1, 2).shape, 
-                                                           align_corners=False)
-                    
-                    sampled = torch.nn.functional.grid_sample(
-                        img.permute(0, 3, 1, 2), grid,
-                        mode='bilinear', padding_mode='border', align_corners=False
-                    ).permute(0, 2, 3, 1)
-                    
-                    output += sampled
-                
-            elif blur_type == "Radial":
-                # Radial/rotational blur around center
+            if engine != "sampled":
+                nchw = img.permute(0, 3, 1, 2)
                 cx = center_x * 2 - 1
                 cy = center_y * 2 - 1
+                if blur_type == "Directional":
+                    output = directional_blur_torch(nchw, amount, angle)
+                elif blur_type == "Radial":
+                    output = radial_blur_torch(nchw, amount, cx, cy, samples)
+                else:
+                    output = zoom_blur_torch(nchw, amount, cx, cy, samples)
+                output = output.permute(0, 2, 3, 1)
+            else:
+                output = torch.zeros_like(img)
                 
-                for i in range(samples):
-                    t = (i / (samples - 1)) - 0.5
-                    rotation = t * amount * 0.02  # degrees to radians factor
-                    
-                    cos_r = math.cos(rotation)
-                    sin_r = math.sin(rotation)
+                if blur_type == "Directional":
+                    # Directional motion blur
+                    angle_rad = math.radians(angle)
+                    dx = math.cos(angle_rad) * amount / w
+                    dy = math.sin(angle_rad) * amount / h
                     
-                    # Rotation matrix around center point
-                    theta = torch.tensor([
-                        [[cos_r, -sin_r, cx * (1 - cos_r) + cy * sin_r],
-                         [sin_r, cos_r, cy * (1 - cos_r) - cx * sin_r]]
-                    ], device=device, dtype=img.dtype)
-                    theta = theta.expand(batch_size, -1, -1)
-                    
-                    grid = torch.nn.functional.affine_grid(theta, img.permute(0, 3, 1, 2).shape,
-                                                           align_corners=False)
+                    for i in range(samples):
+                        t = (i / (samples - 1)) - 0.5  # -0.5 to 0.5
+                        offset_x = t * dx * 2
+                        offset_y = t * dy * 2
+                        
+                        # Translation grid
+                        grid = transformed_sampling_grid(((1, 0, offset_x), (0, 1, offset_y)),
+                                                         h, w, device, img.dtype)
+                        grid = grid.expand(batch_size, -1, -1, -1)
+                        
+                        sampled = torch.nn.functional.grid_sample(
+                            img.permute(0, 3, 1, 2), grid,
+                            mode='bilinear', padding_mode='border', align_corners=False
+                        ).permute(0, 2, 3, 1)
+                        
+                        output += sampled
                     
-                    sampled = torch.nn.functional.grid_sample(
-                        img.permute(0, 3, 1, 2), grid,
-                        mode='bilinear', padding_mode='border', align_corners=False
-                    ).permute(0, 2, 3, 1)
+                elif blur_type == "Radial":
+                    # Radial/rotational blur around center
+                    cx = center_x * 2 - 1
+                    cy = center_y * 2 - 1
                     
-                    output += sampled
+                    for i in range(samples):
+                        t = (i / (samples - 1)) - 0.5
+                        rotation = t * amount * 0.02  # degrees to radians factor
+                        
+                        cos_r = math.cos(rotation)
+                        sin_r = math.sin(rotation)
+                        
+                        # Rotation matrix around center point
+                        theta = ((cos_r, -sin_r, cx * (1 - cos_r) + cy * sin_r),
+                                 (sin_r, cos_r, cy * (1 - cos_r) - cx * sin_r))
+                        grid = transformed_sampling_grid(theta, h, w, device, img.dtype)
+                        grid = grid.expand(batch_size, -1, -1, -1)
+                        
+                        sampled = torch.nn.functional.grid_sample(
+                            img.permute(0, 3, 1, 2), grid,
+                            mode='bilinear', padding_mode='border', align_corners=False
+                        ).permute(0, 2, 3, 1)
+                        
+                        output += sampled
+                        
+                else:  # Zoom
+                    # Zoom blur from center
+                    cx = center_x * 2 - 1
+                    cy = center_y * 2 - 1
                     
-            else:  # Zoom
-                # Zoom blur from center
-                cx = center_x * 2 - 1
-                cy = center_y * 2 - 1
+                    for i in range(samples):
+                        t = (i / (samples - 1))
+                        scale = 1.0 + (t - 0.5) * amount * 0.01
+                        
+                        theta = ((scale, 0, cx * (1 - scale)),
+                                 (0, scale, cy * (1 - scale)))
+                        grid = transformed_sampling_grid(theta, h, w, device, img.dtype)
+                        grid = grid.expand(batch_size, -1, -1, -1)
+                        
+                        sampled = torch.nn.functional.grid_sample(
+                            img.permute(0, 3, 1, 2), grid,
+                            mode='bilinear', padding_mode='border', align_corners=False
+                        ).permute(0, 2, 3, 1)
+                        
+                        output += sampled
                 
-                for i in range(samples):
-                    t = (i / (samples - 1))
-                    scale = 1.0 + (t - 0.5) * amount * 0.01
-                    
-                    theta = torch.tensor([
-                        [[scale, 0, cx * (1 - scale)],
-                         [0, scale, cy * (1 - scale)]]
-                    ], device=device, dtype=img.dtype)
-                    theta = theta.expand(batch_size, -1, -1)
-                    
-                    grid = torch.nn.functional.affine_grid(theta, img.permute(0, 3, 1, 2).shape,
-                                                           align_corners=False)
-                    
-                    sampled = torch.nn.functional.grid_sample(
-                        img.permute(0, 3, 1, 2), grid,
-                        mode='bilinear', padding_mode='border', align_corners=False
-                    ).permute(0, 2, 3, 1)
-                    
-                    output += sampled
-            
-            output = output / samples
+                output = output / samples
             output = torch.clamp(output, 0, 1)
             return (output.cpu(),)
             
         except RuntimeError:
             torch.cuda.empty_cache()
             return self.apply_motion_blur(image, blur_type, amount, angle,
-                                         center_x, center_y, samples, False)
+                                         center_x, center_y, samples, False, engine)
 
 
 # =============================================================================
@@ -639,37 +1188,37 @@ class FXTDRollingShutter:
         try:
             img = image.to(device).float()
             
-            # Create coordinate grids
-            y = torch.linspace(-1, 1, h, device=device, dtype=img.dtype)
-            x = torch.linspace(-1, 1, w, device=device, dtype=img.dtype)
-            yy, xx = torch.meshgrid(y, x, indexing='ij')
+            yy, xx = linspace_grid(h, w, device, img.dtype)
             
-            if shutter_direction == "Vertical":
-                # Vertical rolling shutter - each row shifts based on its y position
-                offset_x = yy * skew_amount / w
-                offset_y = torch.zeros_like(yy)
-                
-                # Add wobble
-                if wobble_amplitude > 0:
-                    offset_x += torch.sin(yy * wobble_frequency * math.pi * 2) * wobble_amplitude / w
+            def build_grid():
+                if shutter_direction == "Vertical":
+                    # Vertical rolling shutter - each row shifts based on its y position
+                    offset_x = yy * skew_amount / w
+                    offset_y = torch.zeros_like(yy)
                     
-            elif shutter_direction == "Horizontal":
-                # Horizontal rolling shutter
-                offset_x = torch.zeros_like(xx)
-                offset_y = xx * skew_amount / h
+                    # Add wobble
+                    if wobble_amplitude > 0:
+                        offset_x += torch.sin(yy * wobble_frequency * math.pi * 2) * wobble_amplitude / w
+                        
+                elif shutter_direction == "Horizontal":
+                    # Horizontal rolling shutter
+                    offset_x = torch.zeros_like(xx)
+                    offset_y = xx * skew_amount / h
+                    
+                    if wobble_amplitude > 0:
+                        offset_y += torch.sin(xx * wobble_frequency * math.pi * 2) * wobble_amplitude / h
+                else:
+                    # Both
+                    offset_x = yy * skew_amount / w * 0.5
+                    offset_y = xx * skew_amount / h * 0.5
                 
-                if wobble_amplitude > 0:
-                    offset_y += torch.sin(xx * wobble_frequency * math.pi * 2) * wobble_amplitude / h
-            else:
-                # Both
-                offset_x = yy * skew_amount / w * 0.5
-                offset_y = xx * skew_amount / h * 0.5
+                return torch.stack([xx + offset_x, yy + offset_y], dim=-1).unsqueeze(0)
             
             # Apply transformation
-            grid_x = xx + offset_x
-            grid_y = yy + offset_y
-            grid = torch.stack([grid_x, grid_y], dim=-1)
-            grid = grid.unsqueeze(0).expand(batch_size, -1, -1, -1)
+            grid = cached_grid("rolling_shutter", h, w, device, img.dtype,
+                               (shutter_direction, skew_amount, wobble_frequency, wobble_amplitude),
+                               build_grid)
+            grid = grid.expand(batch_size, -1, -1, -1)
             
             output = torch.nn.functional.grid_sample(
                 img.permute(0, 3, 1, 2), grid,
@@ -678,13 +1227,14 @@ class FXTDRollingShutter:
             
             # Apply flash banding
             if flash_band_position >= -0.5:
-                if shutter_direction == "Vertical":
-                    scanline = yy
-                else:
-                    scanline = xx
+                def build_band():
+                    scanline = yy if shutter_direction == "Vertical" else xx
+                    band_mask = torch.exp(-((scanline - flash_band_position) ** 2) / (flash_band_width ** 2))
+                    return band_mask.unsqueeze(0).unsqueeze(-1)
                 
-                band_mask = torch.exp(-((scanline - flash_band_position) ** 2) / (flash_band_width ** 2))
-                band_mask = band_mask.unsqueeze(0).unsqueeze(-1)
+                band_mask = cached_grid("flash_band", h, w, device, img.dtype,
+                                        (shutter_direction == "Vertical", flash_band_position,
+                                         flash_band_width), build_band)
                 output = output + band_mask * 0.3  # Flash brightness
             
             output = torch.clamp(output, 0, 1)
@@ -747,6 +1297,17 @@ class FXTDCompressionArtifacts:
                     "max": 0.1,
                     "step": 0.005
                 }),
+                "seed": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 2147483647
+                }),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
             }
         }
     
@@ -757,7 +1318,8 @@ class FXTDCompressionArtifacts:
     
     def apply_artifacts(self, image: torch.Tensor, artifact_type: str, quality: int,
                         block_size: int = 8, color_subsampling: bool = True,
-                        banding_levels: int = 32, noise_amount: float = 0.0):
+                        banding_levels: int = 32, noise_amount: float = 0.0,
+                        seed: int = 0, frame_offset: int = 0):
         
         batch_size = image.shape[0]
         results = []
@@ -782,9 +1344,9 @@ class FXTDCompressionArtifacts:
                 # Apply color banding (posterization)
                 result = np.floor(result * banding_levels) / banding_levels
             
-            # Add optional noise
+            # Add optional noise, keyed by (seed, sequence frame)
             if noise_amount > 0:
-                noise = np.random.randn(*result.shape) * noise_amount
+                noise = counter_normal(seed, frame_offset + b, 0, result.shape, STREAM_NOISE) * noise_amount
                 result = result + noise
             
             result = np.clip(result, 0, 1)
@@ -860,6 +1422,12 @@ class FXTDCameraShake:
                 }),
                 "animate": ("BOOLEAN", {"default": True}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
             }
         }
     
@@ -872,7 +1440,7 @@ class FXTDCameraShake:
                     shake_x: float = 2.0, shake_y: float = 2.0,
                     rotation: float = 0.5, frequency: float = 1.0,
                     seed: int = 0, animate: bool = True,
-                    use_gpu: bool = True):
+                    use_gpu: bool = True, frame_offset: int = 0):
         
         # Apply preset
         if preset != "Custom":
@@ -892,11 +1460,11 @@ class FXTDCameraShake:
                 img = image[b:b+1].to(device).float()
                 
                 # Generate smooth random offsets using Perlin-like noise
-                frame_seed = seed + b if animate else seed
-                np.random.seed(frame_seed)
+                # Phase from the counter RNG keyed by (seed, frame)
+                t = float(counter_uniform(seed, frame_offset + b if animate else 0, 0,
+                                          (), STREAM_SHAKE)) * 1000
                 
                 # Low-frequency noise components
-                t = np.random.rand() * 1000
                 offset_x = (np.sin(t * frequency) * 0.6 + 
                            np.sin(t * frequency * 2.3) * 0.3 +
                            np.sin(t * frequency * 5.1) * 0.1) * shake_x / w * 2
@@ -931,7 +1499,7 @@ class FXTDCameraShake:
         except RuntimeError:
             torch.cuda.empty_cache()
             return self.apply_shake(image, preset, shake_x, shake_y,
-                                   rotation, frequency, seed, animate, False)
+                                   rotation, frequency, seed, animate, False, frame_offset)
 
 
 # =============================================================================
@@ -1303,6 +1871,12 @@ class FXTDPhysicalCamera:
                     "max": 2147483647,
                     "tooltip": "Random seed for shake animation. Same seed = reproducible results."
                 }),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
             }
         }
     
@@ -1399,7 +1973,8 @@ Each effect can be enabled/disabled."""
                 shake_intensity: float = 1.0,
                 # Processing
                 use_gpu: bool = True,
-                seed: int = 0):
+                seed: int = 0,
+                frame_offset: int = 0):
         
         # Apply camera body preset if selected
         if camera_body != "Custom" and camera_body in self.CAMERA_BODY_PRESETS:
@@ -1475,178 +2050,66 @@ Each effect can be enabled/disabled."""
                         ).squeeze(1)
                 else:
                     # Radial falloff
-                    y = torch.linspace(-1, 1, h, device=device)
-                    x = torch.linspace(-1, 1, w, device=device)
-                    yy, xx = torch.meshgrid(y, x, indexing='ij')
-                    depth = torch.sqrt(xx**2 + yy**2) / 1.414
+                    depth = radial_distance_map(h, w, device) / 1.414
                     depth = depth.unsqueeze(0).expand(batch_size, -1, -1)
                 
                 # Create blur mask
                 depth_diff = torch.abs(depth - focus_distance)
                 blur_mask = torch.clamp(depth_diff * 3, 0, 1)
                 
-                # Apply blur
-                blurred = gpu_gaussian_blur(img, effective_blur)
-                blur_mask = blur_mask.unsqueeze(-1)
-                img = img * (1 - blur_mask) + blurred * blur_mask
+                # Apply blur, its radius growing with distance from focus
+                sigma_map = (blur_mask * effective_blur).unsqueeze(1)
+                img = variable_gaussian_blur(img.permute(0, 3, 1, 2), sigma_map).permute(0, 2, 3, 1)
             
             # ═══════════════════════════════════════════════════════════
             # 4. LENS EFFECTS
             # ═══════════════════════════════════════════════════════════
+            # Distortion, CA and vignette (and rolling shutter and shake
+            # below) are collected as warp stages and resampled in one pass.
+            lens_stages = []
             
             # A. LENS DISTORTION
             if enable_lens_distortion and (abs(distortion_k1) > 0.001 or abs(distortion_k2) > 0.001):
-                y = torch.linspace(-1, 1, h, device=device, dtype=img.dtype)
-                x = torch.linspace(-1, 1, w, device=device, dtype=img.dtype)
-                yy, xx = torch.meshgrid(y, x, indexing='ij')
-                
-                # Convert to polar coordinates
-                r2 = xx**2 + yy**2
-                r = torch.sqrt(r2)
-                
-                # Apply polynomial distortion model: r_distorted = r * (1 + k1*r^2 + k2*r^4)
-                # But for inverse mapping (grid_sample), we need to undistort or just apply as is depending on intent.
-                # Standard lens distortion nodes usually warp output -> input.
-                # To simulate barrel (k1 < 0), we essentially want to "zoom out" center, so we sample from further out?
-                # Let's stick to standard formula for displacement.
-                
-                factor = 1.0 + distortion_k1 * r2 + distortion_k2 * (r2 ** 2)
-                
-                # Apply distortion to coordinates
-                grid_x = xx * factor
-                grid_y = yy * factor
-                
-                # Stack and expand
-                grid = torch.stack([grid_x, grid_y], dim=-1)
-                grid = grid.unsqueeze(0).expand(batch_size, -1, -1, -1)
-                
-                # Sample
-                img = torch.nn.functional.grid_sample(
-                    img.permute(0, 3, 1, 2), grid,
-                    mode='bilinear', padding_mode='reflection', align_corners=False
-                ).permute(0, 2, 3, 1)
+                lens_stages.append(radial_distortion_warp(distortion_k1, distortion_k2))
 
             # B. CHROMATIC ABERRATION
-            if enable_chromatic_aberration and ca_strength > 0:
-                # Radial shift for R and B channels
-                # R scales out, B scales in (or vice versa)
-                scale_r = 1.0 + (0.002 * ca_strength)
-                scale_b = 1.0 - (0.002 * ca_strength)
-                
-                # Base grid
-                y = torch.linspace(-1, 1, h, device=device, dtype=img.dtype)
-                x = torch.linspace(-1, 1, w, device=device, dtype=img.dtype)
-                yy, xx = torch.meshgrid(y, x, indexing='ij')
-                grid = torch.stack([xx, yy], dim=-1).unsqueeze(0).expand(batch_size, -1, -1, -1)
-                
-                # Red channel (Apply scale)
-                grid_r = grid * scale_r
-                r_chan = torch.nn.functional.grid_sample(
-                    img[..., 0:1].permute(0, 3, 1, 2), grid_r,
-                    mode='bilinear', padding_mode='border', align_corners=False
-                ).permute(0, 2, 3, 1)
-                
-                # Blue channel (Apply scale)
-                grid_b = grid * scale_b
-                b_chan = torch.nn.functional.grid_sample(
-                    img[..., 2:3].permute(0, 3, 1, 2), grid_b,
-                    mode='bilinear', padding_mode='border', align_corners=False
-                ).permute(0, 2, 3, 1)
-                
-                # Reassemble
-                img = torch.cat([r_chan, img[..., 1:2], b_chan], dim=-1)
+            if enable_chromatic_aberration and ca_strength > 0 and c >= 3:
+                # R scales out, B scales in
+                scales = [1.0] * c
+                scales[0] = 1.0 + (0.002 * ca_strength)
+                scales[2] = 1.0 - (0.002 * ca_strength)
+                lens_stages.append(channel_scale_warp(tuple(scales)))
 
             # C. VIGNETTE
             if enable_vignette and vignette_strength > 0:
-                y = torch.linspace(-1, 1, h, device=device)
-                x = torch.linspace(-1, 1, w, device=device)
-                yy, xx = torch.meshgrid(y, x, indexing='ij')
-                
-                # Distance from center
-                dist = torch.sqrt(xx**2 + yy**2)
-                
-                # Smooth darkening at edges
-                # vignette_radius controls where falloff begins
-                # vignette_strength controls how dark it gets
-                
-                max_dist = 1.414  # Corner distance
-                radius_scaled = vignette_radius * 1.0 # arbitrary scaling to feel right
-                
-                mask = 1.0 - torch.clamp((dist - radius_scaled) / (max_dist - radius_scaled + 0.001), 0, 1)
-                mask = torch.pow(mask, vignette_strength * 2.0) # curved falloff
-                
-                # Apply strength
-                # 0 strength = no change (mask=1), 1 strength = full effect
-                # Actually standard formula: output = input * (1 - strength * (1-mask))
-                # My mask creates 1 at center, 0 at edges.
-                
-                # Let's use cosine falloff for more natural look
-                # cos(dist * intensity)
-                
-                falloff = dist * (1.0 / vignette_radius)
-                falloff = torch.clamp(falloff, 0, 1)
-                mask = 1.0 - (falloff * vignette_strength)
-                mask = torch.clamp(mask, 0, 1)
-                
-                # Use a simpler polynomial falloff that looks good
-                mask = 1.0 - (dist ** 2) * vignette_strength / (vignette_radius ** 2)
-                mask = torch.clamp(mask, 0, 1)
-                
-                img = img * mask.unsqueeze(0).unsqueeze(-1)
+                # Polynomial falloff; vignette_radius sets where it reaches black
+                def vignette_gain(x, y):
+                    dist2 = x * x + y * y
+                    return torch.clamp(1.0 - dist2 * vignette_strength / (vignette_radius ** 2), 0, 1)
+                lens_stages.append(gain_stage(vignette_gain))
             
             # ═══════════════════════════════════════════════════════════
             # 5. MOTION BLUR
             # ═══════════════════════════════════════════════════════════
             if enable_motion_blur:
+                # Motion blur filters the lens-warped image, so the lens
+                # stages are resolved first
+                img = apply_composed_warp(img, lens_stages)
+                lens_stages = []
+                
                 # Motion blur amount based on shutter angle (180° = standard)
                 # Slower shutter = more blur
                 base_motion = 10.0 * (shutter_val / (1/48))  # Relative to 1/48
                 
                 if motion_type == "Directional":
-                    angle_rad = math.radians(motion_angle)
-                    samples = 16
-                    output = torch.zeros_like(img)
-                    
-                    for i in range(samples):
-                        t = (i / (samples - 1)) - 0.5
-                        dx = math.cos(angle_rad) * base_motion / w * t * 2
-                        dy = math.sin(angle_rad) * base_motion / h * t * 2
-                        
-                        theta = torch.tensor([[[1, 0, dx], [0, 1, dy]]], 
-                                            device=device, dtype=img.dtype)
-                        theta = theta.expand(batch_size, -1, -1)
-                        grid = torch.nn.functional.affine_grid(theta, img.permute(0,3,1,2).shape, 
-                                                               align_corners=False)
-                        sampled = torch.nn.functional.grid_sample(
-                            img.permute(0,3,1,2), grid, mode='bilinear', 
-                            padding_mode='border', align_corners=False
-                        ).permute(0,2,3,1)
-                        output += sampled
-                    
-                    img = output / samples
+                    img = directional_blur_torch(img.permute(0, 3, 1, 2), base_motion,
+                                                 motion_angle).permute(0, 2, 3, 1)
             
             # ═══════════════════════════════════════════════════════════
             # 5. ROLLING SHUTTER
             # ═══════════════════════════════════════════════════════════
             if enable_rolling_shutter and (abs(rs_skew) > 0.1 or rs_wobble > 0.1):
-                y = torch.linspace(-1, 1, h, device=device, dtype=img.dtype)
-                x = torch.linspace(-1, 1, w, device=device, dtype=img.dtype)
-                yy, xx = torch.meshgrid(y, x, indexing='ij')
-                
-                # Vertical rolling shutter
-                offset_x = yy * rs_skew / w
-                if rs_wobble > 0:
-                    offset_x += torch.sin(yy * 8 * math.pi) * rs_wobble / w
-                
-                grid_x = xx + offset_x
-                grid_y = yy
-                grid = torch.stack([grid_x, grid_y], dim=-1)
-                grid = grid.unsqueeze(0).expand(batch_size, -1, -1, -1)
-                
-                img = torch.nn.functional.grid_sample(
-                    img.permute(0,3,1,2), grid, mode='bilinear', 
-                    padding_mode='border', align_corners=False
-                ).permute(0,2,3,1)
+                lens_stages.append(row_shift_warp(rs_skew, rs_wobble, w))
             
             # ═══════════════════════════════════════════════════════════
             # 6. CAMERA SHAKE
@@ -1663,11 +2126,9 @@ Each effect can be enabled/disabled."""
                 shake_y = base_shake * shake_intensity
                 rot = base_rot * shake_intensity
                 
-                results = []
+                thetas = []
                 for b in range(batch_size):
-                    frame_seed = seed + b
-                    np.random.seed(frame_seed)
-                    t = np.random.rand() * 1000
+                    t = float(counter_uniform(seed, frame_offset + b, 0, (), STREAM_SHAKE)) * 1000
                     
                     offset_x = np.sin(t) * shake_x / w * 2
                     offset_y = np.sin(t * 1.1 + 0.5) * shake_y / h * 2
@@ -1675,22 +2136,12 @@ Each effect can be enabled/disabled."""
                     
                     cos_r = math.cos(rot_angle)
                     sin_r = math.sin(rot_angle)
-                    
-                    theta = torch.tensor([
-                        [[cos_r, -sin_r, offset_x],
-                         [sin_r, cos_r, offset_y]]
-                    ], device=device, dtype=img.dtype)
-                    
-                    grid = torch.nn.functional.affine_grid(
-                        theta, img[b:b+1].permute(0,3,1,2).shape, align_corners=False
-                    )
-                    frame = torch.nn.functional.grid_sample(
-                        img[b:b+1].permute(0,3,1,2), grid, mode='bilinear',
-                        padding_mode='border', align_corners=False
-                    ).permute(0,2,3,1)
-                    results.append(frame)
+                    thetas.append([[cos_r, -sin_r, offset_x],
+                                   [sin_r, cos_r, offset_y]])
                 
-                img = torch.cat(results, dim=0)
+                lens_stages.append(affine_warp(torch.tensor(thetas, dtype=torch.float64)))
+            
+            img = apply_composed_warp(img, lens_stages)
             
             # ═══════════════════════════════════════════════════════════
             # FINALIZE
@@ -1723,7 +2174,8 @@ Effects Enabled:
                               enable_chromatic_aberration, ca_strength, enable_lens_distortion,
                               distortion_k1, distortion_k2, enable_motion_blur, motion_type, 
                               motion_angle, enable_rolling_shutter, rs_skew, rs_wobble, 
-                              enable_shake, shake_preset, shake_intensity, False, seed)
+                              enable_shake, shake_preset, shake_intensity, False, seed,
+                              frame_offset)
 
 
 # =============================================================================
@@ -20,9 +20,18 @@ import numpy as np
 from PIL import Image, ImageFilter, ImageDraw
 from typing import Tuple, Dict, Any, Optional, List
 import math
+import hashlib
+import threading
+from collections import OrderedDict
 from enum import Enum
 import colorsys
 
+from .radiance_ops import (counter_bits, counter_normal, counter_normal_planes,
+                           gaussian_blur, gaussian_blur_array,
+                           torch_cpu_threads, cached_grid, linspace_grid, affine_sampling_grid,
+                           STREAM_GRAIN, STREAM_GRAIN_PLATE,
+                           STREAM_GRAIN_OFFSET, STREAM_WEAVE, STREAM_NOISE)
+
 
 # =============================================================================
 # CAMERA SENSOR PRESETS
@@ -1087,12 +1096,30 @@ MASTER_FILM_PRESETS = {
 # GRAIN GENERATION FUNCTIONS
 # =============================================================================
 
+def seeded_normal(seed: Optional[int], frame: int, channel: int, shape,
+                  stream: int = STREAM_GRAIN) -> np.ndarray:
+    """
+    float32 normals keyed by (seed, frame, channel) from the counter RNG, so
+    any frame can be regenerated on its own. ``seed=None`` draws fresh
+    entropy instead; neither touches np.random's global state.
+    """
+    if seed is None:
+        return np.random.default_rng().standard_normal(shape, dtype=np.float32)
+    return counter_normal(seed, frame, channel, shape, stream)
+
+
+def counter_grain_torch(seed: int, frames, first_channel: int, h: int, w: int,
+                        device: torch.device, stream: int = STREAM_GRAIN) -> torch.Tensor:
+    """(len(frames), h, w, 3) counter-RNG normals generated on ``device``."""
+    # Drawn channels-first and returned as a BHWC view, so callers that go
+    # back to NCHW (resizes, blurs) don't pay for a transpose
+    channels = range(first_channel, first_channel + 3)
+    return counter_normal_planes(seed, frames, channels, (h, w), stream, device).permute(0, 2, 3, 1)
+
+
 def generate_perlin_noise(h: int, w: int, scale: float = 1.0, 
-                          octaves: int = 4, seed: int = None) -> np.ndarray:
+                          octaves: int = 4, seed: int = None, frame: int = 0) -> np.ndarray:
     """Generate Perlin-like noise for organic grain texture."""
-    if seed is not None:
-        np.random.seed(seed)
-    
     noise = np.zeros((h, w), dtype=np.float32)
     
     for octave in range(octaves):
@@ -1103,7 +1130,7 @@ def generate_perlin_noise(h: int, w: int, scale: float = 1.0,
         noise_h = max(2, h // int(scale * freq + 1))
         noise_w = max(2, w // int(scale * freq + 1))
         
-        octave_noise = np.random.randn(noise_h, noise_w).astype(np.float32)
+        octave_noise = seeded_normal(seed, frame, octave, (noise_h, noise_w), STREAM_NOISE)
         
         # Resize to full resolution using PIL for exact size
         from PIL import Image as PILImage
@@ -1125,16 +1152,15 @@ def generate_perlin_noise(h: int, w: int, scale: float = 1.0,
 
 
 def generate_gaussian_grain(h: int, w: int, channels: int = 3,
-                            size: float = 1.0, seed: int = None) -> np.ndarray:
-    """Generate Gaussian noise grain."""
-    if seed is not None:
-        np.random.seed(seed)
-    
+                            size: float = 1.0, seed: int = None,
+                            frame: int = 0, first_channel: int = 0) -> np.ndarray:
+    """Generate Gaussian noise grain (channel c keyed as ``first_channel + c``)."""
     # Generate at reduced resolution for larger grain
     grain_h = max(1, int(h / size))
     grain_w = max(1, int(w / size))
     
-    grain = np.random.randn(grain_h, grain_w, channels).astype(np.float32)
+    grain = np.stack([seeded_normal(seed, frame, first_channel + c, (grain_h, grain_w))
+                      for c in range(channels)], axis=-1)
     
     # Resize to full resolution
     if size > 1.0 or grain_h != h or grain_w != w:
@@ -1155,15 +1181,11 @@ def generate_gaussian_grain(h: int, w: int, channels: int = 3,
 
 def generate_film_grain(h: int, w: int, grain_size: float, intensity: float,
                         softness: float, color_response: Dict,
-                        seed: int = None) -> np.ndarray:
+                        seed: int = None, frame: int = 0) -> np.ndarray:
     """Generate realistic film grain with proper characteristics."""
-    if seed is not None:
-        np.random.seed(seed)
-    
-    # Base grain layers
-    fine_grain = generate_gaussian_grain(h, w, 3, grain_size * 0.5, seed)
-    coarse_seed = seed + 1 if seed is not None else None
-    coarse_grain = generate_gaussian_grain(h, w, 3, grain_size * 2.0, coarse_seed)
+    # Base grain layers (fine on channels 0-2, coarse on 3-5 of the frame's stream)
+    fine_grain = generate_gaussian_grain(h, w, 3, grain_size * 0.5, seed, frame, 0)
+    coarse_grain = generate_gaussian_grain(h, w, 3, grain_size * 2.0, seed, frame, 3)
     
     # Combine layers
     grain = fine_grain * 0.7 + coarse_grain * 0.3
@@ -1175,19 +1197,9 @@ def generate_film_grain(h: int, w: int, grain_size: float, intensity: float,
     
     # Apply softness (blur)
     if softness > 0:
-        from PIL import Image as PILImage, ImageFilter
         blur_radius = softness * 2
         if blur_radius > 0.1:
-            for c in range(3):
-                # Normalize to 0-255
-                channel = np.clip((grain[..., c] * 0.5 + 0.5) * 255, 0, 255).astype(np.uint8)
-                channel_pil = PILImage.fromarray(channel)
-                channel_pil = channel_pil.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-                # Ensure exact size after blur
-                if channel_pil.size != (w, h):
-                    channel_pil = channel_pil.resize((w, h), PILImage.BILINEAR)
-                blurred = np.array(channel_pil).astype(np.float32) / 255.0
-                grain[..., c] = (blurred - 0.5) * 2
+            grain = gaussian_blur_array(np.clip(grain, -1, 1), blur_radius)
     
     return grain * intensity
 
@@ -1221,14 +1233,7 @@ def generate_halation(img: np.ndarray, intensity: float = 0.3,
     highlight_mask = np.clip((lum - threshold) / (1 - threshold + 1e-6), 0, 1)
     
     # Blur the mask
-    from PIL import Image as PILImage, ImageFilter
-    mask_uint8 = np.clip(highlight_mask * 255, 0, 255).astype(np.uint8)
-    mask_pil = PILImage.fromarray(mask_uint8)
-    mask_pil = mask_pil.filter(ImageFilter.GaussianBlur(radius=blur_size))
-    # Ensure exact size
-    if mask_pil.size != (w, h):
-        mask_pil = mask_pil.resize((w, h), PILImage.BILINEAR)
-    blurred_mask = np.array(mask_pil).astype(np.float32) / 255.0
+    blurred_mask = gaussian_blur_array(highlight_mask, blur_size)
     
     # Create halation layer
     halation = np.zeros((h, w, 3), dtype=np.float32)
@@ -1338,16 +1343,7 @@ def apply_bloom(img: np.ndarray, intensity: float = 0.1,
     highlights = img * highlight_mask[..., np.newaxis]
     
     # Blur highlights
-    from PIL import Image as PILImage, ImageFilter
-    bloom = np.zeros((h, w, 3), dtype=np.float32)
-    for c in range(3):
-        channel_uint8 = np.clip(highlights[..., c] * 255, 0, 255).astype(np.uint8)
-        channel_pil = PILImage.fromarray(channel_uint8)
-        channel_pil = channel_pil.filter(ImageFilter.GaussianBlur(radius=blur_size))
-        # Ensure exact size
-        if channel_pil.size != (w, h):
-            channel_pil = channel_pil.resize((w, h), PILImage.BILINEAR)
-        bloom[..., c] = np.array(channel_pil).astype(np.float32) / 255.0
+    bloom = gaussian_blur_array(np.clip(highlights[..., :3], 0, 1), blur_size)
     
     return np.clip(img + bloom * intensity, 0, 1)
 
@@ -1365,9 +1361,8 @@ def apply_lens_flare(img: np.ndarray, intensity: float = 0.15,
         return img
     
     # Create flare from bright areas
-    from PIL import Image as PILImage, ImageFilter
-    
     flare = np.zeros((h, w, 3), dtype=np.float32)
+    bright = bright_mask.astype(np.float32)
     
     # Multiple blur passes for flare
     for blur_mult in [1.0, 2.0, 4.0]:
@@ -1375,13 +1370,7 @@ def apply_lens_flare(img: np.ndarray, intensity: float = 0.15,
         if blur_size < 1:
             blur_size = 1
         
-        mask_uint8 = (bright_mask.astype(np.float32) * 255).astype(np.uint8)
-        mask_pil = PILImage.fromarray(mask_uint8)
-        mask_pil = mask_pil.filter(ImageFilter.GaussianBlur(radius=blur_size))
-        # Ensure exact size
-        if mask_pil.size != (w, h):
-            mask_pil = mask_pil.resize((w, h), PILImage.BILINEAR)
-        blurred = np.array(mask_pil).astype(np.float32) / 255.0
+        blurred = gaussian_blur_array(bright, blur_size)
         
         for c in range(3):
             flare[..., c] += blurred * color[c] / blur_mult
@@ -1389,6 +1378,290 @@ def apply_lens_flare(img: np.ndarray, intensity: float = 0.15,
     return np.clip(img + flare * intensity, 0, 1)
 
 
+# =============================================================================
+# GRAIN PLATE BANK
+# =============================================================================
+# Grain is synthesised once per recipe into a tileable plate; each frame then
+# samples the plate with a random toroidal offset and flip. That turns the
+# per-frame cost into a gather instead of noise synthesis and resizing.
+#
+# The plate is at least as large as the frame on both axes, so a frame never
+# shows the same grain twice. Only axes beyond GRAIN_PLATE_MAX_SIZE repeat,
+# with that period; the procedural engine has no period at all.
+
+# (cell size as a multiple of grain_size, weight) per noise layer
+FILM_GRAIN_LAYERS = ((0.5, 0.7), (2.0, 0.3))
+PRO_GRAIN_LAYERS = ((1.0, 0.6), (2.0, 0.3), (4.0, 0.1))
+
+GRAIN_PLATE_MIN_SIZE = 256
+GRAIN_PLATE_MAX_SIZE = 8192
+GRAIN_PLATE_STEP = 256
+GRAIN_PLATE_CACHE_MB = 512
+
+
+def grain_plate_shape(h: int, w: int) -> Tuple[int, int]:
+    """
+    (height, width) of a plate covering an h x w frame, rounded up to
+    GRAIN_PLATE_STEP so nearby resolutions share a plate.
+    """
+    def edge(n):
+        n = -(-int(n) // GRAIN_PLATE_STEP) * GRAIN_PLATE_STEP
+        return int(min(max(n, GRAIN_PLATE_MIN_SIZE), GRAIN_PLATE_MAX_SIZE))
+    return edge(h), edge(w)
+
+
+def _periodic_axis_weights(n: int, size: int):
+    """Bilinear source indices and weights resizing a periodic axis of n to size."""
+    pos = (np.arange(size) + 0.5) * (n / size) - 0.5
+    i0 = np.floor(pos).astype(np.int64)
+    f = (pos - i0).astype(np.float32)
+    i0 %= n
+    return i0, (i0 + 1) % n, f
+
+
+def _periodic_upsample(noise: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Bilinear resize of an (ny, nx, C) array to (*shape, C) on a torus."""
+    if noise.shape[:2] == tuple(shape):
+        return noise
+    r0, r1, fy = _periodic_axis_weights(noise.shape[0], shape[0])
+    c0, c1, fx = _periodic_axis_weights(noise.shape[1], shape[1])
+    rows = noise[r0] * (1 - fy)[:, None, None] + noise[r1] * fy[:, None, None]
+    return rows[:, c0] * (1 - fx)[None, :, None] + rows[:, c1] * fx[None, :, None]
+
+
+def _periodic_gaussian_blur(plate: np.ndarray, sigma: float) -> np.ndarray:
+    """Gaussian blur of an (h, w, C) array with wrap-around edges (via FFT)."""
+    h, w = plate.shape[:2]
+    fy = np.fft.fftfreq(h)[:, None]
+    fx = np.fft.rfftfreq(w)[None, :]
+    response = np.exp(-2 * (math.pi * sigma) ** 2 * (fy ** 2 + fx ** 2))
+    spectrum = np.fft.rfft2(plate, axes=(0, 1)) * response[..., None]
+    return np.fft.irfft2(spectrum, s=(h, w), axes=(0, 1)).astype(np.float32)
+
+
+def generate_grain_plate(shape: Tuple[int, int], grain_size: float, softness: float,
+                         layers=FILM_GRAIN_LAYERS, seed: int = 0) -> np.ndarray:
+    """
+    Tileable unit-intensity RGB grain plate of shape (*shape, 3).
+
+    Each layer is white noise on a periodic lattice with cells of about
+    ``grain_size * multiple`` pixels (at least one), upsampled bilinearly and
+    mixed by weight; softness is a wrap-around Gaussian of sigma
+    ``softness * 2``.
+    """
+    h, w = shape
+    plate = np.zeros((h, w, 3), dtype=np.float32)
+    for index, (multiple, weight) in enumerate(layers):
+        cell = max(grain_size * multiple, 1e-3)
+        cells = (int(min(h, max(1, round(h / cell)))), int(min(w, max(1, round(w / cell)))))
+        noise = counter_normal(seed, 0, index, (*cells, 3), STREAM_GRAIN_PLATE)
+        # Sub-pixel cells average several grains per pixel, which lowers the amplitude
+        plate += _periodic_upsample(noise, (h, w)) * (weight * min(1.0, grain_size * multiple))
+    
+    if softness * 2 > 0.1:
+        plate = _periodic_gaussian_blur(plate, softness * 2)
+    return plate
+
+
+def grain_plate_indices(shape: Tuple[int, int], h: int, w: int, seed: int,
+                        frame: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and column gather indices for one frame's offset/flipped window."""
+    ph, pw = shape
+    oy, ox, flip_y, flip_x = (int(v) for v in counter_bits(seed, frame, 0, 4, STREAM_GRAIN_OFFSET))
+    oy, ox, flip_y, flip_x = oy % ph, ox % pw, flip_y & 1, flip_x & 1
+    rows = (oy + (-1 if flip_y else 1) * np.arange(h)) % ph
+    cols = (ox + (-1 if flip_x else 1) * np.arange(w)) % pw
+    return rows, cols
+
+
+def sample_grain_plate(plate: np.ndarray, h: int, w: int, seed: int,
+                       frame: int) -> np.ndarray:
+    """(h, w, 3) window of ``plate`` for ``frame``."""
+    rows, cols = grain_plate_indices(plate.shape[:2], h, w, seed, frame)
+    return np.take(np.take(plate, rows, axis=0), cols, axis=1)
+
+
+def sample_grain_plate_torch(plate: torch.Tensor, h: int, w: int, seed: int,
+                             frame: int) -> torch.Tensor:
+    """Torch version of sample_grain_plate, gathering on the plate's device."""
+    rows, cols = grain_plate_indices(tuple(plate.shape[:2]), h, w, seed, frame)
+    rows = torch.from_numpy(rows).to(plate.device)
+    cols = torch.from_numpy(cols).to(plate.device)
+    return plate.index_select(0, rows).index_select(1, cols)
+
+
+class GrainPlateBank:
+    """
+    Process-wide LRU of grain plates keyed by (stock, grain size, softness,
+    layers, seed, plate shape).
+
+    Plates are held in RAM up to ``max_mb``; device copies are made on demand
+    and dropped with the plate. When a cache directory is given, plates are
+    also written there as .npy and reloaded instead of regenerated.
+    """
+    
+    def __init__(self, max_mb: float = GRAIN_PLATE_CACHE_MB):
+        self.max_mb = max_mb
+        self._plates = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, stock: str, grain_size: float, softness: float, seed: int,
+            shape: Tuple[int, int], layers=FILM_GRAIN_LAYERS, cache_dir: str = "",
+            device: Optional[torch.device] = None):
+        """Plate as a read-only numpy array, or a tensor when ``device`` is set."""
+        key = (str(stock), round(float(grain_size), 4), round(float(softness), 4),
+               tuple(tuple(layer) for layer in layers), int(seed), tuple(int(n) for n in shape))
+        
+        with self._lock:
+            entry = self._plates.get(key)
+            if entry is None:
+                plate = self._load_or_generate(key, cache_dir)
+                plate.setflags(write=False)
+                entry = {"plate": plate, "tensors": {}}
+                self._plates[key] = entry
+                self._evict()
+            self._plates.move_to_end(key)
+            
+            if device is None:
+                return entry["plate"]
+            tensor = entry["tensors"].get(str(device))
+            if tensor is None:
+                tensor = torch.from_numpy(entry["plate"].copy()).to(device)
+                entry["tensors"][str(device)] = tensor
+            return tensor
+    
+    def _load_or_generate(self, key, cache_dir: str) -> np.ndarray:
+        stock, grain_size, softness, layers, seed, shape = key
+        path = None
+        if cache_dir:
+            digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+            path = os.path.join(cache_dir, f"grain_plate_{shape[0]}x{shape[1]}_{digest}.npy")
+            if os.path.exists(path):
+                try:
+                    plate = np.load(path)
+                    if plate.shape == (*shape, 3):
+                        return plate.astype(np.float32, copy=False)
+                except (OSError, ValueError) as e:
+                    print(f"[FXTD Grain] Ignoring unreadable plate cache {path}: {e}")
+        
+        plate = generate_grain_plate(shape, grain_size, softness, layers, seed)
+        
+        if path is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+                np.save(tmp_path, plate)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[FXTD Grain] Could not write plate cache {path}: {e}")
+        return plate
+    
+    def _evict(self):
+        limit = self.max_mb * 1024 * 1024
+        total = sum(e["plate"].nbytes for e in self._plates.values())
+        while total > limit and len(self._plates) > 1:
+            _, oldest = self._plates.popitem(last=False)
+            total -= oldest["plate"].nbytes
+    
+    def clear(self):
+        with self._lock:
+            self._plates.clear()
+
+
+GRAIN_PLATE_BANK = GrainPlateBank()
+
+
+# =============================================================================
+# BATCHED TORCH GRAIN
+# =============================================================================
+# Whole-batch torch versions of the grain helpers above, on any device. The
+# numpy functions stay the per-frame reference; these match them except for
+# the 8-bit round trips the numpy resizes go through.
+
+# Full-frame buffers alive at once in FXTDFilmGrain's torch stack
+FILM_GRAIN_WORKING_SET_FACTOR = 8
+
+
+def sample_grain_plate_batch_torch(plate: torch.Tensor, h: int, w: int, seed: int,
+                                   frames: List[int]) -> torch.Tensor:
+    """(len(frames), h, w, 3) plate windows in a single gather."""
+    indices = [grain_plate_indices(tuple(plate.shape[:2]), h, w, seed, f) for f in frames]
+    rows = torch.from_numpy(np.stack([r for r, _ in indices])).to(plate.device)
+    cols = torch.from_numpy(np.stack([c for _, c in indices])).to(plate.device)
+    return plate[rows[:, :, None], cols[:, None, :]]
+
+
+def channel_grain_torch(h: int, w: int, sizes: Tuple[float, ...], seed: int, frames: List[int],
+                        device: torch.device, first_channel: int = 0) -> torch.Tensor:
+    """
+    Batched generate_gaussian_grain with a grain size per channel, shape
+    (len(frames), h, w, len(sizes)). Channels sharing a grain resolution are
+    drawn for the whole batch in one counter-RNG call.
+    """
+    groups = OrderedDict()
+    for c, size in enumerate(sizes):
+        key = (max(1, int(h / size)), max(1, int(w / size)), size > 1.0)
+        groups.setdefault(key, []).append(c)
+    
+    grain = None
+    for (grain_h, grain_w, upsized), chans in groups.items():
+        planes = counter_normal_planes(seed, frames, [first_channel + c for c in chans],
+                                       (grain_h, grain_w), STREAM_GRAIN, device)
+        if upsized or grain_h != h or grain_w != w:
+            planes = torch.nn.functional.interpolate(
+                planes.clamp(-1, 1), size=(h, w), mode='bilinear',
+                align_corners=False, antialias=grain_h > h or grain_w > w)
+        if len(groups) == 1:
+            grain = planes
+        else:
+            if grain is None:
+                grain = torch.empty((len(frames), len(sizes), h, w), device=device)
+            grain[:, chans] = planes
+    return grain.permute(0, 2, 3, 1)
+
+
+def gaussian_grain_torch(h: int, w: int, size: float, seed: int, frames: List[int],
+                         first_channel: int, device: torch.device) -> torch.Tensor:
+    """Batched generate_gaussian_grain for 3 channels."""
+    return channel_grain_torch(h, w, (size,) * 3, seed, frames, device, first_channel)
+
+
+def film_grain_torch(h: int, w: int, grain_size: float, intensity: float, softness: float,
+                     color_response: Dict, seed: int, frames: List[int],
+                     device: torch.device) -> torch.Tensor:
+    """Batched generate_film_grain, (len(frames), h, w, 3)."""
+    grain = (gaussian_grain_torch(h, w, grain_size * 0.5, seed, frames, 0, device) * 0.7 +
+             gaussian_grain_torch(h, w, grain_size * 2.0, seed, frames, 3, device) * 0.3)
+    grain = grain * torch.tensor([color_response.get('r', 1.0), color_response.get('g', 1.0),
+                                  color_response.get('b', 1.0)], device=device)
+    if softness * 2 > 0.1:
+        grain = gaussian_blur(grain.clamp(-1, 1), softness * 2)
+    return grain * intensity
+
+
+def luminance_torch(img: torch.Tensor) -> torch.Tensor:
+    """Rec.709 luminance of a BHWC tensor."""
+    return 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
+
+
+def luminance_response_torch(grain: torch.Tensor, luminance: torch.Tensor,
+                             shadow_boost: float = 1.5,
+                             highlight_protection: float = 0.8) -> torch.Tensor:
+    """Batched apply_luminance_response."""
+    shadow_mask = torch.clamp(1.0 - luminance, 0, 1) ** 0.5
+    highlight_mask = torch.clamp(luminance, 0, 1) ** 2
+    response = shadow_mask * shadow_boost - highlight_mask * (1 - highlight_protection)
+    return grain * torch.clamp(response, 0.2, 2.0).unsqueeze(-1)
+
+
+def halation_torch(img: torch.Tensor, intensity: float = 0.3, threshold: float = 0.8,
+                   color: Tuple = (1.0, 0.3, 0.2), blur_size: int = 50) -> torch.Tensor:
+    """Batched generate_halation."""
+    highlight_mask = torch.clamp((luminance_torch(img) - threshold) / (1 - threshold + 1e-6), 0, 1)
+    blurred_mask = gaussian_blur(highlight_mask.unsqueeze(-1), blur_size)
+    return blurred_mask * torch.tensor(color, device=img.device, dtype=img.dtype) * intensity
+
+
 # =============================================================================
 # MAIN COMFYUI NODES
 # =============================================================================
@@ -1478,6 +1751,19 @@ class FXTDFilmGrain:
                 }),
                 "animate_grain": ("BOOLEAN", {"default": True}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
+                "grain_engine": (["procedural", "plate bank"], {
+                    "tooltip": "procedural: synthesise fresh noise every frame; plate bank: sample a cached tileable grain plate covering the frame (faster, repeats only beyond 8192 px)"
+                }),
+                "grain_cache_dir": ("STRING", {
+                    "default": "",
+                    "tooltip": "Optional directory to persist grain plates as .npy"
+                }),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
             }
         }
     
@@ -1493,10 +1779,11 @@ class FXTDFilmGrain:
                     green_grain: float = 1.0, blue_grain: float = 1.0,
                     shadow_grain_boost: float = 1.5, highlight_protection: float = 0.8,
                     halation_intensity: float = 0.0, seed: int = 0,
-                    animate_grain: bool = True, use_gpu: bool = True):
+                    animate_grain: bool = True, use_gpu: bool = True,
+                    grain_engine: str = "procedural", grain_cache_dir: str = "",
+                    frame_offset: int = 0):
         
         batch_size = image.shape[0]
-        results = []
         
         # Get presets
         camera_params = CAMERA_PRESETS.get(camera_preset, {})
@@ -1528,124 +1815,71 @@ class FXTDFilmGrain:
             final_highlight = highlight_protection
             final_halation = halation_intensity
         
-        # Try GPU path
-        if use_gpu and torch.cuda.is_available():
-            try:
-                device = torch.device("cuda")
-                img_gpu = image.to(device).float()
-                batch, h, w, c = img_gpu.shape
-                
-                # Generate GPU grain for all frames at once
-                torch.manual_seed(seed)
-                
-                # Generate multi-scale grain on GPU
-                grain_fine = torch.randn(batch, h, w, 3, device=device) * 0.7
-                grain_coarse = torch.randn(batch, h // 2, w // 2, 3, device=device)
-                grain_coarse = torch.nn.functional.interpolate(
-                    grain_coarse.permute(0, 3, 1, 2), size=(h, w), mode='bilinear', align_corners=False
-                ).permute(0, 2, 3, 1) * 0.3
-                grain = grain_fine + grain_coarse
-                
-                # Apply color response
-                color_r = torch.tensor(color_grain.get('r', 1.0), device=device)
-                color_g = torch.tensor(color_grain.get('g', 1.0), device=device)
-                color_b = torch.tensor(color_grain.get('b', 1.0), device=device)
-                grain[..., 0] *= color_r
-                grain[..., 1] *= color_g
-                grain[..., 2] *= color_b
-                
-                # Apply intensity
-                grain = grain * final_intensity
-                
-                # Calculate luminance for response
-                luminance = 0.2126 * img_gpu[..., 0] + 0.7152 * img_gpu[..., 1] + 0.0722 * img_gpu[..., 2]
-                
-                # Luminance response: more grain in shadows
-                shadow_mask = torch.pow(1.0 - torch.clamp(luminance, 0, 1), 0.5)
-                highlight_mask = torch.pow(torch.clamp(luminance, 0, 1), 2.0)
-                response = shadow_mask * final_shadow - highlight_mask * (1 - final_highlight)
-                response = torch.clamp(response, 0.2, 2.0).unsqueeze(-1)
-                
-                grain = grain * response
-                
-                # Add grain
-                output = img_gpu[..., :3] + grain
-                
-                # Clamp result
-                output = torch.clamp(output, 0, 1)
-                
-                # Handle alpha
-                if c == 4:
-                    output = torch.cat([output, img_gpu[..., 3:4]], dim=-1)
-                
-                return (output.cpu(),)
-                
-            except RuntimeError:
-                torch.cuda.empty_cache()
+        # Sequence frame numbers key the grain RNG; static grain reuses frame 0
+        frames = [frame_offset + b if animate_grain else 0 for b in range(batch_size)]
+        use_plates = grain_engine == "plate bank"
+        stock_label = film_stock if film_stock != "None" else camera_preset
+        plate_shape = grain_plate_shape(image.shape[1], image.shape[2])
         
-        # CPU fallback
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
-            h, w = img.shape[:2]
-            
-            # Handle alpha
-            has_alpha = img.shape[-1] == 4
-            if has_alpha:
-                alpha = img[..., 3:4]
-                img = img[..., :3]
-            
-            # Calculate luminance for response curve
-            luminance = 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
-            
-            # Generate grain
-            frame_seed = seed + b if animate_grain else seed
-            grain = generate_film_grain(h, w, final_size, final_intensity,
-                                       final_softness, color_grain, frame_seed)
-            
-            # Apply luminance response
-            grain = apply_luminance_response(grain, luminance, 
-                                            final_shadow, final_highlight)
+        color_shift = film_params.get('color_shift') if film_stock != "None" and film_params else None
+        
+        def process_chunk(img, chunk_frames):
+            """Grain, halation and stock colour on a float BHWC chunk, on its device."""
+            device = img.device
+            h, w = img.shape[1], img.shape[2]
+            rgb = img[..., :3]
+            luminance = luminance_torch(rgb)
+            
+            if use_plates:
+                plate = GRAIN_PLATE_BANK.get(stock_label, final_size, final_softness, seed,
+                                             plate_shape, cache_dir=grain_cache_dir, device=device)
+                color_scale = torch.tensor([color_grain.get('r', 1.0), color_grain.get('g', 1.0),
+                                            color_grain.get('b', 1.0)], device=device)
+                grain = sample_grain_plate_batch_torch(plate, h, w, seed, chunk_frames)
+                grain = grain * (color_scale * final_intensity)
+            else:
+                grain = film_grain_torch(h, w, final_size, final_intensity, final_softness,
+                                         color_grain, seed, chunk_frames, device)
             
-            # Add grain
-            output = img + grain
+            output = rgb + luminance_response_torch(grain, luminance, final_shadow, final_highlight)
             
-            # Apply halation if enabled
             if final_halation > 0:
-                halation = generate_halation(img, final_halation, 0.75)
-                output = output + halation
-            
-            # Apply film stock color shifts if applicable
-            if film_stock != "None" and film_params and 'color_shift' in film_params:
-                color_shift = film_params['color_shift']
-                # Shadow shift
-                shadow_mask = (1 - luminance)[..., np.newaxis]
-                shadow_shift = np.array(color_shift['shadows'])
-                output = output * (1 + (shadow_shift - 1) * shadow_mask * 0.3)
-                
-                # Highlight shift
-                highlight_mask = luminance[..., np.newaxis]
-                highlight_shift = np.array(color_shift['highlights'])
-                output = output * (1 + (highlight_shift - 1) * highlight_mask * 0.3)
+                output = output + halation_torch(rgb, final_halation, 0.75)
+            
+            # Film stock colour shifts, contrast and saturation
+            if color_shift is not None:
+                lum = luminance.unsqueeze(-1)
+                shadow_shift = torch.tensor(color_shift['shadows'], device=device, dtype=output.dtype)
+                output = output * (1 + (shadow_shift - 1) * (1 - lum) * 0.3)
+                highlight_shift = torch.tensor(color_shift['highlights'], device=device, dtype=output.dtype)
+                output = output * (1 + (highlight_shift - 1) * lum * 0.3)
                 
-                # Apply contrast and saturation
                 if 'contrast' in film_params:
-                    mid = 0.5
-                    output = mid + (output - mid) * film_params['contrast']
+                    output = 0.5 + (output - 0.5) * film_params['contrast']
                 
                 if 'saturation' in film_params and film_params['saturation'] != 1.0:
-                    lum_out = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    output = lum_out[..., np.newaxis] + (output - lum_out[..., np.newaxis]) * film_params['saturation']
-            
-            output = np.clip(output, 0, 1)
-            
-            # Restore alpha
-            if has_alpha:
-                output = np.concatenate([output, alpha], axis=-1)
+                    lum_out = luminance_torch(output).unsqueeze(-1)
+                    output = lum_out + (output - lum_out) * film_params['saturation']
             
-            results.append(output)
+            output = torch.clamp(output, 0, 1)
+            if img.shape[-1] == 4:
+                output = torch.cat([output, img[..., 3:4]], dim=-1)
+            return output
         
-        output_tensor = torch.from_numpy(np.stack(results, axis=0)).float()
-        return (output_tensor,)
+        def run_on(device):
+            h, w, c = image.shape[1], image.shape[2], image.shape[3]
+            chunk = effect_chunk_frames(h, w, c, device, working_set=FILM_GRAIN_WORKING_SET_FACTOR)
+            return stream_frame_chunks(image, frames, process_chunk, device, chunk)[0]
+        
+        if use_gpu and torch.cuda.is_available():
+            try:
+                return (run_on(torch.device("cuda")),)
+            except RuntimeError as e:
+                print(f"[FXTD Film Grain] GPU error, falling back to CPU: {e}")
+                torch.cuda.empty_cache()
+        
+        with torch_cpu_threads():
+            return (run_on(torch.device("cpu")),)
 
 
 # Helper for lens distortion
@@ -1691,39 +1925,129 @@ def apply_lens_distortion_torch(image_tensor: torch.Tensor, k1: float, k2: float
     """
     b, c, h, w = image_tensor.shape
     device = image_tensor.device
+    dtype = image_tensor.dtype
     
-    # Create grid
-    y, x = torch.meshgrid(torch.linspace(-1, 1, h, device=device), torch.linspace(-1, 1, w, device=device))
-    
-    # Radius squared from center
-    r2 = x**2 + y**2
+    def build():
+        y, x = linspace_grid(h, w, device, dtype)
+        
+        # Radius squared from center
+        r2 = x**2 + y**2
+        
+        # Distortion factor
+        factor = 1.0 + k1 * r2 + k2 * (r2**2)
+        
+        # Distort coordinates (inverse mapping logic: where do we sample FROM)
+        # If k1 > 0 (pincushion), factor > 1, so we sample further out (zooming in, pincushion)
+        # Effectively: x_distorted = x * factor
+        
+        # Note: For grid_sample, grid holds sampling coordinates.
+        # If we want barrel distortion (bulge out), we need to sample from closer to center?
+        # No, barrel means corners are squeezed in.
+        
+        # Let's stick to simple model:
+        # Source coords (u, v) = Target coords (x, y) * (1 + k*r^2)
+        
+        grid_x = x * factor
+        grid_y = y * factor
+        
+        # Stack
+        return torch.stack((grid_x, grid_y), dim=-1).unsqueeze(0)  # 1, H, W, 2
     
-    # Distortion factor
-    factor = 1.0 + k1 * r2 + k2 * (r2**2)
+    grid = cached_grid("lens_distortion", h, w, device, dtype, (k1, k2), build)
+    grid = grid.expand(b, -1, -1, -1) # B, H, W, 2
     
-    # Distort coordinates (inverse mapping logic: where do we sample FROM)
-    # If k1 > 0 (pincushion), factor > 1, so we sample further out (zooming in, pincushion)
-    # Effectively: x_distorted = x * factor
+    # Sample
+    # align_corners=True matches standard definition usually
+    distorted = torch.nn.functional.grid_sample(image_tensor, grid, mode='bilinear', padding_mode='reflection', align_corners=True)
     
-    # Note: For grid_sample, grid holds sampling coordinates.
-    # If we want barrel distortion (bulge out), we need to sample from closer to center?
-    # No, barrel means corners are squeezed in.
+    return distorted
+
+
+# =============================================================================
+# BATCHED LENS PIPELINE
+# =============================================================================
+# Torch versions of the numpy lens effects, run on whole chunks of frames in
+# float32 with no 8-bit PIL round trips. Everything that depends only on the
+# frame size (CA sampling grids, vignette mask, flare tint) is built once per
+# resolution and kept in the shared sampling grid cache (GRID_CACHE).
+
+# Full-frame float32 buffers alive at once in the lens stack (frame, CA
+# samples, bloom highlights and blur, flare halos)
+LENS_EFFECTS_WORKING_SET_FACTOR = 10
+
+# Flare halo widths as fractions of the short frame edge; each level is
+# weighted by 1 / multiplier
+LENS_FLARE_LEVELS = (1.0, 2.0, 4.0)
+
+
+def lens_vignette_mask_torch(h: int, w: int, strength: float, falloff: float,
+                             device: torch.device) -> torch.Tensor:
+    """apply_vignette's mask as a cached (1, H, W, 1) tensor."""
+    def build():
+        y = (torch.arange(h, device=device, dtype=torch.float32) - h // 2) / (h / 2)
+        x = (torch.arange(w, device=device, dtype=torch.float32) - w // 2) / (w / 2)
+        dist = torch.sqrt(y.view(h, 1) ** 2 + x.view(1, w) ** 2)
+        return (1 - torch.clamp(dist ** falloff * strength, 0, 1)).view(1, h, w, 1)
+    return cached_grid("lens_vignette", h, w, device, torch.float32, (strength, falloff), build)
+
+
+def chromatic_aberration_torch(img: torch.Tensor, strength: float) -> torch.Tensor:
+    """
+    Batched apply_chromatic_aberration on BHWC RGB: red is zoomed in by
+    strength %, blue zoomed out with the uncovered border keeping the
+    original blue. Both channels go through one grid_sample.
+    """
+    if strength < 0.001:
+        return img
+    b, h, w, _ = img.shape
+    scales = (1 + strength * 0.01, 1 - strength * 0.01)
     
-    # Let's stick to simple model:
-    # Source coords (u, v) = Target coords (x, y) * (1 + k*r^2)
+    def build():
+        grid = geometry_warp_grid(h, w, channel_scales=scales, device=img.device)
+        blue_outside = (grid[1].abs() > 1).any(dim=-1)
+        return grid, blue_outside.view(1, h, w)
+    grid, blue_outside = cached_grid("lens_ca", h, w, img.device, torch.float32, (strength,), build)
     
-    grid_x = x * factor
-    grid_y = y * factor
+    source = img[..., 0:3:2].permute(0, 3, 1, 2).reshape(b * 2, 1, h, w)
+    sampled = torch.nn.functional.grid_sample(
+        source, grid.to(img.dtype).repeat(b, 1, 1, 1), mode='bilinear',
+        padding_mode='border', align_corners=False).view(b, 2, h, w)
     
-    # Stack
-    grid = torch.stack((grid_x, grid_y), dim=-1) # H, W, 2
-    grid = grid.unsqueeze(0).expand(b, -1, -1, -1) # B, H, W, 2
+    output = img.clone()
+    output[..., 0] = sampled[:, 0]
+    output[..., 2] = torch.where(blue_outside, img[..., 2], sampled[:, 1])
+    return torch.clamp(output, 0, 1)
+
+
+def bloom_torch(img: torch.Tensor, intensity: float = 0.1, threshold: float = 0.8,
+                blur_size: int = 30) -> torch.Tensor:
+    """Batched apply_bloom."""
+    highlight_mask = torch.clamp((luminance_torch(img) - threshold) / (1 - threshold + 1e-6), 0, 1)
+    highlights = torch.clamp(img[..., :3] * highlight_mask.unsqueeze(-1), 0, 1)
+    return torch.clamp(img + gaussian_blur(highlights, blur_size) * intensity, 0, 1)
+
+
+def lens_flare_torch(img: torch.Tensor, intensity: float = 0.15,
+                     color: Tuple = (1.0, 0.9, 0.7), threshold: float = 0.9) -> torch.Tensor:
+    """
+    Batched apply_lens_flare. The bright-pixel mask is blurred once per halo
+    level and the levels are mixed into RGB with a cached (levels, 3) tint.
+    """
+    b, h, w, _ = img.shape
     
-    # Sample
-    # align_corners=True matches standard definition usually
-    distorted = torch.nn.functional.grid_sample(image_tensor, grid, mode='bilinear', padding_mode='reflection', align_corners=True)
+    def build():
+        sigmas = [max(1, int(min(w, h) * 0.05 * m)) for m in LENS_FLARE_LEVELS]
+        tint = torch.tensor([[c / m for c in color] for m in LENS_FLARE_LEVELS],
+                            device=img.device, dtype=torch.float32)
+        return sigmas, tint
+    sigmas, tint = cached_grid("lens_flare", h, w, img.device, torch.float32, tuple(color), build)
     
-    return distorted
+    bright = (luminance_torch(img) > threshold).to(img.dtype).unsqueeze(-1)
+    halos = torch.cat([gaussian_blur(bright, sigma) for sigma in sigmas], dim=-1)
+    flare = torch.matmul(halos, tint.to(img.dtype))
+    # Frames without bright spots pass through untouched, as in the numpy path
+    has_flare = (bright.flatten(1) > 0).any(dim=1).view(b, 1, 1, 1)
+    return torch.where(has_flare, torch.clamp(img + flare * intensity, 0, 1), img)
 
 
 class FXTDLensEffects:
@@ -1813,10 +2137,10 @@ class FXTDLensEffects:
                       distortion: float = 0.0,
                       vignette_strength: float = 0.25, vignette_falloff: float = 2.0,
                       bloom_intensity: float = 0.1, bloom_threshold: float = 0.8,
-                      flare_intensity: float = 0.0, apply_color_cast: bool = True):
+                      flare_intensity: float = 0.0, apply_color_cast: bool = True,
+                      use_gpu: bool = True):
         
-        batch_size = image.shape[0]
-        results = []
+        frames = list(range(image.shape[0]))
         
         # Get lens preset
         lens_params = LENS_PRESETS.get(lens_preset, {})
@@ -1842,60 +2166,50 @@ class FXTDLensEffects:
             flare_color = (1.0, 0.9, 0.7)
             color_cast = (1.0, 1.0, 1.0)
         
-        # Apply distortion using Torch if possible (faster/cleaner)
-        if abs(final_dist) > 0.001:
-             try:
-                 # Permute to BCHW
-                 img_tensor = image.permute(0, 3, 1, 2)
-                 distorted = apply_lens_distortion_torch(img_tensor, final_dist)
-                 # Back to BHWC
-                 image = distorted.permute(0, 2, 3, 1)
-             except Exception as e:
-                 print(f"Distortion failed: {e}")
-
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
+        def process_chunk(img, chunk_frames):
+            if abs(final_dist) > 0.001:
+                img = apply_lens_distortion_torch(img.permute(0, 3, 1, 2), final_dist).permute(0, 2, 3, 1)
             
-            # Handle alpha
-            has_alpha = img.shape[-1] == 4
-            if has_alpha:
-                alpha = img[..., 3:4]
-                img = img[..., :3]
-            
-            output = img.copy()
+            output = img[..., :3]
             
-            # Apply chromatic aberration
             if final_ca > 0.01:
-                output = apply_chromatic_aberration(output, final_ca)
+                output = chromatic_aberration_torch(output, final_ca)
             
-            # Apply bloom
             if final_bloom > 0.01:
-                output = apply_bloom(output, final_bloom, final_bloom_thresh)
+                output = bloom_torch(output, final_bloom, final_bloom_thresh)
             
-            # Apply lens flare
             if final_flare > 0.01:
-                output = apply_lens_flare(output, final_flare, flare_color)
+                output = lens_flare_torch(output, final_flare, flare_color)
             
-            # Apply vignette
             if final_vignette > 0.01:
-                output = apply_vignette(output, final_vignette, final_vfalloff)
+                h, w = output.shape[1:3]
+                output = output * lens_vignette_mask_torch(h, w, final_vignette, final_vfalloff,
+                                                           output.device)
             
-            # Apply color cast
             if apply_color_cast and lens_preset != "Custom":
-                output[..., 0] *= color_cast[0]
-                output[..., 1] *= color_cast[1]
-                output[..., 2] *= color_cast[2]
+                output = output * torch.tensor(color_cast, device=output.device, dtype=output.dtype)
             
-            output = np.clip(output, 0, 1)
+            output = torch.clamp(output, 0, 1)
             
             # Restore alpha
-            if has_alpha:
-                output = np.concatenate([output, alpha], axis=-1)
-            
-            results.append(output)
+            if img.shape[-1] == 4:
+                output = torch.cat([output, img[..., 3:4]], dim=-1)
+            return output
         
-        output_tensor = torch.from_numpy(np.stack(results, axis=0)).float()
-        return (output_tensor,)
+        def run_on(device):
+            h, w, c = image.shape[1], image.shape[2], image.shape[3]
+            chunk = effect_chunk_frames(h, w, c, device, working_set=LENS_EFFECTS_WORKING_SET_FACTOR)
+            return stream_frame_chunks(image, frames, process_chunk, device, chunk)[0]
+        
+        if use_gpu and torch.cuda.is_available():
+            try:
+                return (run_on(torch.device("cuda")),)
+            except RuntimeError as e:
+                print(f"[FXTD Lens Effects] GPU error, falling back to CPU: {e}")
+                torch.cuda.empty_cache()
+        
+        with torch_cpu_threads():
+            return (run_on(torch.device("cpu")),)
 
 
 class FXTDFilmLook:
@@ -2074,8 +2388,8 @@ class FXTDFilmLook:
             
             # Generate and apply grain
             if g_intensity > 0.001:
-                frame_seed = seed + b if animate else seed
-                grain = generate_film_grain(h, w, g_size, g_intensity, g_softness, g_color, frame_seed)
+                grain = generate_film_grain(h, w, g_size, g_intensity, g_softness, g_color,
+                                            seed, b if animate else 0)
                 grain = apply_luminance_response(grain, luminance, g_shadow, g_highlight)
                 output = output + grain
             
@@ -2183,6 +2497,13 @@ class FXTDFilmGrainAdvanced:
                 "seed": ("INT", {"default": 0, "min": 0, "max": 2147483647}),
                 "animate": ("BOOLEAN", {"default": True}),
                 "temporal_variation": ("FLOAT", {"default": 0.1, "min": 0.0, "max": 1.0, "step": 0.05}),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
+                "use_gpu": ("BOOLEAN", {"default": True}),
             }
         }
     
@@ -2202,109 +2523,64 @@ class FXTDFilmGrainAdvanced:
                              halation_threshold: float = 0.8, halation_size: int = 50,
                              halation_red: float = 1.0, halation_green: float = 0.3,
                              halation_blue: float = 0.2, seed: int = 0,
-                             animate: bool = True, temporal_variation: float = 0.1):
+                             animate: bool = True, temporal_variation: float = 0.1,
+                             frame_offset: int = 0, use_gpu: bool = True):
         
         batch_size = image.shape[0]
-        results = []
+        frames = [frame_offset + b if animate else 0 for b in range(batch_size)]
+        sizes = (grain_size * red_size, grain_size * green_size, grain_size * blue_size)
+        softness = (1 - grain_roughness) * 0.5
         
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
-            h, w = img.shape[:2]
-            
-            # Handle alpha
-            has_alpha = img.shape[-1] == 4
-            if has_alpha:
-                alpha = img[..., 3:4]
-                img = img[..., :3]
-            
-            # Calculate luminance
-            luminance = 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
+        def process_chunk(img, chunk_frames):
+            """Per-channel grain, response and halation on a float BHWC chunk."""
+            device = img.device
+            rgb = img[..., :3]
+            luminance = luminance_torch(rgb)
             
-            # Generate per-channel grain
-            frame_seed = seed + b if animate else seed
+            # R, G and B grain (channels 0-2 of each frame's stream) in one draw
+            grain = channel_grain_torch(rgb.shape[1], rgb.shape[2], sizes, seed, chunk_frames, device)
             
-            # Red channel grain
-            grain_r = generate_gaussian_grain(h, w, 1, grain_size * red_size, frame_seed)[..., 0]
-            grain_r *= red_amount
-            
-            # Green channel grain
-            grain_g = generate_gaussian_grain(h, w, 1, grain_size * green_size, frame_seed + 1000)[..., 0]
-            grain_g *= green_amount
-            
-            # Blue channel grain
-            grain_b = generate_gaussian_grain(h, w, 1, grain_size * blue_size, frame_seed + 2000)[..., 0]
-            grain_b *= blue_amount
-            
-            # Apply roughness (softness)
-            softness = (1 - grain_roughness) * 0.5
+            # Roughness softens all three channels in one float blur
             if softness > 0.01:
-                from PIL import Image as PILImage, ImageFilter
-                blur_radius = softness * 2
-                
-                # Process red channel
-                channel = np.clip((grain_r * 0.5 + 0.5) * 255, 0, 255).astype(np.uint8)
-                channel_pil = PILImage.fromarray(channel)
-                channel_pil = channel_pil.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-                if channel_pil.size != (w, h):
-                    channel_pil = channel_pil.resize((w, h), PILImage.BILINEAR)
-                grain_r = (np.array(channel_pil).astype(np.float32) / 255.0 - 0.5) * 2
-                
-                # Process green channel
-                channel = np.clip((grain_g * 0.5 + 0.5) * 255, 0, 255).astype(np.uint8)
-                channel_pil = PILImage.fromarray(channel)
-                channel_pil = channel_pil.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-                if channel_pil.size != (w, h):
-                    channel_pil = channel_pil.resize((w, h), PILImage.BILINEAR)
-                grain_g = (np.array(channel_pil).astype(np.float32) / 255.0 - 0.5) * 2
-                
-                # Process blue channel
-                channel = np.clip((grain_b * 0.5 + 0.5) * 255, 0, 255).astype(np.uint8)
-                channel_pil = PILImage.fromarray(channel)
-                channel_pil = channel_pil.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-                if channel_pil.size != (w, h):
-                    channel_pil = channel_pil.resize((w, h), PILImage.BILINEAR)
-                grain_b = (np.array(channel_pil).astype(np.float32) / 255.0 - 0.5) * 2
-            
-            # Stack grain
-            grain = np.stack([grain_r, grain_g, grain_b], axis=-1) * grain_amount
-            
-            # Apply luminance-based response
-            shadow_mask = np.clip((0.25 - luminance) / 0.25, 0, 1)
-            midtone_mask = 1 - np.abs(luminance - 0.5) * 2
-            highlight_mask = np.clip((luminance - 0.75) / 0.25, 0, 1)
-            
-            response = (shadow_mask * shadow_strength + 
-                       midtone_mask * midtone_strength + 
-                       highlight_mask * highlight_strength)
-            response = np.clip(response, 0.1, 3.0)
-            
-            grain = grain * response[..., np.newaxis]
-            
-            # Temporal variation
+                grain = gaussian_blur(grain.clamp(-1, 1), softness * 2)
+            
+            # Shadow / midtone / highlight response, per-channel amounts and
+            # per-frame temporal variation folded into one scale
+            response = torch.clamp(
+                torch.clamp((0.25 - luminance) / 0.25, 0, 1) * shadow_strength +
+                (1 - (luminance - 0.5).abs() * 2) * midtone_strength +
+                torch.clamp((luminance - 0.75) / 0.25, 0, 1) * highlight_strength,
+                0.1, 3.0).unsqueeze(-1)
+            scale = torch.tensor([red_amount, green_amount, blue_amount], device=device) * grain_amount
             if animate and temporal_variation > 0:
-                temporal_noise = np.random.randn() * temporal_variation
-                grain = grain * (1 + temporal_noise)
-            
-            # Apply grain
-            output = img + grain
+                temporal = counter_normal_planes(seed, chunk_frames, [0], (), STREAM_NOISE, device)
+                scale = scale * (1 + temporal * temporal_variation).view(-1, 1, 1, 1)
+            output = rgb + grain * scale * response
             
-            # Apply halation
             if halation_amount > 0:
-                halation_color = (halation_red, halation_green, halation_blue)
-                halation = generate_halation(img, halation_amount, halation_threshold,
-                                           halation_color, halation_size)
-                output = output + halation
-            
-            output = np.clip(output, 0, 1)
-            
-            # Restore alpha
-            if has_alpha:
-                output = np.concatenate([output, alpha], axis=-1)
-            
-            results.append(output)
+                output = output + halation_torch(rgb, halation_amount, halation_threshold,
+                                                 (halation_red, halation_green, halation_blue),
+                                                 halation_size)
+            
+            output = torch.clamp(output, 0, 1)
+            if img.shape[-1] == 4:
+                output = torch.cat([output, img[..., 3:4]], dim=-1)
+            return output
         
-        output_tensor = torch.from_numpy(np.stack(results, axis=0)).float()
-        return (output_tensor,)
+        def run_on(device):
+            h, w, c = image.shape[1], image.shape[2], image.shape[3]
+            chunk = effect_chunk_frames(h, w, c, device, working_set=FILM_GRAIN_WORKING_SET_FACTOR)
+            return stream_frame_chunks(image, frames, process_chunk, device, chunk)[0]
+        
+        if use_gpu and torch.cuda.is_available():
+            try:
+                return (run_on(torch.device("cuda")),)
+            except RuntimeError as e:
+                print(f"[FXTD Grain Advanced] GPU error, falling back to CPU: {e}")
+                torch.cuda.empty_cache()
+        
+        with torch_cpu_threads():
+            return (run_on(torch.device("cpu")),)
 
 
 # =============================================================================
@@ -2454,53 +2730,12 @@ MASTER_FILM_PRESETS = {
 
 def gpu_gaussian_blur_2d(tensor: torch.Tensor, sigma: float, 
                          kernel_size: int = None) -> torch.Tensor:
-    """GPU-accelerated 2D Gaussian blur using separable convolution."""
-    if sigma < 0.1:
-        return tensor
-    
-    if kernel_size is None:
-        kernel_size = int(sigma * 6) | 1  # Ensure odd
-        kernel_size = max(3, min(kernel_size, 31))
-    
-    device = tensor.device
-    dtype = tensor.dtype
-    
-    # Create 1D Gaussian kernel
-    x = torch.arange(kernel_size, device=device, dtype=dtype) - kernel_size // 2
-    kernel_1d = torch.exp(-x ** 2 / (2 * sigma ** 2))
-    kernel_1d = kernel_1d / kernel_1d.sum()
-    
-    # Reshape for convolution
-    kernel_h = kernel_1d.view(1, 1, 1, kernel_size)
-    kernel_v = kernel_1d.view(1, 1, kernel_size, 1)
-    
-    # Handle input shape: (B, H, W, C) -> (B, C, H, W)
-    was_bhwc = tensor.dim() == 4 and tensor.shape[-1] in [1, 3, 4]
-    if was_bhwc:
-        tensor = tensor.permute(0, 3, 1, 2)
-    
-    b, c, h, w = tensor.shape
-    
-    # Expand kernels for all channels
-    kernel_h = kernel_h.expand(c, 1, 1, kernel_size)
-    kernel_v = kernel_v.expand(c, 1, kernel_size, 1)
-    
-    # Pad and convolve
-    pad_h = kernel_size // 2
-    pad_v = kernel_size // 2
-    
-    # Horizontal pass
-    tensor_padded = torch.nn.functional.pad(tensor, (pad_h, pad_h, 0, 0), mode='reflect')
-    blurred = torch.nn.functional.conv2d(tensor_padded, kernel_h, groups=c)
-    
-    # Vertical pass
-    blurred_padded = torch.nn.functional.pad(blurred, (0, 0, pad_v, pad_v), mode='reflect')
-    blurred = torch.nn.functional.conv2d(blurred_padded, kernel_v, groups=c)
-    
-    if was_bhwc:
-        blurred = blurred.permute(0, 2, 3, 1)
-    
-    return blurred
+    """GPU-accelerated 2D Gaussian blur using separable convolution.
+
+    Thin wrapper over radiance_ops.gaussian_blur: small sigmas use a direct
+    separable kernel, large ones the pyramid/FFT engine (no 31-tap cap).
+    """
+    return gaussian_blur(tensor, sigma, kernel_size=kernel_size)
 
 
 def gpu_chromatic_aberration(tensor: torch.Tensor, r_scale: float, 
@@ -2509,10 +2744,9 @@ def gpu_chromatic_aberration(tensor: torch.Tensor, r_scale: float,
     device = tensor.device
     b, h, w, c = tensor.shape
     
-    # Create base grid
-    theta = torch.tensor([[1, 0, 0], [0, 1, 0]], device=device, dtype=tensor.dtype)
-    theta = theta.unsqueeze(0).expand(b, -1, -1)
-    grid_base = torch.nn.functional.affine_grid(theta, (b, c, h, w), align_corners=False)
+    # Base grid
+    grid_base = affine_sampling_grid(((1, 0, 0), (0, 1, 0)), h, w, device, tensor.dtype)
+    grid_base = grid_base.expand(b, -1, -1, -1)
     
     result = tensor.clone()
     
@@ -2549,18 +2783,17 @@ def gpu_vignette(tensor: torch.Tensor, intensity: float, falloff: float,
     dtype = tensor.dtype
     b, h, w, c = tensor.shape
     
-    # Create coordinate grids
-    y = torch.linspace(-1, 1, h, device=device, dtype=dtype)
-    x = torch.linspace(-1, 1, w, device=device, dtype=dtype)
-    yy, xx = torch.meshgrid(y, x, indexing='ij')
-    
-    # Distance from center with roundness adjustment
-    dist = torch.sqrt((xx / roundness) ** 2 + yy ** 2)
-    
-    # Apply falloff curve
-    vignette_mask = 1.0 - torch.clamp(dist ** falloff * intensity, 0, 1)
-    vignette_mask = vignette_mask.unsqueeze(0).unsqueeze(-1)  # (1, H, W, 1)
+    def build():
+        yy, xx = linspace_grid(h, w, device, dtype)
+        
+        # Distance from center with roundness adjustment
+        dist = torch.sqrt((xx / roundness) ** 2 + yy ** 2)
+        
+        # Apply falloff curve
+        vignette_mask = 1.0 - torch.clamp(dist ** falloff * intensity, 0, 1)
+        return vignette_mask.unsqueeze(0).unsqueeze(-1)  # (1, H, W, 1)
     
+    vignette_mask = cached_grid("vignette", h, w, device, dtype, (intensity, falloff, roundness), build)
     return tensor * vignette_mask
 
 
@@ -2573,24 +2806,20 @@ def gpu_lens_distortion(tensor: torch.Tensor, k1: float, k2: float = 0.0) -> tor
     dtype = tensor.dtype
     b, h, w, c = tensor.shape
     
-    # Create normalized coordinate grid
-    y = torch.linspace(-1, 1, h, device=device, dtype=dtype)
-    x = torch.linspace(-1, 1, w, device=device, dtype=dtype)
-    yy, xx = torch.meshgrid(y, x, indexing='ij')
-    
-    # Calculate radial distance
-    r = torch.sqrt(xx ** 2 + yy ** 2)
-    
-    # Apply Brown-Conrady distortion model
-    distortion = 1 + k1 * r ** 2 + k2 * r ** 4
-    
-    # Create distorted grid
-    xx_dist = xx * distortion
-    yy_dist = yy * distortion
+    def build():
+        yy, xx = linspace_grid(h, w, device, dtype)
+        
+        # Calculate radial distance
+        r = torch.sqrt(xx ** 2 + yy ** 2)
+        
+        # Apply Brown-Conrady distortion model
+        distortion = 1 + k1 * r ** 2 + k2 * r ** 4
+        
+        # Stack the distorted coordinates into grid format for grid_sample
+        return torch.stack([xx * distortion, yy * distortion], dim=-1).unsqueeze(0)
     
-    # Stack into grid format for grid_sample
-    grid = torch.stack([xx_dist, yy_dist], dim=-1)
-    grid = grid.unsqueeze(0).expand(b, -1, -1, -1)
+    grid = cached_grid("brown_conrady", h, w, device, dtype, (k1, k2), build)
+    grid = grid.expand(b, -1, -1, -1)
     
     # Permute to NCHW
     tensor_nchw = tensor.permute(0, 3, 1, 2)
@@ -2620,7 +2849,7 @@ def gpu_overlay_blend(base: torch.Tensor, blend: torch.Tensor) -> torch.Tensor:
 
 
 def gpu_gate_weave(tensor: torch.Tensor, amplitude: float, 
-                   frame_index: int = 0) -> torch.Tensor:
+                   frame_index: int = 0, seed: int = 0) -> torch.Tensor:
     """Apply frame instability (gate weave) effect."""
     if amplitude < 0.1:
         return tensor
@@ -2630,14 +2859,12 @@ def gpu_gate_weave(tensor: torch.Tensor, amplitude: float,
     b, h, w, c = tensor.shape
     
     # Generate pseudo-random but temporally coherent offsets
-    np.random.seed(frame_index * 12345)
-    offset_x = np.random.randn() * amplitude / w * 2
-    offset_y = np.random.randn() * amplitude / h * 2
+    offset_x, offset_y = counter_normal(seed, frame_index, 0, (2,), STREAM_WEAVE).tolist()
+    offset_x = offset_x * amplitude / w * 2
+    offset_y = offset_y * amplitude / h * 2
     
     # Create offset grid
-    y = torch.linspace(-1, 1, h, device=device, dtype=dtype)
-    x = torch.linspace(-1, 1, w, device=device, dtype=dtype)
-    yy, xx = torch.meshgrid(y, x, indexing='ij')
+    yy, xx = linspace_grid(h, w, device, dtype)
     
     xx_offset = xx + offset_x
     yy_offset = yy + offset_y
@@ -2654,6 +2881,221 @@ def gpu_gate_weave(tensor: torch.Tensor, amplitude: float,
     return shifted.permute(0, 2, 3, 1)
 
 
+# Frames per fused-warp grid_sample are limited so the sampling grids stay
+# under this budget (a 4K frame with per-channel CA grids needs ~200 MB).
+# On CPU small chunks that stay in cache are faster than one large batch.
+GEOMETRY_WARP_CHUNK_MB = 1024
+GEOMETRY_WARP_CPU_CHUNK_MB = 16
+
+
+def gate_weave_offsets(frames: List[int], amplitude: float, seed: int,
+                       h: int, w: int) -> torch.Tensor:
+    """Per-frame gate weave translation in grid units, shape (B, 2) as (x, y)."""
+    offsets = torch.tensor([counter_normal(seed, f, 0, (2,), STREAM_WEAVE).tolist()
+                            for f in frames], dtype=torch.float64)
+    return offsets * amplitude * 2 / torch.tensor([w, h], dtype=torch.float64)
+
+
+def geometry_warp_grid(h: int, w: int, k1: float = 0.0, k2: float = 0.0,
+                       channel_scales: Tuple[float, ...] = (1.0,),
+                       device: torch.device = None) -> torch.Tensor:
+    """
+    Frame-independent part of the fused geometry warp, one (H, W, 2) grid per
+    channel scale: chromatic aberration scales the output coordinate and
+    Brown-Conrady distortion is applied to the result. Pixel-centre
+    coordinates, so a warp with no effects is an exact identity.
+    """
+    ys = (torch.arange(h, device=device, dtype=torch.float32) * 2 + 1) / h - 1
+    xs = (torch.arange(w, device=device, dtype=torch.float32) * 2 + 1) / w - 1
+    inv_scales = 1.0 / torch.tensor(channel_scales, device=device, dtype=torch.float32)
+    xx = (inv_scales.view(-1, 1, 1) * xs.view(1, 1, w)).expand(-1, h, -1)
+    yy = (inv_scales.view(-1, 1, 1) * ys.view(1, h, 1)).expand(-1, -1, w)
+    grid = torch.stack([xx, yy], dim=-1)
+    if k1 != 0.0 or k2 != 0.0:
+        r2 = xx * xx + yy * yy
+        grid *= (1 + k1 * r2 + k2 * r2 * r2).unsqueeze(-1)
+    return grid
+
+
+def gpu_geometry_warp(tensor: torch.Tensor, k1: float = 0.0, k2: float = 0.0,
+                      r_scale: float = 1.0, b_scale: float = 1.0,
+                      offsets: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """
+    Gate weave, lens distortion and chromatic aberration in one resample.
+
+    Composes the three warps into a single sampling grid per frame (per frame
+    and channel when CA is active) and runs one batched grid_sample, instead
+    of resampling the image once per effect. ``offsets`` are per-frame
+    weave translations from gate_weave_offsets().
+    """
+    b, h, w, c = tensor.shape
+    scales = [1.0] * c
+    scales[0] = r_scale
+    if c > 2:
+        scales[2] = b_scale
+    per_channel = any(abs(s - 1.0) > 0.001 for s in scales)
+    if not per_channel:
+        scales = [1.0]
+    if offsets is None and not per_channel and abs(k1) < 0.001 and abs(k2) < 0.001:
+        return tensor
+
+    base = cached_grid("geometry_warp", h, w, tensor.device, tensor.dtype, (k1, k2, tuple(scales)),
+                       lambda: geometry_warp_grid(h, w, k1, k2, tuple(scales), tensor.device).to(tensor.dtype))
+    groups = base.shape[0]
+    grid_bytes = groups * h * w * 2 * tensor.element_size()
+    budget_mb = GEOMETRY_WARP_CHUNK_MB if tensor.is_cuda else GEOMETRY_WARP_CPU_CHUNK_MB
+    chunk = max(1, int(budget_mb * 1024 * 1024 // grid_bytes))
+
+    nchw = tensor.permute(0, 3, 1, 2)
+    output = torch.empty_like(nchw)
+    for start in range(0, b, chunk):
+        end = min(start + chunk, b)
+        n = end - start
+        if offsets is not None:
+            shift = offsets[start:end].to(device=base.device, dtype=base.dtype)
+            grid = base.unsqueeze(0) + shift.view(n, 1, 1, 1, 2)
+        else:
+            grid = base.unsqueeze(0).expand(n, -1, -1, -1, -1)
+        grid = grid.reshape(n * groups, h, w, 2)
+        source = nchw[start:end]
+        if per_channel:
+            source = source.reshape(n * c, 1, h, w)
+        sampled = torch.nn.functional.grid_sample(source, grid, mode='bilinear',
+                                                  padding_mode='border', align_corners=False)
+        output[start:end] = sampled.reshape(n, c, h, w)
+
+    return output.permute(0, 2, 3, 1)
+
+
+# Full-frame float32 buffers alive at once in the Pro effect stack (frame,
+# warp grids, blur masks, grain layers, luminance response)
+PRO_EFFECTS_WORKING_SET_FACTOR = 16
+
+# The CPU stacks are memory-bound, so chunks stay small whatever the budget
+EFFECTS_CPU_CHUNK_MB = 256
+
+
+def effect_chunk_frames(h: int, w: int, c: int, device: torch.device,
+                        memory_limit_mb: float = 0,
+                        working_set: int = PRO_EFFECTS_WORKING_SET_FACTOR) -> int:
+    """
+    Frames per streamed chunk for a stack holding ``working_set`` full-frame
+    buffers. memory_limit_mb 0 uses half the free device memory; on CPU
+    chunks are capped at EFFECTS_CPU_CHUNK_MB.
+    """
+    if device.type == "cpu":
+        if memory_limit_mb <= 0 or memory_limit_mb > EFFECTS_CPU_CHUNK_MB:
+            memory_limit_mb = EFFECTS_CPU_CHUNK_MB
+    elif memory_limit_mb <= 0:
+        try:
+            free, _ = torch.cuda.mem_get_info(device)
+            memory_limit_mb = free * 0.5 / (1024 * 1024)
+        except RuntimeError:
+            memory_limit_mb = 4096
+    frame_bytes = h * w * max(c, 3) * 4 * working_set
+    return max(1, int(memory_limit_mb * 1024 * 1024 // frame_bytes))
+
+
+def stream_frame_chunks(image: torch.Tensor, frames: List[int], process_func,
+                        device: torch.device, chunk: int) -> Tuple[torch.Tensor, int]:
+    """
+    Run ``process_func(chunk_tensor, chunk_frames)`` over ``image`` in chunks of
+    ``chunk`` frames on ``device``, writing into one preallocated float32 CPU
+    tensor. On CUDA, transfers go through two pinned chunk-sized staging
+    buffers per direction: the next chunk is uploaded on a side stream while
+    the current one computes, and each result is copied back asynchronously
+    and moved into the (pageable) output while the following chunk runs. A
+    chunk that runs out of memory is retried at half the size. Returns
+    (output, chunk size used).
+    """
+    b = image.shape[0]
+    chunk = max(1, min(chunk, b))
+    cuda = device.type == "cuda"
+    output = torch.empty(image.shape, dtype=torch.float32)
+    
+    if cuda:
+        copy_stream = torch.cuda.Stream(device)
+        frame_shape = tuple(image.shape[1:])
+        # Staging buffers keep the initial chunk size; smaller retries use a slice
+        staged_upload = not image.is_cuda
+        upload_buffers = [torch.empty((chunk,) + frame_shape, dtype=image.dtype, pin_memory=True)
+                          for _ in range(2)] if staged_upload else []
+        download_buffers = [torch.empty((chunk,) + frame_shape, dtype=torch.float32, pin_memory=True)
+                            for _ in range(2)]
+        upload_events = [None, None]
+    upload_slot = download_slot = 0
+    pending_download = None
+    
+    def upload(start):
+        nonlocal upload_slot
+        frames_in = image[start:start + chunk]
+        if not cuda or not staged_upload:
+            # Always a private copy: process_func may write into its chunk,
+            # and a same-device .to() would hand it a view of the caller's IMAGE
+            return frames_in.to(device, dtype=torch.float32, copy=True)
+        slot, upload_slot = upload_slot, 1 - upload_slot
+        # The last upload from this buffer must have left it before refilling
+        if upload_events[slot] is not None:
+            upload_events[slot].synchronize()
+        staging = upload_buffers[slot][:frames_in.shape[0]]
+        staging.copy_(frames_in)
+        with torch.cuda.stream(copy_stream):
+            frames_gpu = staging.to(device, non_blocking=True)
+            upload_events[slot] = torch.cuda.Event()
+            upload_events[slot].record(copy_stream)
+            return frames_gpu.float()
+    
+    def finish_download():
+        nonlocal pending_download
+        if pending_download is not None:
+            event, staging, lo, hi = pending_download
+            event.synchronize()
+            output[lo:hi].copy_(staging)
+            pending_download = None
+    
+    def download(result, lo, hi):
+        nonlocal pending_download, download_slot
+        if not cuda:
+            output[lo:hi].copy_(result)
+            return
+        slot, download_slot = download_slot, 1 - download_slot
+        staging = download_buffers[slot][:hi - lo]
+        staging.copy_(result, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record()
+        # The previous chunk's copy is done (or nearly) by now; drain it while
+        # this one is still in flight
+        finish_download()
+        pending_download = (event, staging, lo, hi)
+    
+    start = 0
+    pending = upload(0)
+    while start < b:
+        current = pending
+        end = min(start + chunk, b)
+        if cuda:
+            compute_stream = torch.cuda.current_stream(device)
+            compute_stream.wait_stream(copy_stream)
+            current.record_stream(compute_stream)
+        try:
+            pending = upload(end) if end < b else None
+            result = process_func(current, frames[start:end])
+        except torch.cuda.OutOfMemoryError:
+            if chunk == 1:
+                raise
+            current = pending = result = None
+            torch.cuda.empty_cache()
+            chunk = max(1, chunk // 2)
+            print(f"[FXTD Film Effects] Out of memory, retrying with {chunk} frames per chunk")
+            pending = upload(start)
+            continue
+        download(result, start, end)
+        start = end
+    
+    finish_download()
+    return output, chunk
+
+
 # =============================================================================
 # FXTD PRO FILM EFFECTS - INDUSTRY-LEVEL COMBINED NODE
 # =============================================================================
@@ -2891,6 +3333,36 @@ class FXTDProFilmEffects:
                     "max": 1.0,
                     "step": 0.05
                 }),
+                
+                # === ENGINE & STREAMING ===
+                # Inputs added after the original set go last: saved
+                # workflows restore widget values by position
+                "grain_engine": (["procedural", "plate bank"], {
+                    "tooltip": "procedural: synthesise fresh noise every frame; plate bank: sample a cached tileable grain plate covering the frame (faster, repeats only beyond 8192 px)"
+                }),
+                "grain_cache_dir": ("STRING", {
+                    "default": "",
+                    "tooltip": "Optional directory to persist grain plates as .npy"
+                }),
+                "frame_offset": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "tooltip": "Sequence frame number of the first image in the batch, so chunks rendered separately match a single render"
+                }),
+                "chunk_memory_mb": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 131072,
+                    "step": 256,
+                    "tooltip": "GPU memory budget for each chunk of frames streamed through the effect stack (0 = auto, half of free VRAM)"
+                }),
+                "cpu_threads": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 256,
+                    "tooltip": "Torch threads when running on CPU (0 = all CPUs available to this process)"
+                }),
             }
         }
     
@@ -2903,11 +3375,13 @@ class FXTDProFilmEffects:
     def apply_effects(self, image: torch.Tensor, master_preset: str,
                       overall_intensity: float,
                       film_stock: str = "None", camera_preset: str = "None", lens_preset: str = "None",
-                      use_gpu: bool = True, seed: int = 0, animate: bool = True,
+                      use_gpu: bool = True, chunk_memory_mb: int = 0, cpu_threads: int = 0,
+                      seed: int = 0, animate: bool = True, frame_offset: int = 0,
                       # Grain
                       grain_enable: bool = True, grain_intensity: float = 0.15,
                       grain_size: float = 1.0, grain_softness: float = 0.3,
                       grain_shadow_boost: float = 1.5, grain_highlight_protect: float = 0.8,
+                      grain_engine: str = "procedural", grain_cache_dir: str = "",
                       # Halation
                       halation_enable: bool = True, halation_intensity: float = 0.15,
                       halation_threshold: float = 0.75, halation_size: int = 50,
@@ -3060,6 +3534,12 @@ class FXTDProFilmEffects:
                 distortion_k1 = lens_params.get('distortion_k1', 0)
                 distortion_k2 = lens_params.get('distortion_k2', 0)
         
+        # Sequence frame numbers key every random stream; static grain reuses frame 0
+        frames = [frame_offset + b if animate else 0 for b in range(batch_size)]
+        
+        # Grain plates are cached per stock; presets that only set a camera share its label
+        grain_stock = film_stock if film_stock != "None" else (camera_preset if camera_preset != "None" else master_preset)
+        
         # Scale by overall intensity
         grain_intensity *= overall_intensity
         halation_intensity *= overall_intensity
@@ -3068,78 +3548,79 @@ class FXTDProFilmEffects:
         vignette_intensity *= overall_intensity
         diffusion_intensity *= overall_intensity
         
-        # === TRY GPU PATH ===
-        device_used = "CPU"
-        if use_gpu and torch.cuda.is_available():
-            try:
-                device = torch.device("cuda")
-                device_used = torch.cuda.get_device_name(0)
-                
-                output = image.to(device).float()
-                
-                for b_idx in range(batch_size):
-                    frame = output[b_idx:b_idx+1]
-                    
-                    # === GATE WEAVE (first, before other effects) ===
-                    if weave_enable and weave_amplitude > 0.1:
-                        frame_seed = seed + b_idx if animate else seed
-                        frame = gpu_gate_weave(frame, weave_amplitude, frame_seed)
-                    
-                    # === LENS DISTORTION ===
-                    if distortion_enable and (abs(distortion_k1) > 0.001 or abs(distortion_k2) > 0.001):
-                        frame = gpu_lens_distortion(frame, distortion_k1, distortion_k2)
-                    
-                    # === CHROMATIC ABERRATION ===
-                    if ca_enable and ca_intensity > 0.001:
-                        r_scale = 1 + ca_intensity * 0.02
-                        b_scale = 1 - ca_intensity * 0.02
-                        frame = gpu_chromatic_aberration(frame, r_scale, b_scale)
-                    
-                    output[b_idx:b_idx+1] = frame
+        def process_chunk(output, chunk_frames):
+            """Full effect stack on a float BHWC chunk of the sequence, on its device."""
+            device = output.device
+            
+            # === GEOMETRY: GATE WEAVE, LENS DISTORTION, CHROMATIC ABERRATION ===
+            # Composed into one sampling grid per frame and resampled once
+            weave_offsets = None
+            if weave_enable and weave_amplitude > 0.1:
+                weave_offsets = gate_weave_offsets(chunk_frames, weave_amplitude, seed, h, w)
+            k1 = k2 = 0.0
+            if distortion_enable and (abs(distortion_k1) > 0.001 or abs(distortion_k2) > 0.001):
+                k1, k2 = distortion_k1, distortion_k2
+            r_scale = b_scale = 1.0
+            if ca_enable and ca_intensity > 0.001:
+                r_scale = 1 + ca_intensity * 0.02
+                b_scale = 1 - ca_intensity * 0.02
+            output = gpu_geometry_warp(output, k1, k2, r_scale, b_scale, weave_offsets)
+            
+            # Alpha follows the geometry only; the rest of the stack is colour
+            alpha = output[..., 3:] if output.shape[-1] > 3 else None
+            output = output[..., :3]
+            
+            # === HALATION (GPU-accelerated blur) ===
+            if halation_enable and halation_intensity > 0.001:
+                # Get luminance
+                luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
+                highlight_mask = torch.clamp((luma - halation_threshold) / (1 - halation_threshold + 1e-6), 0, 1)
                 
-                # === HALATION (GPU-accelerated blur) ===
-                if halation_enable and halation_intensity > 0.001:
-                    # Get luminance
-                    luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    highlight_mask = torch.clamp((luma - halation_threshold) / (1 - halation_threshold + 1e-6), 0, 1)
-                    
-                    # Blur mask
-                    mask_4d = highlight_mask.unsqueeze(-1).expand(-1, -1, -1, 3)
-                    blurred_mask = gpu_gaussian_blur_2d(mask_4d, halation_size / 3)
-                    
-                    # Apply halation color
-                    halation_color = torch.tensor([halation_red, halation_green, halation_blue], 
-                                                  device=device, dtype=output.dtype)
-                    halation_layer = blurred_mask * halation_color * halation_intensity
-                    output[..., :3] = output[..., :3] + halation_layer[..., :3]
+                # Blur mask (one plane; the colour is applied afterwards)
+                blurred_mask = gpu_gaussian_blur_2d(highlight_mask.unsqueeze(-1), halation_size / 3)
                 
-                # === BLOOM ===
-                if bloom_enable and bloom_intensity > 0.001:
-                    luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    highlight_mask = torch.clamp((luma - bloom_threshold) / (1 - bloom_threshold + 1e-6), 0, 1)
-                    
-                    highlights = output[..., :3] * highlight_mask.unsqueeze(-1)
-                    blurred_highlights = gpu_gaussian_blur_2d(highlights.unsqueeze(0) if highlights.dim() == 3 else highlights, bloom_size / 3)
-                    if blurred_highlights.dim() == 4 and output.dim() == 4:
-                        output[..., :3] = output[..., :3] + blurred_highlights[..., :3] * bloom_intensity
+                # Apply halation color
+                halation_color = torch.tensor([halation_red, halation_green, halation_blue], 
+                                              device=device, dtype=output.dtype)
+                halation_layer = blurred_mask * halation_color * halation_intensity
+                output[..., :3] = output[..., :3] + halation_layer[..., :3]
+            
+            # === BLOOM ===
+            if bloom_enable and bloom_intensity > 0.001:
+                luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
+                highlight_mask = torch.clamp((luma - bloom_threshold) / (1 - bloom_threshold + 1e-6), 0, 1)
                 
-                # === DIFFUSION/GLOW ===
-                if diffusion_enable and diffusion_intensity > 0.001:
-                    luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    highlight_mask = torch.clamp((luma - diffusion_threshold) / (1 - diffusion_threshold + 1e-6), 0, 1)
-                    
-                    diffused = gpu_gaussian_blur_2d(output[..., :3], 20)
-                    blend_mask = highlight_mask.unsqueeze(-1) * diffusion_intensity
-                    output[..., :3] = output[..., :3] * (1 - blend_mask) + diffused * blend_mask
+                highlights = output[..., :3] * highlight_mask.unsqueeze(-1)
+                blurred_highlights = gpu_gaussian_blur_2d(highlights.unsqueeze(0) if highlights.dim() == 3 else highlights, bloom_size / 3)
+                if blurred_highlights.dim() == 4 and output.dim() == 4:
+                    output[..., :3] = output[..., :3] + blurred_highlights[..., :3] * bloom_intensity
+            
+            # === DIFFUSION/GLOW ===
+            if diffusion_enable and diffusion_intensity > 0.001:
+                luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
+                highlight_mask = torch.clamp((luma - diffusion_threshold) / (1 - diffusion_threshold + 1e-6), 0, 1)
                 
-                # === FILM GRAIN ===
-                if grain_enable and grain_intensity > 0.001:
-                    torch.manual_seed(seed)
-                    
+                diffused = gpu_gaussian_blur_2d(output[..., :3], 20)
+                blend_mask = highlight_mask.unsqueeze(-1) * diffusion_intensity
+                output[..., :3] = output[..., :3] * (1 - blend_mask) + diffused * blend_mask
+            
+            # === FILM GRAIN ===
+            if grain_enable and grain_intensity > 0.001:
+                if grain_engine == "plate bank":
+                    # Softness is baked into the plate
+                    plate = GRAIN_PLATE_BANK.get(grain_stock, grain_size,
+                                                 grain_softness if grain_softness > 0.1 else 0.0,
+                                                 seed, grain_plate_shape(h, w), PRO_GRAIN_LAYERS,
+                                                 grain_cache_dir, device)
+                    grain = torch.stack([
+                        sample_grain_plate_torch(plate, h, w, seed, frame)
+                        for frame in chunk_frames
+                    ]).to(output.dtype) * grain_intensity
+                else:
                     # Multi-layer grain
-                    grain_fine = torch.randn(batch_size, h, w, 3, device=device, dtype=output.dtype) * 0.6
-                    grain_medium = torch.randn(batch_size, h // 2, w // 2, 3, device=device, dtype=output.dtype) * 0.3
-                    grain_coarse = torch.randn(batch_size, h // 4, w // 4, 3, device=device, dtype=output.dtype) * 0.1
+                    grain_fine = counter_grain_torch(seed, chunk_frames, 0, h, w, device) * 0.6
+                    grain_medium = counter_grain_torch(seed, chunk_frames, 3, h // 2, w // 2, device) * 0.3
+                    grain_coarse = counter_grain_torch(seed, chunk_frames, 6, h // 4, w // 4, device) * 0.1
                     
                     # Upscale coarser grains
                     grain_medium = torch.nn.functional.interpolate(
@@ -3150,124 +3631,125 @@ class FXTDProFilmEffects:
                     ).permute(0, 2, 3, 1)
                     
                     grain = (grain_fine + grain_medium + grain_coarse) * grain_intensity
-                    
-                    # Apply color grain response from presets (ARRI texture support)
-                    if grain_color_response['r'] != 1.0 or grain_color_response['g'] != 1.0 or grain_color_response['b'] != 1.0:
-                        color_scale = torch.tensor([grain_color_response['r'], 
-                                                    grain_color_response['g'], 
-                                                    grain_color_response['b']], 
-                                                   device=device, dtype=grain.dtype)
-                        grain = grain * color_scale
-                    
-                    # Apply softness (blur grain)
-                    if grain_softness > 0.1:
-                        grain = gpu_gaussian_blur_2d(grain, grain_softness * 2)
-                    
-                    # Luminance-based response
-                    luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    shadow_mask = torch.pow(1 - torch.clamp(luma, 0, 1), 0.5)
-                    highlight_mask = torch.pow(torch.clamp(luma, 0, 1), 2)
-                    response = shadow_mask * grain_shadow_boost - highlight_mask * (1 - grain_highlight_protect)
-                    response = torch.clamp(response, 0.2, 2.0).unsqueeze(-1)
-                    
-                    grain = grain * response
-                    
-                    # Apply noise_floor - minimum grain threshold for sensor authenticity
-                    if noise_floor > 0.001:
-                        # Add subtle constant noise floor that exists even in clean areas
-                        floor_noise = torch.randn_like(grain) * noise_floor
-                        grain = grain + floor_noise
-                    
-                    output[..., :3] = output[..., :3] + grain
                 
-                # === VIGNETTE (last) ===
-                if vignette_enable and vignette_intensity > 0.001:
-                    output = gpu_vignette(output, vignette_intensity, vignette_falloff, vignette_roundness)
-                
-                # === SHARPENING (Final step) ===
-                if sharpen_enable and (sharpen_amount > 0.001 or detail_enhance > 0.001):
-                    # 1. Unsharp Mask
-                    if sharpen_method == "Unsharp Mask" and sharpen_amount > 0.001:
-                        blurred_sharp = gpu_gaussian_blur_2d(output, sharpen_radius)
-                        detail = output - blurred_sharp
-                        output = output + detail * sharpen_amount
-                    
-                    # 2. High Pass (Overlay)
-                    elif sharpen_method == "High Pass (Overlay)" and sharpen_amount > 0.001:
-                        blurred_sharp = gpu_gaussian_blur_2d(output, sharpen_radius)
-                        # High pass = Original - Blur + 0.5 (mid grey)
-                        high_pass = (output - blurred_sharp) + 0.5
-                        # Apply Overlay blend
-                        blended = gpu_overlay_blend(output, high_pass)
-                        # Mix based on amount
-                        output = torch.lerp(output, blended, min(sharpen_amount, 1.0))
-
-                    # Simple detail enhancement (Local Contrast)
-                    if detail_enhance > 0.001:
-                        # Wider blur for local contrast
-                        blurred_local = gpu_gaussian_blur_2d(output, 5.0)
-                        local_detail = output - blurred_local
-                        output = output + local_detail * detail_enhance
+                # Apply color grain response from presets (ARRI texture support)
+                if grain_color_response['r'] != 1.0 or grain_color_response['g'] != 1.0 or grain_color_response['b'] != 1.0:
+                    color_scale = torch.tensor([grain_color_response['r'], 
+                                                grain_color_response['g'], 
+                                                grain_color_response['b']], 
+                                               device=device, dtype=grain.dtype)
+                    grain = grain * color_scale
                 
+                # Apply softness (blur grain)
+                if grain_softness > 0.1 and grain_engine != "plate bank":
+                    grain = gpu_gaussian_blur_2d(grain, grain_softness * 2)
                 
+                # Luminance-based response
+                luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
+                shadow_mask = torch.pow(1 - torch.clamp(luma, 0, 1), 0.5)
+                highlight_mask = torch.pow(torch.clamp(luma, 0, 1), 2)
+                response = shadow_mask * grain_shadow_boost - highlight_mask * (1 - grain_highlight_protect)
+                response = torch.clamp(response, 0.2, 2.0).unsqueeze(-1)
                 
-                # === FILM STOCK CONTRAST/SATURATION ===
-                # Apply contrast and saturation from film stock presets
-                if abs(preset_contrast - 1.0) > 0.001:
-                    # Apply contrast around mid-gray (0.5)
-                    output[..., :3] = (output[..., :3] - 0.5) * preset_contrast + 0.5
+                grain = grain * response
                 
-                if abs(preset_saturation - 1.0) > 0.001:
-                    # Calculate luminance and adjust saturation
-                    luma = (0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]).unsqueeze(-1)
-                    output[..., :3] = luma + (output[..., :3] - luma) * preset_saturation
+                # Apply noise_floor - minimum grain threshold for sensor authenticity
+                if noise_floor > 0.001:
+                    # Add subtle constant noise floor that exists even in clean areas
+                    floor_noise = counter_grain_torch(seed, chunk_frames, 0, h, w, device,
+                                                      STREAM_NOISE).to(grain.dtype) * noise_floor
+                    grain = grain + floor_noise
                 
-                # === FILM COLOR SHIFT (Shadow/Highlight Tinting) ===
-                # Apply characteristic film cross-curve color shifts
-                has_shadow_shift = color_shift_shadows != (1.0, 1.0, 1.0)
-                has_highlight_shift = color_shift_highlights != (1.0, 1.0, 1.0)
+                output[..., :3] = output[..., :3] + grain
+            
+            # === VIGNETTE (last) ===
+            if vignette_enable and vignette_intensity > 0.001:
+                output = gpu_vignette(output, vignette_intensity, vignette_falloff, vignette_roundness)
+            
+            # === SHARPENING (Final step) ===
+            if sharpen_enable and (sharpen_amount > 0.001 or detail_enhance > 0.001):
+                # 1. Unsharp Mask
+                if sharpen_method == "Unsharp Mask" and sharpen_amount > 0.001:
+                    blurred_sharp = gpu_gaussian_blur_2d(output, sharpen_radius)
+                    detail = output - blurred_sharp
+                    output = output + detail * sharpen_amount
                 
-                if has_shadow_shift or has_highlight_shift:
-                    luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                    
-                    if has_shadow_shift:
-                        # Shadow tint - stronger in dark areas
-                        shadow_mask = torch.pow(1.0 - torch.clamp(luma, 0, 1), 2.0).unsqueeze(-1)
-                        shadow_color = torch.tensor(color_shift_shadows, device=device, dtype=output.dtype)
-                        output[..., :3] = output[..., :3] * (1.0 - shadow_mask) + output[..., :3] * shadow_color * shadow_mask
-                    
-                    if has_highlight_shift:
-                        # Highlight tint - stronger in bright areas
-                        highlight_mask = torch.pow(torch.clamp(luma, 0, 1), 2.0).unsqueeze(-1)
-                        highlight_color = torch.tensor(color_shift_highlights, device=device, dtype=output.dtype)
-                        output[..., :3] = output[..., :3] * (1.0 - highlight_mask) + output[..., :3] * highlight_color * highlight_mask
+                # 2. High Pass (Overlay)
+                elif sharpen_method == "High Pass (Overlay)" and sharpen_amount > 0.001:
+                    blurred_sharp = gpu_gaussian_blur_2d(output, sharpen_radius)
+                    # High pass = Original - Blur + 0.5 (mid grey)
+                    high_pass = (output - blurred_sharp) + 0.5
+                    # Apply Overlay blend
+                    blended = gpu_overlay_blend(output, high_pass)
+                    # Mix based on amount
+                    output = torch.lerp(output, blended, min(sharpen_amount, 1.0))
+
+                # Simple detail enhancement (Local Contrast)
+                if detail_enhance > 0.001:
+                    # Wider blur for local contrast
+                    blurred_local = gpu_gaussian_blur_2d(output, 5.0)
+                    local_detail = output - blurred_local
+                    output = output + local_detail * detail_enhance
+            
+            # === FILM STOCK CONTRAST/SATURATION ===
+            # Apply contrast and saturation from film stock presets
+            if abs(preset_contrast - 1.0) > 0.001:
+                # Apply contrast around mid-gray (0.5)
+                output[..., :3] = (output[..., :3] - 0.5) * preset_contrast + 0.5
+            
+            if abs(preset_saturation - 1.0) > 0.001:
+                # Calculate luminance and adjust saturation
+                luma = (0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]).unsqueeze(-1)
+                output[..., :3] = luma + (output[..., :3] - luma) * preset_saturation
+            
+            # === FILM COLOR SHIFT (Shadow/Highlight Tinting) ===
+            # Apply characteristic film cross-curve color shifts
+            has_shadow_shift = color_shift_shadows != (1.0, 1.0, 1.0)
+            has_highlight_shift = color_shift_highlights != (1.0, 1.0, 1.0)
+            
+            if has_shadow_shift or has_highlight_shift:
+                luma = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
                 
-                # Clamp and return
-                output = torch.clamp(output, 0, 1)
-                output = output.cpu()
+                if has_shadow_shift:
+                    # Shadow tint - stronger in dark areas
+                    shadow_mask = torch.pow(1.0 - torch.clamp(luma, 0, 1), 2.0).unsqueeze(-1)
+                    shadow_color = torch.tensor(color_shift_shadows, device=device, dtype=output.dtype)
+                    output[..., :3] = output[..., :3] * (1.0 - shadow_mask) + output[..., :3] * shadow_color * shadow_mask
                 
+                if has_highlight_shift:
+                    # Highlight tint - stronger in bright areas
+                    highlight_mask = torch.pow(torch.clamp(luma, 0, 1), 2.0).unsqueeze(-1)
+                    highlight_color = torch.tensor(color_shift_highlights, device=device, dtype=output.dtype)
+                    output[..., :3] = output[..., :3] * (1.0 - highlight_mask) + output[..., :3] * highlight_color * highlight_mask
+            
+            output = torch.clamp(output, 0, 1)
+            if alpha is not None:
+                output = torch.cat([output, alpha], dim=-1)
+            return output
+        
+        # One torch implementation for every device. Frames are streamed in
+        # chunks sized to the memory budget; every random stream is keyed by
+        # frame number, so chunked output matches a single pass exactly.
+        def run_on(device):
+            chunk = effect_chunk_frames(h, w, image.shape[3], device, chunk_memory_mb)
+            output, chunk = stream_frame_chunks(image, frames, process_chunk, device, chunk)
+            return output, (f" ({chunk} frames/chunk)" if chunk < batch_size else "")
+        
+        output = None
+        device_used = "CPU"
+        if use_gpu and torch.cuda.is_available():
+            try:
+                output, chunk_info = run_on(torch.device("cuda"))
+                device_used = torch.cuda.get_device_name(0) + chunk_info
             except RuntimeError as e:
                 print(f"[FXTD Pro Film Effects] GPU error, falling back to CPU: {e}")
                 torch.cuda.empty_cache()
                 device_used = "CPU (GPU fallback)"
-                output = self._cpu_fallback(image, overall_intensity, grain_enable, grain_intensity,
-                                           grain_size, grain_softness, grain_shadow_boost, grain_highlight_protect,
-                                           halation_enable, halation_intensity, halation_threshold, halation_size,
-                                           halation_red, halation_green, halation_blue,
-                                           ca_enable, ca_intensity, bloom_enable, bloom_intensity, bloom_threshold, bloom_size,
-                                           vignette_enable, vignette_intensity, vignette_falloff,
-                                           sharpen_enable, sharpen_method, sharpen_amount, sharpen_radius, detail_enhance,
-                                           seed, animate)
-        else:
-            device_used = "CPU"
-            output = self._cpu_fallback(image, overall_intensity, grain_enable, grain_intensity,
-                                       grain_size, grain_softness, grain_shadow_boost, grain_highlight_protect,
-                                       halation_enable, halation_intensity, halation_threshold, halation_size,
-                                       halation_red, halation_green, halation_blue,
-                                       ca_enable, ca_intensity, bloom_enable, bloom_intensity, bloom_threshold, bloom_size,
-                                       vignette_enable, vignette_intensity, vignette_falloff,
-                                       sharpen_enable, sharpen_method, sharpen_amount, sharpen_radius, detail_enhance,
-                                       seed, animate)
+        
+        if output is None:
+            with torch_cpu_threads(cpu_threads) as threads:
+                output, chunk_info = run_on(torch.device("cpu"))
+            device_used += f" | {threads} threads{chunk_info}"
         
         # === BUILD INFO STRING ===
         elapsed = (time.time() - start_time) * 1000
@@ -3287,102 +3769,6 @@ class FXTDProFilmEffects:
         info += f"Device: {device_used} | Time: {elapsed:.1f}ms"
         
         return (output, info)
-    
-    def _cpu_fallback(self, image, overall_intensity, grain_enable, grain_intensity,
-                      grain_size, grain_softness, grain_shadow_boost, grain_highlight_protect,
-                      halation_enable, halation_intensity, halation_threshold, halation_size,
-                      halation_red, halation_green, halation_blue,
-                      ca_enable, ca_intensity, bloom_enable, bloom_intensity, bloom_threshold, bloom_size,
-                      vignette_enable, vignette_intensity, vignette_falloff,
-                      sharpen_enable, sharpen_method, sharpen_amount, sharpen_radius, detail_enhance,
-                      seed, animate):
-        """CPU fallback for when GPU is unavailable."""
-        batch_size = image.shape[0]
-        results = []
-        
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
-            h, w = img.shape[:2]
-            
-            has_alpha = img.shape[-1] == 4
-            if has_alpha:
-                alpha = img[..., 3:4]
-                img = img[..., :3]
-            
-            output = img.copy()
-            
-            # Chromatic aberration
-            if ca_enable and ca_intensity > 0.001:
-                output = apply_chromatic_aberration(output, ca_intensity * overall_intensity)
-            
-            # Halation
-            if halation_enable and halation_intensity > 0.001:
-                halation_color = (halation_red, halation_green, halation_blue)
-                halation = generate_halation(output, halation_intensity * overall_intensity,
-                                            halation_threshold, halation_color, halation_size)
-                output = output + halation
-            
-            # Bloom
-            if bloom_enable and bloom_intensity > 0.001:
-                output = apply_bloom(output, bloom_intensity * overall_intensity, 
-                                    bloom_threshold, bloom_size)
-            
-            # Film grain
-            if grain_enable and grain_intensity > 0.001:
-                frame_seed = seed + b if animate else seed
-                luminance = 0.2126 * output[..., 0] + 0.7152 * output[..., 1] + 0.0722 * output[..., 2]
-                color_response = {'r': 1.0, 'g': 1.0, 'b': 1.0}
-                grain = generate_film_grain(h, w, grain_size, grain_intensity * overall_intensity,
-                                           grain_softness, color_response, frame_seed)
-                grain = apply_luminance_response(grain, luminance, grain_shadow_boost, grain_highlight_protect)
-                output = output + grain
-            
-            # Vignette
-            if vignette_enable and vignette_intensity > 0.001:
-                output = apply_vignette(output, vignette_intensity * overall_intensity, vignette_falloff)
-            
-            # Sharpening (CPU basic implementation)
-            if sharpen_enable:
-                 if sharpen_amount > 0.001 or detail_enhance > 0.001:
-                    from PIL import Image as PILImage, ImageFilter
-                    img_uint8 = np.clip(output * 255, 0, 255).astype(np.uint8)
-                    pil_img = PILImage.fromarray(img_uint8)
-                    
-                    if sharpen_amount > 0.001:
-                         blurred_pil = pil_img.filter(ImageFilter.GaussianBlur(radius=sharpen_radius))
-                         blurred = np.array(blurred_pil).astype(np.float32) / 255.0
-                         
-                         if sharpen_method == "Unsharp Mask":
-                             detail = output - blurred
-                             output = output + detail * sharpen_amount
-                         elif sharpen_method == "High Pass (Overlay)":
-                             # CPU Overlay math
-                             high_pass = (output - blurred) + 0.5
-                             
-                             mask = (output < 0.5).astype(np.float32)
-                             res_low = 2.0 * output * high_pass
-                             res_high = 1.0 - 2.0 * (1.0 - output) * (1.0 - high_pass)
-                             blended = mask * res_low + (1.0 - mask) * res_high
-                             
-                             # Lerp
-                             amt = min(sharpen_amount, 1.0)
-                             output = output * (1 - amt) + blended * amt
-
-                    if detail_enhance > 0.001:
-                         blurred_pil_loc = pil_img.filter(ImageFilter.GaussianBlur(radius=5.0))
-                         blurred_loc = np.array(blurred_pil_loc).astype(np.float32) / 255.0
-                         detail_loc = output - blurred_loc
-                         output = output + detail_loc * detail_enhance
-
-            
-            output = np.clip(output, 0, 1)
-            
-            if has_alpha:
-                output = np.concatenate([output, alpha], axis=-1)
-            
-            results.append(output)
-        
-        return torch.from_numpy(np.stack(results, axis=0)).float()
 
 
 # =============================================================================
@@ -14,6 +14,7 @@ Professional upscaling solution optimized for Flux and HDR workflows:
 
 # FIX: OpenMP duplicate library conflict
 import os
+import sys
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 
@@ -23,8 +24,16 @@ import numpy as np
 from PIL import Image
 from typing import Tuple, Dict, Any, Optional, List, Union
 import math
+import threading
+import atexit
+import functools
+import weakref
+from collections import OrderedDict
 from enum import Enum
 
+from .radiance_ops import (cpu_thread_count, gaussian_blur, gaussian_blur_array,
+                           torch_cpu_threads)
+
 
 # =============================================================================
 # UPSCALING ALGORITHMS
@@ -105,7 +114,12 @@ def gaussian_kernel(x: np.ndarray, sigma: float = 0.5) -> np.ndarray:
 
 
 def create_1d_kernel(size: int, scale: float, method: str, support: float = None) -> np.ndarray:
-    """Create 1D resampling kernel."""
+    """
+    Create a single-phase 1D resampling kernel.
+
+    Legacy helper: it is only exact for integer scales. Resizing uses the
+    per-output-pixel tables from get_polyphase_filter_bank instead.
+    """
     if support is None:
         if method in ['lanczos', 'lanczos4']:
             support = 4.0 if method == 'lanczos4' else 3.0
@@ -147,124 +161,296 @@ def create_1d_kernel(size: int, scale: float, method: str, support: float = None
     return kernel.astype(np.float32)
 
 
+def get_kernel_support(method: str) -> float:
+    """Default filter support (radius in source pixels) for a resampling method."""
+    if method == 'lanczos4':
+        return 4.0
+    if method == 'lanczos':
+        return 3.0
+    if method in ['mitchell', 'catrom', 'bicubic', 'gaussian']:
+        return 2.0
+    if method in ['hermite', 'bilinear']:
+        return 1.0
+    return 0.5  # nearest / box
+
+
+def evaluate_kernel(x: np.ndarray, method: str) -> np.ndarray:
+    """Evaluate the continuous resampling kernel for ``method`` at offsets ``x``."""
+    if method == 'lanczos':
+        return lanczos_kernel(x, a=3)
+    if method == 'lanczos4':
+        return lanczos_kernel(x, a=4)
+    if method == 'mitchell':
+        return mitchell_kernel(x)
+    if method in ['catrom', 'bicubic']:
+        return catmull_rom_kernel(x)
+    if method == 'hermite':
+        return hermite_kernel(x)
+    if method == 'gaussian':
+        return gaussian_kernel(x)
+    if method == 'bilinear':
+        return np.maximum(0.0, 1.0 - np.abs(x))
+    # nearest / box
+    return ((x > -0.5) & (x <= 0.5)).astype(np.float64)
+
+
+def _compute_phase_weights(in_size: int, out_size: int, method: str, support: float,
+                           count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Unclamped source indices and normalized weights for the first ``count`` outputs."""
+    scale = in_size / out_size
+    # Nearest stays a point sample; every other filter widens on downscale
+    filter_scale = 1.0 if method == 'nearest' else max(scale, 1.0)
+    radius = support * filter_scale
+    taps = int(np.ceil(radius)) * 2 + 1
+
+    # Source-space centre of each output pixel (pixel centres at +0.5)
+    centers = (np.arange(count, dtype=np.float64) + 0.5) * scale
+    first = np.floor(centers - radius).astype(np.int64)
+    src = first[:, np.newaxis] + np.arange(taps, dtype=np.int64)[np.newaxis, :]
+
+    weights = evaluate_kernel((src + 0.5 - centers[:, np.newaxis]) / filter_scale, method)
+    weight_sum = weights.sum(axis=1, keepdims=True)
+    weight_sum[np.abs(weight_sum) < 1e-10] = 1.0
+    weights = weights / weight_sum
+
+    return src, weights.astype(np.float32)
+
+
+class PolyphaseFilterBank:
+    """
+    Polyphase resampling weights for one axis.
+
+    For a size ratio ``in_size / out_size = step / period`` (reduced), the
+    filter phase repeats every ``period`` output pixels while the source
+    window advances by ``step`` pixels. Only ``period`` distinct phases are
+    evaluated; the per-output ``indices`` / ``weights`` tables used by the
+    resamplers are expanded from them once and shared read-only.
+    """
+
+    def __init__(self, in_size: int, out_size: int, method: str, support: float):
+        self.in_size = in_size
+        self.out_size = out_size
+        self.method = method
+        self.support = support
+
+        g = math.gcd(in_size, out_size)
+        self.period = out_size // g
+        self.step = in_size // g
+
+        phase_src, self.phase_weights = _compute_phase_weights(
+            in_size, out_size, method, support, self.period)
+        self.phase_offsets = phase_src[:, 0]
+
+        # Expand the phases to every output pixel
+        repeats = out_size // self.period
+        shifts = np.arange(repeats, dtype=np.int64) * self.step
+        src = (phase_src[np.newaxis, :, :] + shifts[:, np.newaxis, np.newaxis]).reshape(out_size, -1)
+        self.indices = np.clip(src, 0, in_size - 1)
+        self.weights = np.tile(self.phase_weights, (repeats, 1))
+
+        for arr in (self.phase_weights, self.phase_offsets, self.indices, self.weights):
+            arr.setflags(write=False)
+
+        self._torch_tables = {}
+
+    def torch_tables(self, device: torch.device) -> Tuple[torch.Tensor, torch.Tensor]:
+        """``(indices, weights)`` as torch tensors on ``device`` (uploaded once per device)."""
+        key = str(device)
+        if key not in self._torch_tables:
+            self._torch_tables[key] = (
+                torch.from_numpy(self.indices.copy()).to(device),
+                torch.from_numpy(self.weights.copy()).to(device),
+            )
+        return self._torch_tables[key]
+
+    @property
+    def taps(self) -> int:
+        return self.weights.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.indices.nbytes + self.weights.nbytes + self.phase_weights.nbytes
+
+
+# Filter banks are shared by every node in this module, so a video batch or a
+# queue of same-size jobs builds each table only once.
+POLYPHASE_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=POLYPHASE_CACHE_SIZE)
+def _cached_filter_bank(in_size: int, out_size: int, method: str,
+                        support: float) -> PolyphaseFilterBank:
+    return PolyphaseFilterBank(in_size, out_size, method, support)
+
+
+def get_polyphase_filter_bank(in_size: int, out_size: int, method: str,
+                              support: float = None) -> PolyphaseFilterBank:
+    """Fetch (or build) the cached filter bank for (input size, output size, method, support)."""
+    if support is None:
+        support = get_kernel_support(method)
+    return _cached_filter_bank(int(in_size), int(out_size), method, float(support))
+
+
+def clear_resample_cache():
+    """Drop all cached polyphase filter banks."""
+    _cached_filter_bank.cache_clear()
+
+
+def compute_resample_weights(in_size: int, out_size: int, method: str,
+                             support: float = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Contribution table for resampling one axis.
+
+    Returns ``(indices, weights)``, both shaped ``(out_size, taps)``: output
+    pixel ``i`` is ``sum_k src[indices[i, k]] * weights[i, k]``. Indices are
+    clamped to the source (edge extend) and each row of weights sums to 1.
+    On downscale the kernel is stretched by the scale ratio so it also acts
+    as the antialiasing prefilter. Tables come from the shared filter bank
+    cache and are read-only.
+    """
+    bank = get_polyphase_filter_bank(in_size, out_size, method, support)
+    return bank.indices, bank.weights
+
+
+def resample_axis_32bit(img: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                        axis: int) -> np.ndarray:
+    """
+    Apply a contribution table along one axis of a float32 array.
+
+    Runs one gather-multiply-accumulate per kernel tap over the whole array,
+    so every other axis (batch, rows, channels) is handled in a single pass.
+    """
+    shape = [1] * img.ndim
+    shape[axis] = -1
+
+    result = None
+    for k in range(indices.shape[1]):
+        tap = np.take(img, indices[:, k], axis=axis)
+        tap *= weights[:, k].reshape(shape)
+        if result is None:
+            result = tap
+        else:
+            result += tap
+    return result
+
+
 def separable_resize_32bit(img: np.ndarray, new_h: int, new_w: int, 
                            method: str = 'lanczos') -> np.ndarray:
     """
     High-quality separable resize maintaining 32-bit precision.
     Processes in float32 throughout.
+
+    Accepts HW, HWC or BHWC arrays. Each axis is resampled with a
+    precomputed contribution table applied to the whole array at once.
     """
-    h, w = img.shape[:2]
-    channels = img.shape[2] if len(img.shape) > 2 else 1
-    
-    if len(img.shape) == 2:
-        img = img[:, :, np.newaxis]
-    
-    # Ensure float32
-    img = img.astype(np.float32)
-    
-    # Scale factors
-    scale_h = h / new_h
-    scale_w = w / new_w
-    
-    # Horizontal resize first
+    img = np.asarray(img, dtype=np.float32)
+    h_axis = 1 if img.ndim == 4 else 0
+    w_axis = h_axis + 1
+    h, w = img.shape[h_axis], img.shape[w_axis]
+
+    if new_h == h and new_w == w:
+        return img.copy()
+
+    # Run the pass that shrinks the data most first to keep the intermediate small
+    passes = []
     if new_w != w:
-        temp = np.zeros((h, new_w, channels), dtype=np.float32)
-        kernel = create_1d_kernel(new_w, max(1, scale_w), method)
-        k_size = len(kernel)
-        k_center = k_size // 2
-        
-        for x_out in range(new_w):
-            x_in = (x_out + 0.5) * scale_w - 0.5
-            x_start = int(x_in) - k_center
-            
-            weighted_sum = np.zeros((h, channels), dtype=np.float32)
-            weight_sum = 0.0
-            
-            for k in range(k_size):
-                x_src = x_start + k
-                x_src_clamped = max(0, min(w - 1, x_src))
-                weight = kernel[k]
-                weighted_sum += img[:, x_src_clamped, :] * weight
-                weight_sum += weight
-            
-            temp[:, x_out, :] = weighted_sum / (weight_sum + 1e-10)
-    else:
-        temp = img
-    
-    # Vertical resize
+        passes.append((w_axis, w, new_w))
     if new_h != h:
-        result = np.zeros((new_h, new_w, channels), dtype=np.float32)
-        kernel = create_1d_kernel(new_h, max(1, scale_h), method)
-        k_size = len(kernel)
-        k_center = k_size // 2
-        
-        for y_out in range(new_h):
-            y_in = (y_out + 0.5) * scale_h - 0.5
-            y_start = int(y_in) - k_center
-            
-            weighted_sum = np.zeros((new_w, channels), dtype=np.float32)
-            weight_sum = 0.0
-            
-            for k in range(k_size):
-                y_src = y_start + k
-                y_src_clamped = max(0, min(h - 1, y_src))
-                weight = kernel[k]
-                weighted_sum += temp[y_src_clamped, :, :] * weight
-                weight_sum += weight
-            
-            result[y_out, :, :] = weighted_sum / (weight_sum + 1e-10)
-    else:
-        result = temp
-    
-    if channels == 1:
-        result = result[:, :, 0]
-    
+        passes.append((h_axis, h, new_h))
+    passes.sort(key=lambda p: p[2] / p[1])
+
+    result = img
+    for axis, in_size, out_size in passes:
+        indices, weights = compute_resample_weights(in_size, out_size, method)
+        result = resample_axis_32bit(result, indices, weights, axis)
+
+    return result
+
+
+def resample_axis_torch(tensor: torch.Tensor, indices: torch.Tensor, weights: torch.Tensor,
+                        dim: int) -> torch.Tensor:
+    """
+    Torch counterpart of resample_axis_32bit: one gather-multiply-accumulate
+    per tap along ``dim``, on whatever device ``tensor`` lives on.
+    """
+    shape = [1] * tensor.dim()
+    shape[dim] = -1
+
+    result = None
+    tap = None
+    for k in range(indices.shape[1]):
+        if tap is None:
+            tap = tensor.index_select(dim, indices[:, k])
+            result = tap * weights[:, k].view(shape)
+        else:
+            torch.index_select(tensor, dim, indices[:, k], out=tap)
+            result.addcmul_(tap, weights[:, k].view(shape))
     return result
 
 
 def torch_resize_32bit(tensor: torch.Tensor, new_h: int, new_w: int, 
-                       method: str = 'bicubic') -> torch.Tensor:
+                       method: str = 'bicubic', channels_last: bool = True) -> torch.Tensor:
     """
     PyTorch-based resize maintaining 32-bit precision.
     Uses GPU acceleration when available.
+
+    Applies the same polyphase filter banks as separable_resize_32bit, so
+    Lanczos, Mitchell, Catmull-Rom etc. are the real kernels (antialiased on
+    downscale) and both paths agree to float32 rounding on CPU or CUDA.
+    ``channels_last`` gives the layout (BHWC/HWC, else BCHW/CHW); the
+    result is batched and in the same layout.
     """
-    # Ensure BCHW format
+    # Ensure batch dimension
     if tensor.dim() == 3:
         tensor = tensor.unsqueeze(0)
     
-    # Convert to BCHW if needed (from BHWC)
-    if tensor.shape[-1] in [1, 3, 4]:
-        tensor = tensor.permute(0, 3, 1, 2)
+    # Work in BHWC: gathers along H/W are fastest with channels innermost
+    if not channels_last:
+        tensor = tensor.permute(0, 2, 3, 1)
     
     # Ensure float32
-    tensor = tensor.float()
-    
-    # Map method names
-    mode_map = {
-        'nearest': 'nearest',
-        'bilinear': 'bilinear',
-        'bicubic': 'bicubic',
-        'lanczos': 'bicubic',  # Fallback
-        'lanczos4': 'bicubic',
-        'mitchell': 'bicubic',
-        'catrom': 'bicubic',
-        'hermite': 'bilinear',
-        'gaussian': 'bilinear',
-    }
-    
-    mode = mode_map.get(method, 'bicubic')
-    align_corners = False if mode != 'nearest' else None
+    resized = tensor.float()
+    h, w = resized.shape[1], resized.shape[2]
     
-    if mode == 'nearest':
-        resized = F.interpolate(tensor, size=(new_h, new_w), mode=mode)
-    else:
-        resized = F.interpolate(tensor, size=(new_h, new_w), mode=mode, 
-                                align_corners=align_corners, antialias=True)
+    # Run the pass that shrinks the data most first to keep the intermediate small
+    passes = []
+    if new_w != w:
+        passes.append((2, w, new_w))
+    if new_h != h:
+        passes.append((1, h, new_h))
+    passes.sort(key=lambda p: p[2] / p[1])
     
-    # Convert back to BHWC
-    resized = resized.permute(0, 2, 3, 1)
+    for dim, in_size, out_size in passes:
+        bank = get_polyphase_filter_bank(in_size, out_size, method)
+        indices, weights = bank.torch_tables(resized.device)
+        resized = resample_axis_torch(resized, indices, weights, dim)
     
-    return resized
+    return resized if channels_last else resized.permute(0, 3, 1, 2)
+
+
+# =============================================================================
+# FLOAT BLUR BACKEND
+# =============================================================================
+# Every blur here goes through radiance_ops.gaussian_blur, which picks a
+# direct, pyramid or FFT blur by sigma and stays float32 throughout. Frame
+# edges are replicated, like the resize filters do.
+
+BLUR_PAD_MODE = "replicate"
+
+
+def _luminance_32bit(img: np.ndarray) -> np.ndarray:
+    """Rec.709 luminance of an HWC/BHWC array (first channel if not RGB)."""
+    if img.shape[-1] >= 3:
+        return 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
+    return img[..., 0]
+
+
+def _edge_magnitude_32bit(lum: np.ndarray) -> np.ndarray:
+    """Gradient magnitude normalized per frame to 0-1 (HW or BHW)."""
+    grad_x = np.abs(np.diff(lum, axis=-1, prepend=lum[..., :1]))
+    grad_y = np.abs(np.diff(lum, axis=-2, prepend=lum[..., :1, :]))
+    edges = np.sqrt(grad_x ** 2 + grad_y ** 2)
+    return edges / (edges.max(axis=(-2, -1), keepdims=True) + 1e-10)
 
 
 # =============================================================================
@@ -272,29 +458,13 @@ def torch_resize_32bit(tensor: torch.Tensor, new_h: int, new_w: int,
 # =============================================================================
 
 def unsharp_mask_32bit(img: np.ndarray, amount: float = 1.0, 
-                       radius: float = 1.0, threshold: float = 0.0) -> np.ndarray:
+                       radius: float = 1.0, threshold: float = 0.0,
+                       device: Optional[torch.device] = None) -> np.ndarray:
     """
     Unsharp mask in 32-bit precision.
     """
-    from PIL import ImageFilter
-    h, w = img.shape[:2]
-    
     # Create blurred version
-    blurred = np.zeros_like(img)
-    for c in range(img.shape[2]):
-        # Scale to 0-255 for PIL, then back
-        channel = img[..., c]
-        ch_min, ch_max = channel.min(), channel.max()
-        ch_range = ch_max - ch_min if ch_max != ch_min else 1.0
-        
-        ch_normalized = ((channel - ch_min) / ch_range * 255).astype(np.uint8)
-        ch_pil = Image.fromarray(ch_normalized)
-        ch_pil = ch_pil.filter(ImageFilter.GaussianBlur(radius=radius))
-        if ch_pil.size != (w, h):
-            ch_pil = ch_pil.resize((w, h), Image.BILINEAR)
-        
-        blurred_ch = np.array(ch_pil).astype(np.float32) / 255.0 * ch_range + ch_min
-        blurred[..., c] = blurred_ch
+    blurred = gaussian_blur_array(img, radius, device=device, pad_mode=BLUR_PAD_MODE)
     
     # Calculate mask
     mask = img - blurred
@@ -311,28 +481,13 @@ def unsharp_mask_32bit(img: np.ndarray, amount: float = 1.0,
 
 
 def high_pass_sharpen_32bit(img: np.ndarray, strength: float = 0.5,
-                            radius: float = 3.0) -> np.ndarray:
+                            radius: float = 3.0,
+                            device: Optional[torch.device] = None) -> np.ndarray:
     """
     High-pass sharpening in 32-bit.
     """
-    from PIL import ImageFilter
-    h, w = img.shape[:2]
-    
     # Create heavily blurred version
-    low_pass = np.zeros_like(img)
-    for c in range(img.shape[2]):
-        channel = img[..., c]
-        ch_min, ch_max = channel.min(), channel.max()
-        ch_range = ch_max - ch_min if ch_max != ch_min else 1.0
-        
-        ch_normalized = np.clip((channel - ch_min) / ch_range * 255, 0, 255).astype(np.uint8)
-        ch_pil = Image.fromarray(ch_normalized)
-        ch_pil = ch_pil.filter(ImageFilter.GaussianBlur(radius=radius))
-        if ch_pil.size != (w, h):
-            ch_pil = ch_pil.resize((w, h), Image.BILINEAR)
-        
-        low_pass_ch = np.array(ch_pil).astype(np.float32) / 255.0 * ch_range + ch_min
-        low_pass[..., c] = low_pass_ch
+    low_pass = gaussian_blur_array(img, radius, device=device, pad_mode=BLUR_PAD_MODE)
     
     # High pass = original - low pass
     high_pass = img - low_pass
@@ -345,38 +500,25 @@ def high_pass_sharpen_32bit(img: np.ndarray, strength: float = 0.5,
 
 def detail_enhancement_32bit(img: np.ndarray, detail_strength: float = 0.5,
                              edge_strength: float = 0.3,
-                             local_contrast: float = 0.2) -> np.ndarray:
+                             local_contrast: float = 0.2,
+                             device: Optional[torch.device] = None) -> np.ndarray:
     """
     Multi-scale detail enhancement in 32-bit.
     """
-    from PIL import ImageFilter
-    h, w = img.shape[:2]
-    
     result = img.copy()
     
     # Calculate luminance
-    if img.shape[2] >= 3:
-        lum = 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
-    else:
-        lum = img[..., 0]
+    lum = _luminance_32bit(img)
     
     # Multi-scale detail extraction
     scales = [1.0, 2.0, 4.0]
     detail_layers = []
     
-    prev_blur = lum.copy()
+    prev_blur = lum
     for scale in scales:
         # Blur at this scale
-        lum_min, lum_max = lum.min(), lum.max()
-        lum_range = lum_max - lum_min if lum_max != lum_min else 1.0
-        
-        lum_normalized = np.clip((prev_blur - lum_min) / lum_range * 255, 0, 255).astype(np.uint8)
-        lum_pil = Image.fromarray(lum_normalized)
-        lum_pil = lum_pil.filter(ImageFilter.GaussianBlur(radius=scale))
-        if lum_pil.size != (w, h):
-            lum_pil = lum_pil.resize((w, h), Image.BILINEAR)
-        
-        current_blur = np.array(lum_pil).astype(np.float32) / 255.0 * lum_range + lum_min
+        current_blur = gaussian_blur_array(prev_blur[..., np.newaxis], scale, device=device,
+                                           pad_mode=BLUR_PAD_MODE)[..., 0]
         
         # Detail at this scale
         detail = prev_blur - current_blur
@@ -390,24 +532,19 @@ def detail_enhancement_32bit(img: np.ndarray, detail_strength: float = 0.5,
         combined_detail += detail * weight * detail_strength
     
     # Apply to color channels
-    for c in range(min(3, img.shape[2])):
-        result[..., c] = img[..., c] + combined_detail
+    n_color = min(3, img.shape[-1])
+    result[..., :n_color] = img[..., :n_color] + combined_detail[..., np.newaxis]
     
     # Local contrast enhancement
     if local_contrast > 0:
         # Calculate local mean
         local_radius = 15
-        lum_normalized = np.clip((lum - lum.min()) / (lum.max() - lum.min() + 1e-10) * 255, 0, 255).astype(np.uint8)
-        lum_pil = Image.fromarray(lum_normalized)
-        lum_pil = lum_pil.filter(ImageFilter.GaussianBlur(radius=local_radius))
-        if lum_pil.size != (w, h):
-            lum_pil = lum_pil.resize((w, h), Image.BILINEAR)
-        local_mean = np.array(lum_pil).astype(np.float32) / 255.0 * (lum.max() - lum.min()) + lum.min()
+        local_mean = gaussian_blur_array(lum[..., np.newaxis], local_radius, device=device,
+                                         pad_mode=BLUR_PAD_MODE)[..., 0]
         
         # Local contrast
         local_diff = (lum - local_mean) * local_contrast
-        for c in range(min(3, img.shape[2])):
-            result[..., c] = result[..., c] + local_diff
+        result[..., :n_color] = result[..., :n_color] + local_diff[..., np.newaxis]
     
     return result
 
@@ -416,43 +553,16 @@ def detail_enhancement_32bit(img: np.ndarray, detail_strength: float = 0.5,
 # ANTI-ALIASING
 # =============================================================================
 
-def apply_antialiasing_32bit(img: np.ndarray, strength: float = 0.5) -> np.ndarray:
+def apply_antialiasing_32bit(img: np.ndarray, strength: float = 0.5,
+                             device: Optional[torch.device] = None) -> np.ndarray:
     """
     Apply edge-aware antialiasing in 32-bit.
     """
-    from PIL import ImageFilter
-    h, w = img.shape[:2]
-    
-    # Calculate luminance
-    if img.shape[2] >= 3:
-        lum = 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
-    else:
-        lum = img[..., 0]
-    
-    # Edge detection using Sobel-like operation
-    # Simple gradient magnitude
-    grad_x = np.abs(np.diff(lum, axis=1, prepend=lum[:, :1]))
-    grad_y = np.abs(np.diff(lum, axis=0, prepend=lum[:1, :]))
-    edges = np.sqrt(grad_x ** 2 + grad_y ** 2)
-    
-    # Normalize edges
-    edges = edges / (edges.max() + 1e-10)
+    # Edge detection: simple gradient magnitude of luminance
+    edges = _edge_magnitude_32bit(_luminance_32bit(img))
     
     # Create blurred version
-    blurred = np.zeros_like(img)
-    for c in range(img.shape[2]):
-        channel = img[..., c]
-        ch_min, ch_max = channel.min(), channel.max()
-        ch_range = ch_max - ch_min if ch_max != ch_min else 1.0
-        
-        ch_normalized = np.clip((channel - ch_min) / ch_range * 255, 0, 255).astype(np.uint8)
-        ch_pil = Image.fromarray(ch_normalized)
-        ch_pil = ch_pil.filter(ImageFilter.GaussianBlur(radius=1.0))
-        if ch_pil.size != (w, h):
-            ch_pil = ch_pil.resize((w, h), Image.BILINEAR)
-        
-        blurred_ch = np.array(ch_pil).astype(np.float32) / 255.0 * ch_range + ch_min
-        blurred[..., c] = blurred_ch
+    blurred = gaussian_blur_array(img, 1.0, device=device, pad_mode=BLUR_PAD_MODE)
     
     # Blend based on edges
     edge_mask = (edges * strength)[..., np.newaxis]
@@ -465,108 +575,332 @@ def apply_antialiasing_32bit(img: np.ndarray, strength: float = 0.5) -> np.ndarr
 # TILE PROCESSING
 # =============================================================================
 
+# Rough multiple of a tile's input + output bytes a worker keeps alive
+# (resampled intermediates, blur buffers, the blended copy).
+TILE_WORKING_SET_FACTOR = 4
+
+
+def clamp_tile_overlap(tile_size: int, overlap: int) -> int:
+    """Overlap limited to under half a tile, so the stride stays above tile_size / 2."""
+    return max(0, min(overlap, (tile_size - 1) // 2))
+
+
+def _tile_starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    """Tile origins along one axis; the last tile is pinned to the far edge."""
+    if length <= tile_size:
+        return [0]
+    stride = tile_size - clamp_tile_overlap(tile_size, overlap)
+    starts = list(range(0, length - tile_size, stride))
+    starts.append(length - tile_size)
+    return starts
+
+
+def get_tile_grid(h: int, w: int, tile_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """``(y, x, tile_h, tile_w)`` for every tile covering an ``h`` x ``w`` image."""
+    tiles = []
+    for y in _tile_starts(h, tile_size, overlap):
+        for x in _tile_starts(w, tile_size, overlap):
+            tiles.append((y, x, min(tile_size, h - y), min(tile_size, w - x)))
+    return tiles
+
+
+def _blend_ramp(length: int, overlap: int, feather_start: bool, feather_end: bool) -> np.ndarray:
+    """1D blend weights, ramping only on sides that overlap a neighbouring tile."""
+    ramp = np.ones(length, dtype=np.float32)
+    n = min(overlap, length // 2)
+    if n > 0:
+        edge = (np.arange(n, dtype=np.float32) + 1.0) / (n + 1.0)
+        if feather_start:
+            ramp[:n] = edge
+        if feather_end:
+            ramp[-n:] = np.minimum(ramp[-n:], edge[::-1])
+    return ramp
+
+
+class _TileBlender:
+    """Output placement and cached feather windows for one tiled job."""
+
+    def __init__(self, h: int, w: int, scale: float, overlap: int):
+        self.h = h
+        self.w = w
+        self.scale = scale
+        self.out_h = int(h * scale)
+        self.out_w = int(w * scale)
+        self.out_overlap = int(round(overlap * scale))
+        self.windows = {}
+
+    def row_start(self, y: int, th: int) -> int:
+        """Output row where a tile row starting at source row ``y`` lands."""
+        if y + th >= self.h:
+            return max(0, self.out_h - int(th * self.scale))
+        return int(round(y * self.scale))
+
+    def place(self, tile_info, processed: np.ndarray):
+        """``(out_y, out_x, tile_data, weight)`` for a processed tile."""
+        y, x, th, tw = tile_info
+        if processed.ndim == 2:
+            processed = processed[:, :, np.newaxis]
+
+        # Tiles touching the far edge are anchored to it
+        ph = min(processed.shape[0], self.out_h)
+        pw = min(processed.shape[1], self.out_w)
+        out_y = self.out_h - ph if y + th >= self.h else min(int(round(y * self.scale)), self.out_h - ph)
+        out_x = self.out_w - pw if x + tw >= self.w else min(int(round(x * self.scale)), self.out_w - pw)
+
+        key = (ph, pw, y > 0, y + th < self.h, x > 0, x + tw < self.w)
+        if key not in self.windows:
+            wy = _blend_ramp(ph, self.out_overlap, key[2], key[3])
+            wx = _blend_ramp(pw, self.out_overlap, key[4], key[5])
+            self.windows[key] = wy[:, np.newaxis] * wx[np.newaxis, :]
+
+        return out_y, out_x, processed[:ph, :pw], self.windows[key]
+
+
+def _run_tiles(tiles, run_tile, on_result, num_workers: int, max_in_flight: int):
+    """
+    Run ``run_tile`` over ``tiles`` on a bounded thread pool, feeding results
+    to ``on_result`` in the caller's thread. torch's intra-op pool is shared
+    by all workers, so it is shrunk to the workers' share of the CPUs.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    if num_workers <= 1:
+        for tile_info in tiles:
+            on_result(tile_info, run_tile(tile_info))
+        return
+
+    with torch_cpu_threads(max(1, cpu_thread_count() // num_workers)), \
+            ThreadPoolExecutor(max_workers=num_workers) as pool:
+        pending = {}
+        for tile_info in tiles:
+            pending[pool.submit(run_tile, tile_info)] = tile_info
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    on_result(pending.pop(future), future.result())
+        for future in list(pending):
+            on_result(pending.pop(future), future.result())
+
+
+def _tile_runner(img, process_func, kwargs):
+    """Per-tile callable that slices a float32 tile out of ``img`` and processes it."""
+    def run_tile(tile_info):
+        y, x, th, tw = tile_info
+        tile = np.asarray(img[y:y + th, x:x + tw], dtype=np.float32)
+        return process_func(tile, **kwargs)
+
+    return run_tile
+
+
+def _tile_concurrency(tile_size: int, channels: int, scale: float, num_workers: int,
+                      memory_budget_mb: float, n_tiles: int) -> Tuple[int, int]:
+    """``(num_workers, max_in_flight)`` so tiles in flight fit the memory budget."""
+    tile_bytes = tile_size * tile_size * channels * 4 * (1 + scale * scale)
+    max_in_flight = int(memory_budget_mb * 1024 * 1024 // (tile_bytes * TILE_WORKING_SET_FACTOR))
+    num_workers = max(1, min(num_workers, max(1, max_in_flight), n_tiles))
+    return num_workers, max(num_workers, max_in_flight)
+
+
 def process_tiles_32bit(img: np.ndarray, tile_size: int, overlap: int,
-                        process_func, **kwargs) -> np.ndarray:
+                        process_func, scale: float = None, num_workers: int = 1,
+                        memory_budget_mb: float = 2048, **kwargs) -> np.ndarray:
     """
     Process image in tiles with overlap for seamless results.
     Maintains 32-bit precision throughout.
+
+    The output size comes from ``scale`` (probed with one tile only when it
+    is not given). Tiles run on a thread pool of ``num_workers``; the number
+    of tiles in flight is capped so their working set stays under
+    ``memory_budget_mb``. ``overlap`` is clamped below half a tile.
+    Results are blended with feathered windows built once per tile shape.
     """
     h, w = img.shape[:2]
     channels = img.shape[2] if len(img.shape) > 2 else 1
+    overlap = clamp_tile_overlap(tile_size, overlap)
     
-    # Calculate output size from a test tile
-    test_tile = img[:min(tile_size, h), :min(tile_size, w)]
-    test_output = process_func(test_tile, **kwargs)
+    tiles = get_tile_grid(h, w, tile_size, overlap)
     
-    scale_h = test_output.shape[0] / test_tile.shape[0]
-    scale_w = test_output.shape[1] / test_tile.shape[1]
+    if scale is None:
+        ty, tx, th, tw = tiles[0]
+        probe = process_func(img[ty:ty + th, tx:tx + tw], **kwargs)
+        scale = probe.shape[0] / th
     
-    out_h = int(h * scale_h)
-    out_w = int(w * scale_w)
-    out_tile_size = int(tile_size * scale_h)
-    out_overlap = int(overlap * scale_h)
+    blender = _TileBlender(h, w, scale, overlap)
     
     # Initialize output and weight buffers
-    output = np.zeros((out_h, out_w, channels), dtype=np.float32)
-    weights = np.zeros((out_h, out_w), dtype=np.float32)
-    
-    # Create blending weight
-    blend_weight = create_tile_weight(out_tile_size, out_overlap)
-    
-    # Process tiles
-    stride = tile_size - overlap
-    out_stride = out_tile_size - out_overlap
-    
-    y = 0
-    while y < h:
-        x = 0
-        while x < w:
-            # Extract tile
-            y_end = min(y + tile_size, h)
-            x_end = min(x + tile_size, w)
-            tile = img[y:y_end, x:x_end]
-            
-            # Pad if needed
-            if tile.shape[0] < tile_size or tile.shape[1] < tile_size:
-                padded = np.zeros((tile_size, tile_size, channels), dtype=np.float32)
-                padded[:tile.shape[0], :tile.shape[1]] = tile
-                tile = padded
-            
-            # Process tile
-            processed = process_func(tile, **kwargs)
-            
-            # Calculate output position
-            out_y = int(y * scale_h)
-            out_x = int(x * scale_w)
-            out_y_end = min(out_y + out_tile_size, out_h)
-            out_x_end = min(out_x + out_tile_size, out_w)
-            
-            # Get tile weight
-            tile_h = out_y_end - out_y
-            tile_w = out_x_end - out_x
-            weight = blend_weight[:tile_h, :tile_w]
-            
-            # Accumulate
-            for c in range(channels):
-                output[out_y:out_y_end, out_x:out_x_end, c] += processed[:tile_h, :tile_w, c] * weight
-            weights[out_y:out_y_end, out_x:out_x_end] += weight
-            
-            x += stride
-            if x >= w - overlap and x < w:
-                x = w - tile_size
-                if x < 0:
-                    break
-        
-        y += stride
-        if y >= h - overlap and y < h:
-            y = h - tile_size
-            if y < 0:
-                break
+    output = np.zeros((blender.out_h, blender.out_w, channels), dtype=np.float32)
+    weights = np.zeros((blender.out_h, blender.out_w), dtype=np.float32)
+    
+    def accumulate(tile_info, processed):
+        out_y, out_x, data, weight = blender.place(tile_info, processed)
+        ph, pw = weight.shape
+        output[out_y:out_y + ph, out_x:out_x + pw] += data * weight[..., np.newaxis]
+        weights[out_y:out_y + ph, out_x:out_x + pw] += weight
+    
+    num_workers, max_in_flight = _tile_concurrency(
+        tile_size, channels, scale, num_workers, memory_budget_mb, len(tiles))
+    _run_tiles(tiles, _tile_runner(img, process_func, kwargs), accumulate,
+               num_workers, max_in_flight)
     
     # Normalize
-    weights = np.maximum(weights, 1e-10)
-    for c in range(channels):
-        output[..., c] /= weights
+    output /= np.maximum(weights, 1e-10)[..., np.newaxis]
     
     return output
 
 
-def create_tile_weight(size: int, overlap: int) -> np.ndarray:
-    """Create smooth blending weight for tiles."""
-    weight = np.ones((size, size), dtype=np.float32)
-    
-    if overlap > 0:
-        # Create linear ramp for edges
-        ramp = np.linspace(0, 1, overlap)
+def stream_tiles_32bit(src, tile_size: int, overlap: int, process_func, scale: float,
+                       out: np.ndarray, num_workers: int = 1, memory_budget_mb: float = 2048,
+                       finalize_func=None, **kwargs) -> int:
+    """
+    Out-of-core variant of process_tiles_32bit.
+
+    ``src`` (HWC, any sliceable array such as np.memmap) is read one tile at
+    a time and blended output rows are written straight into ``out``
+    (typically a disk-backed np.memmap of the final size). Only the current
+    band of output rows and its weights stay resident; rows no later tile
+    row can touch are normalized, passed through ``finalize_func`` and
+    flushed. Returns the peak bytes held by the band buffers.
+    """
+    h, w = src.shape[:2]
+    overlap = clamp_tile_overlap(tile_size, overlap)
+    blender = _TileBlender(h, w, scale, overlap)
+    out_w = blender.out_w
+    channels = out.shape[-1]
+    
+    rows = _tile_starts(h, tile_size, overlap)
+    cols = _tile_starts(w, tile_size, overlap)
+    num_workers, max_in_flight = _tile_concurrency(
+        tile_size, src.shape[2], scale, num_workers, memory_budget_mb, len(cols))
+    run_tile = _tile_runner(src, process_func, kwargs)
+    
+    band_y0 = 0
+    band = np.zeros((0, out_w, channels), dtype=np.float32)
+    band_w = np.zeros((0, out_w), dtype=np.float32)
+    peak_bytes = 0
+    
+    def accumulate(tile_info, processed):
+        nonlocal band, band_w
+        out_y, out_x, data, weight = blender.place(tile_info, processed)
+        ph, pw = weight.shape
+        if out_y < band_y0:
+            raise RuntimeError("Tile overlaps rows that were already flushed; increase tile_overlap")
+        needed = out_y + ph - band_y0
+        if needed > band.shape[0]:
+            extra = needed - band.shape[0]
+            band = np.concatenate([band, np.zeros((extra, out_w, channels), dtype=np.float32)])
+            band_w = np.concatenate([band_w, np.zeros((extra, out_w), dtype=np.float32)])
+        by = out_y - band_y0
+        band[by:by + ph, out_x:out_x + pw] += data * weight[..., np.newaxis]
+        band_w[by:by + ph, out_x:out_x + pw] += weight
+    
+    for i, y in enumerate(rows):
+        th = min(tile_size, h - y)
+        row_tiles = [(y, x, th, min(tile_size, w - x)) for x in cols]
+        _run_tiles(row_tiles, run_tile, accumulate, num_workers, max_in_flight)
+        peak_bytes = max(peak_bytes, band.nbytes + band_w.nbytes)
+        
+        # Flush every row the next tile row can't reach (2 rows of slack for rounding)
+        if i + 1 < len(rows):
+            next_y = rows[i + 1]
+            flush_to = max(band_y0, blender.row_start(next_y, min(tile_size, h - next_y)) - 2)
+        else:
+            flush_to = blender.out_h
+        n = min(flush_to - band_y0, band.shape[0])
+        if n <= 0:
+            continue
+        
+        rows_out = band[:n] / np.maximum(band_w[:n], 1e-10)[..., np.newaxis]
+        if finalize_func is not None:
+            rows_out = finalize_func(rows_out)
+        out[band_y0:band_y0 + n] = rows_out
         
-        # Apply to edges
-        for i in range(overlap):
-            weight[i, :] *= ramp[i]
-            weight[-(i+1), :] *= ramp[i]
-            weight[:, i] *= ramp[i]
-            weight[:, -(i+1)] *= ramp[i]
+        band = band[n:].copy()
+        band_w = band_w[n:].copy()
+        band_y0 += n
+    
+    return peak_bytes
+
+
+def reset_peak_rss() -> bool:
+    """Restart the peak resident memory count (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+    return peak / (1024 * 1024) if peak is not None else None
+
+
+# Scratch .npy files behind streamed outputs that could not be unlinked
+# while mapped (Windows). Retried before every streamed run and at exit.
+_STREAM_SCRATCH_FILES = set()
+
+
+def _remove_stream_scratch_files():
+    for path in list(_STREAM_SCRATCH_FILES):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            continue
+        _STREAM_SCRATCH_FILES.discard(path)
+
+
+def open_stream_scratch(directory: str, shape: Tuple[int, ...]) -> Tuple[np.memmap, str]:
+    """
+    Disk-backed float32 array for a streamed result, owned by whoever holds it.
+
+    The backing file is unlinked straight away where the OS allows it while
+    mapped (POSIX), so its space is freed with the last reference to the
+    array. Otherwise it is removed by the next streamed run or at exit once
+    nothing maps it.
+    """
+    import tempfile
     
-    return weight
+    _remove_stream_scratch_files()
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".npy", prefix="fxtd_upscale_", dir=directory)
+    os.close(fd)
+    array = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+    try:
+        os.remove(path)
+    except OSError:
+        _STREAM_SCRATCH_FILES.add(path)
+    return array, path
+
+
+atexit.register(_remove_stream_scratch_files)
+
+
+def create_tile_weight(size: int, overlap: int) -> np.ndarray:
+    """Create smooth blending weight for tiles (feathered on all four sides)."""
+    ramp = _blend_ramp(size, overlap, True, True)
+    return ramp[:, np.newaxis] * ramp[np.newaxis, :]
 
 
 # =============================================================================
@@ -593,6 +927,458 @@ def srgb_to_linear_32bit(img: np.ndarray) -> np.ndarray:
     return result.astype(np.float32)
 
 
+def linear_to_srgb_torch(tensor: torch.Tensor) -> torch.Tensor:
+    """Torch counterpart of linear_to_srgb_32bit."""
+    return torch.where(
+        tensor <= 0.0031308,
+        tensor * 12.92,
+        1.055 * torch.pow(tensor.clamp_min(0), 1 / 2.4) - 0.055
+    )
+
+
+def srgb_to_linear_torch(tensor: torch.Tensor) -> torch.Tensor:
+    """Torch counterpart of srgb_to_linear_32bit."""
+    return torch.where(
+        tensor <= 0.04045,
+        tensor / 12.92,
+        torch.pow((tensor.clamp_min(0) + 0.055) / 1.055, 2.4)
+    )
+
+
+# =============================================================================
+# BATCHED TORCH PIPELINE
+# =============================================================================
+# Whole-batch BHWC versions of the 32-bit helpers above. The numpy functions
+# remain the per-frame reference implementation these are checked against.
+
+# Rough multiple of a frame's input + output bytes alive during one pipeline
+# (colour conversion, resample intermediate, blur buffers).
+BATCH_WORKING_SET_FACTOR = 6
+
+# On CPU the elementwise stages are memory-bound, so chunks are kept small
+# enough to stay cache friendly even when the memory limit allows more.
+BATCH_CPU_CHUNK_MB = 128
+
+
+def _luminance_torch(tensor: torch.Tensor) -> torch.Tensor:
+    """Rec.709 luminance of a BHWC tensor (first channel if not RGB)."""
+    if tensor.shape[-1] >= 3:
+        return 0.2126 * tensor[..., 0] + 0.7152 * tensor[..., 1] + 0.0722 * tensor[..., 2]
+    return tensor[..., 0]
+
+
+def _edge_magnitude_torch(lum: torch.Tensor) -> torch.Tensor:
+    """Gradient magnitude of a BHW tensor, normalized per frame to 0-1."""
+    grad_x = torch.diff(lum, dim=-1, prepend=lum[..., :1]).abs()
+    grad_y = torch.diff(lum, dim=-2, prepend=lum[..., :1, :]).abs()
+    edges = torch.sqrt(grad_x ** 2 + grad_y ** 2)
+    return edges / (edges.amax(dim=(-2, -1), keepdim=True) + 1e-10)
+
+
+def unsharp_mask_torch(tensor: torch.Tensor, amount: float = 1.0,
+                       radius: float = 1.0, threshold: float = 0.0) -> torch.Tensor:
+    """Batched unsharp_mask_32bit."""
+    mask = tensor - gaussian_blur(tensor, radius, pad_mode=BLUR_PAD_MODE)
+    if threshold > 0:
+        mask = torch.where(mask.abs() > threshold, mask, torch.zeros_like(mask))
+    return tensor + mask * amount
+
+
+def detail_enhancement_torch(tensor: torch.Tensor, detail_strength: float = 0.5,
+                             local_contrast: float = 0.2) -> torch.Tensor:
+    """Batched detail_enhancement_32bit."""
+    lum = _luminance_torch(tensor).unsqueeze(-1)
+    
+    combined_detail = torch.zeros_like(lum)
+    prev_blur = lum
+    for scale, weight in zip([1.0, 2.0, 4.0], [0.5, 0.3, 0.2]):
+        current_blur = gaussian_blur(prev_blur, scale, pad_mode=BLUR_PAD_MODE)
+        combined_detail += (prev_blur - current_blur) * (weight * detail_strength)
+        prev_blur = current_blur
+    
+    n_color = min(3, tensor.shape[-1])
+    result = tensor.clone()
+    result[..., :n_color] += combined_detail
+    
+    if local_contrast > 0:
+        local_mean = gaussian_blur(lum, 15, pad_mode=BLUR_PAD_MODE)
+        result[..., :n_color] += (lum - local_mean) * local_contrast
+    
+    return result
+
+
+def apply_antialiasing_torch(tensor: torch.Tensor, strength: float = 0.5) -> torch.Tensor:
+    """Batched apply_antialiasing_32bit."""
+    edge_mask = (_edge_magnitude_torch(_luminance_torch(tensor)) * strength).unsqueeze(-1)
+    blurred = gaussian_blur(tensor, 1.0, pad_mode=BLUR_PAD_MODE)
+    return tensor * (1 - edge_mask) + blurred * edge_mask
+
+
+def get_batch_device(use_gpu: bool = True) -> torch.device:
+    """CUDA when requested and available, else CPU."""
+    if use_gpu and torch.cuda.is_available():
+        return torch.device("cuda")
+    return torch.device("cpu")
+
+
+def run_batched_torch(image: torch.Tensor, out_h: int, out_w: int, process_func,
+                      device: torch.device, memory_limit_mb: float = 4096) -> torch.Tensor:
+    """
+    Run ``process_func`` (BHWC tensor -> BHWC tensor of ``out_h`` x ``out_w``)
+    over ``image`` on ``device``, in as few frame chunks as fit under
+    ``memory_limit_mb`` (and BATCH_CPU_CHUNK_MB on CPU). Results land in one
+    preallocated float32 CPU tensor.
+    """
+    b, h, w, c = image.shape
+    if device.type == "cpu":
+        memory_limit_mb = min(memory_limit_mb, BATCH_CPU_CHUNK_MB)
+    frame_bytes = (h * w + out_h * out_w) * c * 4 * BATCH_WORKING_SET_FACTOR
+    chunk = max(1, min(b, int(memory_limit_mb * 1024 * 1024 // frame_bytes)))
+    
+    output = torch.empty((b, out_h, out_w, c), dtype=torch.float32)
+    for start in range(0, b, chunk):
+        frames = image[start:start + chunk].to(device).float()
+        output[start:start + chunk] = process_func(frames).cpu()
+    return output
+
+
+# =============================================================================
+# MIP PYRAMID DOWNSCALING
+# =============================================================================
+# Large reductions go through exact 2x area averages first, so the final
+# kernel resample only ever shrinks by less than 2x: no aliasing, and its
+# cost no longer grows with the source size per output pixel.
+
+MIP_PYRAMID_CACHE_MB = 2048
+
+_MIP_PYRAMID_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+
+
+def mip_level_sizes(h: int, w: int, new_h: int, new_w: int) -> List[Tuple[int, int]]:
+    """Sizes of the 2x levels below (h, w) that are still >= the target."""
+    sizes = []
+    while (h + 1) // 2 >= new_h and (w + 1) // 2 >= new_w and (h > 1 or w > 1):
+        h, w = (h + 1) // 2, (w + 1) // 2
+        sizes.append((h, w))
+    return sizes
+
+
+def box_reduce_2x_32bit(img: np.ndarray) -> np.ndarray:
+    """Exact 2x area reduction of an HWC image (odd edges replicated)."""
+    if img.shape[0] % 2:
+        img = np.concatenate([img, img[-1:]], axis=0)
+    if img.shape[1] % 2:
+        img = np.concatenate([img, img[:, -1:]], axis=1)
+    return 0.25 * (img[0::2, 0::2] + img[1::2, 0::2] + img[0::2, 1::2] + img[1::2, 1::2])
+
+
+def box_reduce_2x_torch(tensor: torch.Tensor) -> torch.Tensor:
+    """Batched box_reduce_2x_32bit for BHWC tensors."""
+    if tensor.shape[1] % 2:
+        tensor = torch.cat([tensor, tensor[:, -1:]], dim=1)
+    if tensor.shape[2] % 2:
+        tensor = torch.cat([tensor, tensor[:, :, -1:]], dim=2)
+    return 0.25 * (tensor[:, 0::2, 0::2] + tensor[:, 1::2, 0::2] +
+                   tensor[:, 0::2, 1::2] + tensor[:, 1::2, 1::2])
+
+
+def clear_mip_pyramid_cache():
+    """Drop every cached pyramid level."""
+    _MIP_PYRAMID_CACHE.clear()
+
+
+def get_mip_level(image: torch.Tensor, level: int, prepare_func, prepare_key,
+                  device: torch.device, memory_limit_mb: float = 4096) -> torch.Tensor:
+    """
+    Level ``level`` (>= 1) of the 2x area pyramid of ``image``, as a float32
+    CPU tensor.
+
+    ``prepare_func`` maps source frames into the working space (linear light,
+    pre-blur) before the first reduction; ``prepare_key`` identifies it.
+    Levels are cached per source tensor and key, so rendering thumbnail,
+    half and quarter proxies of the same frames builds each level once.
+    Entries are dropped when the source is freed or modified in place, and
+    the oldest go first once MIP_PYRAMID_CACHE_MB is exceeded.
+    """
+    key = (id(image), tuple(image.shape), prepare_key)
+    entry = _MIP_PYRAMID_CACHE.get(key)
+    if entry is None or entry["ref"]() is not image or entry["version"] != image._version:
+        entry = {"ref": weakref.ref(image), "version": image._version, "levels": []}
+        _MIP_PYRAMID_CACHE[key] = entry
+    _MIP_PYRAMID_CACHE.move_to_end(key)
+
+    levels = entry["levels"]
+    while len(levels) < level:
+        if levels:
+            src, reduce = levels[-1], box_reduce_2x_torch
+        else:
+            src = image
+            reduce = lambda frames: box_reduce_2x_torch(prepare_func(frames))
+        out_h, out_w = (src.shape[1] + 1) // 2, (src.shape[2] + 1) // 2
+        levels.append(run_batched_torch(src, out_h, out_w, reduce, device, memory_limit_mb))
+
+    # Forget pyramids whose source is gone, then trim oldest-first to budget
+    for stale in [k for k, e in _MIP_PYRAMID_CACHE.items() if e["ref"]() is None]:
+        del _MIP_PYRAMID_CACHE[stale]
+    entry_bytes = lambda e: sum(t.numel() * t.element_size() for t in e["levels"])
+    total = sum(entry_bytes(e) for e in _MIP_PYRAMID_CACHE.values())
+    while total > MIP_PYRAMID_CACHE_MB * 1024 * 1024 and len(_MIP_PYRAMID_CACHE) > 1:
+        _, oldest = _MIP_PYRAMID_CACHE.popitem(last=False)
+        total -= entry_bytes(oldest)
+
+    return levels[level - 1]
+
+
+# =============================================================================
+# DITHERING
+# =============================================================================
+
+# Error-diffusion kernels as (dy, dx, weight) taps for a left-to-right scan,
+# with the divisor that normalises the weights.
+ERROR_DIFFUSION_KERNELS = {
+    "Floyd-Steinberg": (((0, 1, 7),
+                         (1, -1, 3), (1, 0, 5), (1, 1, 1)), 16.0),
+    "Jarvis": (((0, 1, 7), (0, 2, 5),
+                (1, -2, 3), (1, -1, 5), (1, 0, 7), (1, 1, 5), (1, 2, 3),
+                (2, -2, 1), (2, -1, 3), (2, 0, 5), (2, 1, 3), (2, 2, 1)), 48.0),
+    "Stucki": (((0, 1, 8), (0, 2, 4),
+                (1, -2, 2), (1, -1, 4), (1, 0, 8), (1, 1, 4), (1, 2, 2),
+                (2, -2, 1), (2, -1, 2), (2, 0, 4), (2, 1, 2), (2, 2, 1)), 42.0),
+}
+
+BAYER_4X4 = np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5]
+], dtype=np.float32) / 16.0 - 0.5
+
+BLUE_NOISE_SIZE = 64
+
+
+def quantize_32bit(img: np.ndarray, levels: int) -> np.ndarray:
+    """Round to ``levels`` steps in [0, 1] (round half up, clipped)."""
+    return np.clip(np.floor(img * levels + 0.5), 0, levels) / levels
+
+
+@functools.lru_cache(maxsize=8)
+def get_blue_noise_mask(size: int = BLUE_NOISE_SIZE) -> np.ndarray:
+    """
+    Tileable ``size`` x ``size`` blue-noise threshold mask in [-0.5, 0.5).
+
+    Built once per size with void-and-cluster ranking on a torus, so tiles
+    repeat without seams. The returned array is shared and read-only.
+    """
+    n = size * size
+    rng = np.random.default_rng(size)
+    d = np.minimum(np.arange(size), size - np.arange(size)).astype(np.float64)
+    kernel = np.exp(-(d[:, None] ** 2 + d[None, :] ** 2) / (2 * 1.5 ** 2))
+
+    def splat(energy, idx, sign):
+        y, x = divmod(int(idx), size)
+        energy += sign * np.roll(kernel, (y, x), axis=(0, 1)).ravel()
+
+    pattern = np.zeros(n, dtype=bool)
+    pattern[rng.choice(n, max(1, n // 10), replace=False)] = True
+    energy = np.real(np.fft.ifft2(np.fft.fft2(pattern.reshape(size, size)) *
+                                  np.fft.fft2(kernel))).ravel()
+
+    # Relax the initial pattern: move the tightest cluster into the largest
+    # void until they coincide.
+    while True:
+        cluster = np.argmax(np.where(pattern, energy, -np.inf))
+        pattern[cluster] = False
+        splat(energy, cluster, -1)
+        void = np.argmin(np.where(pattern, np.inf, energy))
+        pattern[void] = True
+        splat(energy, void, 1)
+        if void == cluster:
+            break
+
+    ranks = np.empty(n, dtype=np.int64)
+    ones = int(pattern.sum())
+
+    proto, e = pattern.copy(), energy.copy()
+    for rank in range(ones - 1, -1, -1):
+        idx = np.argmax(np.where(proto, e, -np.inf))
+        proto[idx] = False
+        splat(e, idx, -1)
+        ranks[idx] = rank
+
+    # Filling the largest void is the same as removing the tightest cluster
+    # of zeros once the ones are the majority, so one loop covers both phases.
+    proto, e = pattern, energy
+    for rank in range(ones, n):
+        idx = np.argmin(np.where(proto, np.inf, e))
+        proto[idx] = True
+        splat(e, idx, 1)
+        ranks[idx] = rank
+
+    mask = ((ranks + 0.5) / n - 0.5).reshape(size, size).astype(np.float32)
+    mask.setflags(write=False)
+    return mask
+
+
+def _tile_mask(mask: np.ndarray, h: int, w: int) -> np.ndarray:
+    mh, mw = mask.shape
+    return np.tile(mask, (h // mh + 1, w // mw + 1))[:h, :w]
+
+
+def _diffuse_wavefront(buf: np.ndarray, out: np.ndarray, levels: int,
+                       taps, reach: int, strength: float) -> None:
+    """
+    Raster-order error diffusion, vectorised along anti-diagonal wavefronts.
+
+    Pixel (y, x) only depends on pixels left of it in its row and at most
+    ``reach`` columns right of it in the rows above, so starting each row
+    ``reach + 1`` columns behind the previous one lets a whole wavefront be
+    quantised at once. ``buf`` is (H + depth, W + 2 * reach, N) and holds the
+    input plus accumulated error; ``out`` is (H, W, N).
+    """
+    h, w = out.shape[:2]
+    skew = reach + 1
+    rows = np.arange(h)
+    groups = []
+    for dy in sorted({t[0] for t in taps}):
+        row_taps = [t for t in taps if t[0] == dy]
+        dxs = np.array([t[1] for t in row_taps])
+        wts = np.array([t[2] for t in row_taps], dtype=np.float32)[:, None]
+        groups.append((dy, dxs, wts))
+
+    for t in range(w + skew * (h - 1)):
+        y0 = max(0, -(-(t - w + 1) // skew))
+        y1 = min(h - 1, t // skew)
+        ys = rows[y0:y1 + 1]
+        xs = t - skew * ys + reach
+        v = buf[ys, xs]
+        q = np.clip(np.floor(v * levels + 0.5), 0, levels) / levels
+        out[ys, xs - reach] = q
+        err = ((v - q) * strength)[:, None, :]
+        for dy, dxs, wts in groups:
+            buf[(ys + dy)[:, None], xs[:, None] + dxs] += err * wts
+
+
+# Above this many frame x channel lanes the serpentine scan steps all lanes
+# together with numpy; below it, plain Python floats per lane are faster
+SERPENTINE_VECTOR_LANES = 32
+
+
+def _scan_row_scalar(row: np.ndarray, q_row: np.ndarray, err: np.ndarray, levels: int,
+                     row_taps, reach: int, strength: float) -> None:
+    """Quantise one buffer row left to right, one lane at a time."""
+    w = q_row.shape[0]
+    inv = 1.0 / levels
+    floor = math.floor
+    for k, line in enumerate(row.T.tolist()):
+        q_line = [0.0] * w
+        e_line = [0.0] * w
+        for x in range(w):
+            v = line[x + reach]
+            q = floor((0.0 if v < 0.0 else 1.0 if v > 1.0 else v) * levels + 0.5) * inv
+            q_line[x] = q
+            e = (v - q) * strength
+            e_line[x] = e
+            for dx, wt in row_taps:
+                line[x + reach + dx] += e * wt
+        q_row[:, k] = q_line
+        err[:, k] = e_line
+
+
+def _scan_row_lanes(row: np.ndarray, q_row: np.ndarray, err: np.ndarray, levels: int,
+                    row_taps, reach: int, strength: float) -> None:
+    """Quantise one buffer row left to right, all lanes per numpy step."""
+    for x in range(q_row.shape[0]):
+        v = row[x + reach]
+        q = np.floor(np.clip(v, 0.0, 1.0) * levels + 0.5) / levels
+        q_row[x] = q
+        e = (v - q) * strength
+        err[x] = e
+        for dx, wt in row_taps:
+            row[x + reach + dx] += e * wt
+
+
+def _diffuse_serpentine(buf: np.ndarray, out: np.ndarray, levels: int,
+                        taps, reach: int, strength: float) -> None:
+    """
+    Serpentine error diffusion: even rows left to right, odd rows right to
+    left with the kernel mirrored.
+
+    Each row needs the whole previous row finished, so rows are strictly
+    sequential and only the in-row taps are scanned pixel by pixel, on a
+    mirrored view of the buffer for odd rows. The taps into lower rows are
+    then added for the whole row at once. Same buffer layout as
+    ``_diffuse_wavefront``.
+    """
+    h, w, n = out.shape
+    row_taps = [(dx, wt) for dy, dx, wt in taps if dy == 0]
+    below = [(dy, dx, wt) for dy, dx, wt in taps if dy > 0]
+    scan = _scan_row_lanes if n >= SERPENTINE_VECTOR_LANES else _scan_row_scalar
+    q_row = np.empty((w, n), dtype=np.float32)
+    err = np.empty((w, n), dtype=np.float32)
+    for y in range(h):
+        reverse = y % 2 == 1
+        scan(buf[y, ::-1] if reverse else buf[y], q_row, err, levels, row_taps, reach, strength)
+        out[y] = q_row[::-1] if reverse else q_row
+        e_row = err[::-1] if reverse else err
+        for dy, dx, wt in below:
+            dx = -dx if reverse else dx
+            buf[y + dy, reach + dx:reach + dx + w] += e_row * wt
+
+
+def error_diffusion_dither(img: np.ndarray, levels: int, kernel: str = "Floyd-Steinberg",
+                           strength: float = 1.0, serpentine: bool = True) -> np.ndarray:
+    """
+    Quantise a BHWC float image to ``levels`` steps with error diffusion.
+
+    ``strength`` scales the diffused error (0 is plain rounding). Raster
+    order is vectorised along wavefronts; serpentine order runs its rows one
+    after another and is several times slower (about 5x on a 4K frame).
+    """
+    taps, divisor = ERROR_DIFFUSION_KERNELS[kernel]
+    taps = tuple((dy, dx, wt / divisor) for dy, dx, wt in taps)
+    reach = max(abs(dx) for _, dx, _ in taps)
+    depth = max(dy for dy, _, _ in taps)
+
+    b, h, w, c = img.shape
+    # Channels and frames are independent, so fold them into one trailing axis.
+    planes = np.ascontiguousarray(img.transpose(1, 2, 0, 3).reshape(h, w, b * c),
+                                  dtype=np.float32)
+    buf = np.zeros((h + depth, w + 2 * reach, b * c), dtype=np.float32)
+    buf[:h, reach:reach + w] = planes
+    out = np.empty_like(planes)
+
+    if serpentine:
+        _diffuse_serpentine(buf, out, levels, taps, reach, strength)
+    else:
+        _diffuse_wavefront(buf, out, levels, taps, reach, strength)
+
+    return out.reshape(h, w, b, c).transpose(2, 0, 1, 3)
+
+
+def dither_quantize_32bit(img: np.ndarray, levels: int, method: str = "None",
+                          strength: float = 1.0, serpentine: bool = True) -> Tuple[np.ndarray, str]:
+    """
+    Quantise a BHWC float image to ``levels`` steps with optional dithering.
+
+    Ordered and blue-noise masks are offsets of up to half a step added
+    before rounding; error-diffusion kernels quantise as they go. Returns
+    the image and a short description of the method actually used.
+    """
+    if method in ERROR_DIFFUSION_KERNELS:
+        result = error_diffusion_dither(img, levels, method, strength, serpentine)
+        return result, f"{method} ({'serpentine' if serpentine else 'raster'})"
+
+    h, w = img.shape[1:3]
+    if method == "Ordered":
+        mask = _tile_mask(BAYER_4X4, h, w)
+    elif method == "Blue Noise":
+        mask = _tile_mask(get_blue_noise_mask(), h, w)
+    else:
+        return quantize_32bit(img, levels), "none"
+
+    return quantize_32bit(img + mask[None, :, :, None] * (strength / levels), levels), method
+
+
 # =============================================================================
 # FLUX-OPTIMIZED PRESETS
 # =============================================================================
@@ -750,6 +1536,15 @@ class FXTDProUpscale:
                 
                 # Output
                 "output_bit_depth": (["32-bit Float", "16-bit Float", "8-bit"],),
+                
+                # Execution
+                "backend": (["torch (batched)", "numpy (reference)"],),
+                "memory_limit_mb": ("INT", {
+                    "default": 4096,
+                    "min": 256,
+                    "max": 131072,
+                    "step": 256
+                }),
             }
         }
     
@@ -765,7 +1560,8 @@ class FXTDProUpscale:
                 antialiasing: float = 0.3, input_color_space: str = "sRGB",
                 process_in_linear: bool = True, use_tiles: bool = False,
                 tile_size: int = 512, tile_overlap: int = 64,
-                output_bit_depth: str = "32-bit Float"):
+                output_bit_depth: str = "32-bit Float",
+                backend: str = "torch (batched)", memory_limit_mb: int = 4096):
         
         # Apply preset if not custom
         if preset != "Custom" and preset in FLUX_PRESETS:
@@ -777,11 +1573,77 @@ class FXTDProUpscale:
             if p.get('color_space') == 'Linear':
                 process_in_linear = True
         
-        batch_size = image.shape[0]
         h, w = image.shape[1], image.shape[2]
         new_h = int(h * scale_factor)
         new_w = int(w * scale_factor)
         
+        to_linear = process_in_linear and input_color_space == "sRGB"
+        
+        # Tiling is a per-frame memory strategy, so it stays on the reference path
+        if backend == "numpy (reference)" or (use_tiles and (h > tile_size or w > tile_size)):
+            output_tensor = self._upscale_reference(
+                image, new_h, new_w, scale_factor, method, sharpening, sharpen_radius,
+                detail_enhancement, antialiasing, to_linear, use_tiles,
+                tile_size, tile_overlap, output_bit_depth)
+        else:
+            output_tensor = self._upscale_batched(
+                image, new_h, new_w, method, sharpening, sharpen_radius,
+                detail_enhancement, antialiasing, to_linear, output_bit_depth,
+                memory_limit_mb)
+        
+        # Build info string
+        info = f"Upscaled: {w}x{h} → {new_w}x{new_h} ({scale_factor}x)\n"
+        info += f"Method: {method}\n"
+        info += f"Preset: {preset}\n"
+        info += f"Sharpening: {sharpening}, Detail: {detail_enhancement}\n"
+        info += f"Output: {output_bit_depth}"
+        
+        return (output_tensor, new_w, new_h, info)
+    
+    def _upscale_batched(self, image, new_h, new_w, method, sharpening, sharpen_radius,
+                         detail_enhancement, antialiasing, to_linear, output_bit_depth,
+                         memory_limit_mb):
+        """Whole-batch torch pipeline (chunked to ``memory_limit_mb``)."""
+        
+        def pipeline(frames):
+            has_alpha = frames.shape[-1] == 4
+            img = frames[..., :3] if has_alpha else frames
+            
+            if to_linear:
+                img = srgb_to_linear_torch(img)
+            
+            upscaled = torch_resize_32bit(img, new_h, new_w, method)
+            
+            if detail_enhancement > 0:
+                upscaled = detail_enhancement_torch(upscaled, detail_enhancement)
+            if sharpening > 0:
+                upscaled = unsharp_mask_torch(upscaled, sharpening, sharpen_radius)
+            if antialiasing > 0:
+                upscaled = apply_antialiasing_torch(upscaled, antialiasing)
+            
+            if to_linear:
+                upscaled = linear_to_srgb_torch(upscaled)
+            
+            if has_alpha:
+                alpha_up = torch_resize_32bit(frames[..., 3:4], new_h, new_w, 'lanczos')
+                upscaled = torch.cat([upscaled, alpha_up], dim=-1)
+            
+            if output_bit_depth == "16-bit Float":
+                upscaled = upscaled.half().float()
+            elif output_bit_depth == "8-bit":
+                upscaled = torch.floor(upscaled.clamp(0, 1) * 255) / 255.0
+            
+            return upscaled
+        
+        return run_batched_torch(image, new_h, new_w, pipeline, get_batch_device(), memory_limit_mb)
+    
+    def _upscale_reference(self, image, new_h, new_w, scale_factor, method, sharpening,
+                           sharpen_radius, detail_enhancement, antialiasing, to_linear,
+                           use_tiles, tile_size, tile_overlap, output_bit_depth):
+        """Per-frame numpy pipeline; the reference the batched path is checked against."""
+        batch_size = image.shape[0]
+        h, w = image.shape[1], image.shape[2]
+        
         results = []
         
         for b in range(batch_size):
@@ -795,7 +1657,7 @@ class FXTDProUpscale:
                 img = img[..., :3]
             
             # Convert to linear if needed
-            if process_in_linear and input_color_space == "sRGB":
+            if to_linear:
                 img = srgb_to_linear_32bit(img)
             
             # Upscale
@@ -807,7 +1669,8 @@ class FXTDProUpscale:
                     new_tw = int(tw * scale_factor)
                     return separable_resize_32bit(tile, new_th, new_tw, method)
                 
-                upscaled = process_tiles_32bit(img, tile_size, tile_overlap, upscale_tile)
+                upscaled = process_tiles_32bit(img, tile_size, tile_overlap, upscale_tile,
+                                               scale=scale_factor)
             else:
                 # Direct processing
                 upscaled = separable_resize_32bit(img, new_h, new_w, method)
@@ -825,7 +1688,7 @@ class FXTDProUpscale:
                 upscaled = apply_antialiasing_32bit(upscaled, antialiasing)
             
             # Convert back to sRGB if processed in linear
-            if process_in_linear and input_color_space == "sRGB":
+            if to_linear:
                 upscaled = linear_to_srgb_32bit(upscaled)
             
             # Handle alpha
@@ -849,14 +1712,7 @@ class FXTDProUpscale:
         output = np.stack(results, axis=0)
         output_tensor = torch.from_numpy(output).float()
         
-        # Build info string
-        info = f"Upscaled: {w}x{h} → {new_w}x{new_h} ({scale_factor}x)\n"
-        info += f"Method: {method}\n"
-        info += f"Preset: {preset}\n"
-        info += f"Sharpening: {sharpening}, Detail: {detail_enhancement}\n"
-        info += f"Output: {output_bit_depth}"
-        
-        return (output_tensor, new_w, new_h, info)
+        return output_tensor
 
 
 class FXTDUpscaleBySize:
@@ -899,6 +1755,13 @@ class FXTDUpscaleBySize:
                     "step": 0.05
                 }),
                 "process_in_linear": ("BOOLEAN", {"default": True}),
+                "backend": (["torch (batched)", "numpy (reference)"],),
+                "memory_limit_mb": ("INT", {
+                    "default": 4096,
+                    "min": 256,
+                    "max": 131072,
+                    "step": 256
+                }),
             }
         }
     
@@ -910,7 +1773,8 @@ class FXTDUpscaleBySize:
     
     def upscale(self, image: torch.Tensor, width: int, height: int, method: str,
                 maintain_aspect: bool = True, aspect_mode: str = "fit",
-                sharpening: float = 0.2, process_in_linear: bool = True):
+                sharpening: float = 0.2, process_in_linear: bool = True,
+                backend: str = "torch (batched)", memory_limit_mb: int = 4096):
         
         batch_size = image.shape[0]
         orig_h, orig_w = image.shape[1], image.shape[2]
@@ -942,6 +1806,36 @@ class FXTDUpscaleBySize:
             new_w = width
             new_h = height
         
+        if backend == "numpy (reference)":
+            output_tensor = self._upscale_reference(image, new_h, new_w, method,
+                                                    sharpening, process_in_linear)
+        else:
+            def pipeline(frames):
+                has_alpha = frames.shape[-1] == 4
+                img = frames[..., :3] if has_alpha else frames
+                
+                if process_in_linear:
+                    img = srgb_to_linear_torch(img)
+                upscaled = torch_resize_32bit(img, new_h, new_w, method)
+                if sharpening > 0:
+                    upscaled = unsharp_mask_torch(upscaled, sharpening, 1.0)
+                if process_in_linear:
+                    upscaled = linear_to_srgb_torch(upscaled)
+                
+                if has_alpha:
+                    alpha_up = torch_resize_32bit(frames[..., 3:4], new_h, new_w, 'lanczos')
+                    upscaled = torch.cat([upscaled, alpha_up], dim=-1)
+                return upscaled
+            
+            output_tensor = run_batched_torch(image, new_h, new_w, pipeline,
+                                              get_batch_device(), memory_limit_mb)
+        
+        return (output_tensor, new_w, new_h)
+    
+    def _upscale_reference(self, image, new_h, new_w, method, sharpening, process_in_linear):
+        """Per-frame numpy pipeline; the reference the batched path is checked against."""
+        batch_size = image.shape[0]
+        
         results = []
         
         for b in range(batch_size):
@@ -979,7 +1873,7 @@ class FXTDUpscaleBySize:
         output = np.stack(results, axis=0)
         output_tensor = torch.from_numpy(output).float()
         
-        return (output_tensor, new_w, new_h)
+        return output_tensor
 
 
 class FXTDUpscaleTiled:
@@ -1021,11 +1915,33 @@ class FXTDUpscaleTiled:
                 "sharpening": ("FLOAT", {"default": 0.3, "min": 0.0, "max": 2.0, "step": 0.05}),
                 "detail_enhancement": ("FLOAT", {"default": 0.2, "min": 0.0, "max": 1.0, "step": 0.05}),
                 "process_in_linear": ("BOOLEAN", {"default": True}),
+                "workers": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "tooltip": "Tiles processed in parallel (0 = one per usable CPU core); torch threads are split between them"
+                }),
+                "memory_budget_mb": ("INT", {
+                    "default": 2048,
+                    "min": 256,
+                    "max": 65536,
+                    "step": 256,
+                    "tooltip": "Working-set cap for tiles in flight"
+                }),
+                "streaming": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Write the result to a disk-backed .npy memmap, keeping only a band of rows in RAM"
+                }),
+                "stream_directory": ("STRING", {
+                    "default": "",
+                    "tooltip": "Folder for the scratch file backing the streamed output (empty = ComfyUI temp folder); the file is removed once the image is released"
+                }),
             }
         }
     
-    RETURN_TYPES = ("IMAGE", "INT", "INT", "INT")
-    RETURN_NAMES = ("upscaled_image", "width", "height", "tiles_processed")
+    RETURN_TYPES = ("IMAGE", "INT", "INT", "INT", "STRING")
+    RETURN_NAMES = ("upscaled_image", "width", "height", "tiles_processed", "info")
     FUNCTION = "upscale"
     CATEGORY = "FXTD Studios/Radiance/Upscale"
     DESCRIPTION = "Tile-based upscaler for processing very large images efficiently."
@@ -1033,18 +1949,30 @@ class FXTDUpscaleTiled:
     def upscale(self, image: torch.Tensor, scale_factor: float,
                 tile_size: int, tile_overlap: int, method: str,
                 sharpening: float = 0.3, detail_enhancement: float = 0.2,
-                process_in_linear: bool = True):
+                process_in_linear: bool = True, workers: int = 0,
+                memory_budget_mb: int = 2048, streaming: bool = False,
+                stream_directory: str = ""):
         
         batch_size = image.shape[0]
         h, w = image.shape[1], image.shape[2]
         new_h = int(h * scale_factor)
         new_w = int(w * scale_factor)
         
+        overlap = clamp_tile_overlap(tile_size, tile_overlap)
+        if overlap != tile_overlap:
+            print(f"[FXTD Upscale Tiled] tile_overlap {tile_overlap} reduced to {overlap} "
+                  f"(must stay below half of tile_size {tile_size})")
+            tile_overlap = overlap
+        
         # Calculate number of tiles
-        stride = tile_size - tile_overlap
-        tiles_x = max(1, math.ceil((w - tile_overlap) / stride))
-        tiles_y = max(1, math.ceil((h - tile_overlap) / stride))
-        total_tiles = tiles_x * tiles_y
+        total_tiles = len(get_tile_grid(h, w, tile_size, tile_overlap))
+        num_workers = workers if workers > 0 else cpu_thread_count()
+        
+        if streaming:
+            return self._upscale_streaming(image, scale_factor, tile_size, tile_overlap, method,
+                                           sharpening, detail_enhancement, process_in_linear,
+                                           num_workers, memory_budget_mb, stream_directory,
+                                           total_tiles)
         
         results = []
         
@@ -1080,7 +2008,9 @@ class FXTDUpscaleTiled:
                 return upscaled
             
             # Process with tiles
-            upscaled = process_tiles_32bit(img, tile_size, tile_overlap, process_tile)
+            upscaled = process_tiles_32bit(img, tile_size, tile_overlap, process_tile,
+                                           scale=scale_factor, num_workers=num_workers,
+                                           memory_budget_mb=memory_budget_mb)
             
             # Ensure exact output size
             if upscaled.shape[0] != new_h or upscaled.shape[1] != new_w:
@@ -1102,7 +2032,81 @@ class FXTDUpscaleTiled:
         output = np.stack(results, axis=0)
         output_tensor = torch.from_numpy(output).float()
         
-        return (output_tensor, new_w, new_h, total_tiles)
+        info = f"Tiled: {w}x{h} → {new_w}x{new_h}, {total_tiles} tiles, {num_workers} workers"
+        
+        return (output_tensor, new_w, new_h, total_tiles, info)
+    
+    def _upscale_streaming(self, image: torch.Tensor, scale_factor: float,
+                           tile_size: int, tile_overlap: int, method: str,
+                           sharpening: float, detail_enhancement: float,
+                           process_in_linear: bool, num_workers: int,
+                           memory_budget_mb: int, stream_directory: str,
+                           total_tiles: int):
+        """Out-of-core path: tiles are blended band by band into a .npy memmap."""
+        import tempfile
+        
+        batch_size, h, w, channels = image.shape
+        new_h = int(h * scale_factor)
+        new_w = int(w * scale_factor)
+        has_alpha = channels == 4
+        
+        if not stream_directory:
+            try:
+                import folder_paths
+                stream_directory = folder_paths.get_temp_directory()
+            except ImportError:
+                stream_directory = tempfile.gettempdir()
+        peak_is_per_run = reset_peak_rss()
+        output, out_path = open_stream_scratch(stream_directory,
+                                               (batch_size, new_h, new_w, channels))
+        
+        def process_tile(tile, **kwargs):
+            th, tw = tile.shape[:2]
+            new_th = int(th * scale_factor)
+            new_tw = int(tw * scale_factor)
+            
+            img = tile[..., :3]
+            if process_in_linear:
+                img = srgb_to_linear_32bit(img)
+            
+            upscaled = separable_resize_32bit(img, new_th, new_tw, method)
+            if detail_enhancement > 0:
+                upscaled = detail_enhancement_32bit(upscaled, detail_enhancement)
+            if sharpening > 0:
+                upscaled = unsharp_mask_32bit(upscaled, sharpening, 1.0)
+            
+            if has_alpha:
+                alpha_up = separable_resize_32bit(tile[..., 3:4], new_th, new_tw, 'lanczos')
+                upscaled = np.concatenate([upscaled, alpha_up], axis=-1)
+            return upscaled
+        
+        def finalize_rows(rows):
+            if process_in_linear:
+                rows[..., :3] = linear_to_srgb_32bit(rows[..., :3])
+            return rows
+        
+        peak_band = 0
+        for b in range(batch_size):
+            src = image[b].cpu().numpy()
+            peak_band = max(peak_band, stream_tiles_32bit(
+                src, tile_size, tile_overlap, process_tile, scale_factor, output[b],
+                num_workers=num_workers, memory_budget_mb=memory_budget_mb,
+                finalize_func=finalize_rows))
+            output.flush()
+        
+        # Disk-backed tensor: pages are read on demand by downstream nodes
+        output_tensor = torch.from_numpy(output)
+        
+        info = f"Streamed: {w}x{h} → {new_w}x{new_h}, {total_tiles} tiles, {num_workers} workers\n"
+        info += f"Scratch file: {out_path} (removed when the image is released)\n"
+        info += f"Peak band buffer: {peak_band / (1024 * 1024):.1f} MB"
+        peak_rss = get_peak_rss_mb()
+        if peak_rss is not None:
+            scope = "this run" if peak_is_per_run else "the process so far"
+            info += f"\nPeak resident memory ({scope}): {peak_rss:.1f} MB"
+        print(f"[FXTD Upscale Tiled] {info}")
+        
+        return (output_tensor, new_w, new_h, total_tiles, info)
 
 
 class FXTDSharpen32bit:
@@ -1162,94 +2166,45 @@ class FXTDSharpen32bit:
                 edge_protection: float = 0.0, process_in_linear: bool = True,
                 use_gpu: bool = True):
         
-        # Try GPU path for Unsharp Mask
-        if use_gpu and torch.cuda.is_available() and sharpen_method == "Unsharp Mask":
-            try:
-                device = torch.device("cuda")
-                img = image.to(device).float()
-                
-                # GPU unsharp mask using convolution
-                kernel_size = max(3, int(radius * 2) * 2 + 1)
-                sigma = radius
-                
-                # Create Gaussian kernel
-                x = torch.arange(kernel_size, device=device).float() - kernel_size // 2
-                gauss_1d = torch.exp(-x**2 / (2 * sigma**2))
-                gauss_1d = gauss_1d / gauss_1d.sum()
-                gauss_2d = gauss_1d.unsqueeze(0) * gauss_1d.unsqueeze(1)
-                gauss_2d = gauss_2d.unsqueeze(0).unsqueeze(0)
-                
-                # Apply to each channel
-                b, h, w, c = img.shape
-                img_permuted = img.permute(0, 3, 1, 2)  # BHWC -> BCHW
-                
-                # Blur with separable convolution
-                blurred = torch.nn.functional.conv2d(
-                    img_permuted, gauss_2d.expand(c, 1, -1, -1),
-                    padding=kernel_size // 2, groups=c
-                )
-                
-                # Unsharp mask
-                blurred_hwc = blurred.permute(0, 2, 3, 1)  # BCHW -> BHWC
-                detail = img - blurred_hwc
-                
-                # Apply amount
-                result = img + detail * amount
-                result = torch.clamp(result, 0, 1)
-                
-                return (result.cpu(),)
-                
-            except RuntimeError:
-                torch.cuda.empty_cache()
+        # Blur backend device: whole batch goes through the float32 blur in one call
+        device = torch.device("cuda") if use_gpu and torch.cuda.is_available() else None
         
-        # CPU fallback
-        batch_size = image.shape[0]
-        results = []
+        img = image.cpu().numpy().astype(np.float32)
         
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
-            
-            has_alpha = img.shape[-1] == 4
-            if has_alpha:
-                alpha = img[..., 3:4]
-                img = img[..., :3]
-            
-            # Convert to linear
-            if process_in_linear:
-                img = srgb_to_linear_32bit(img)
-            
-            # Apply sharpening
-            if sharpen_method == "Unsharp Mask":
-                sharpened = unsharp_mask_32bit(img, amount, radius, threshold)
-            elif sharpen_method == "High Pass":
-                sharpened = high_pass_sharpen_32bit(img, amount, radius)
-            else:  # Multi-Scale
-                sharpened = detail_enhancement_32bit(img, amount, amount * 0.5, amount * 0.3)
-            
-            # Edge protection (blend back some original near edges)
-            if edge_protection > 0:
-                # Simple edge detection
-                lum = 0.2126 * img[..., 0] + 0.7152 * img[..., 1] + 0.0722 * img[..., 2]
-                grad_x = np.abs(np.diff(lum, axis=1, prepend=lum[:, :1]))
-                grad_y = np.abs(np.diff(lum, axis=0, prepend=lum[:1, :]))
-                edges = np.sqrt(grad_x ** 2 + grad_y ** 2)
-                edges = edges / (edges.max() + 1e-10)
-                
-                # Blend
-                edge_mask = (edges * edge_protection)[..., np.newaxis]
-                sharpened = sharpened * (1 - edge_mask) + img * edge_mask
-            
-            # Convert back
-            if process_in_linear:
-                sharpened = linear_to_srgb_32bit(sharpened)
-            
-            if has_alpha:
-                sharpened = np.concatenate([sharpened, alpha], axis=-1)
-            
-            results.append(sharpened)
+        has_alpha = img.shape[-1] == 4
+        if has_alpha:
+            alpha = img[..., 3:4]
+            img = img[..., :3]
         
-        output = np.stack(results, axis=0)
-        output_tensor = torch.from_numpy(output).float()
+        # Convert to linear
+        if process_in_linear:
+            img = srgb_to_linear_32bit(img)
+        
+        # Apply sharpening
+        if sharpen_method == "Unsharp Mask":
+            sharpened = unsharp_mask_32bit(img, amount, radius, threshold, device=device)
+        elif sharpen_method == "High Pass":
+            sharpened = high_pass_sharpen_32bit(img, amount, radius, device=device)
+        else:  # Multi-Scale
+            sharpened = detail_enhancement_32bit(img, amount, amount * 0.5, amount * 0.3, device=device)
+        
+        # Edge protection (blend back some original near edges)
+        if edge_protection > 0:
+            # Simple edge detection
+            edges = _edge_magnitude_32bit(_luminance_32bit(img))
+            
+            # Blend
+            edge_mask = (edges * edge_protection)[..., np.newaxis]
+            sharpened = sharpened * (1 - edge_mask) + img * edge_mask
+        
+        # Convert back
+        if process_in_linear:
+            sharpened = linear_to_srgb_32bit(sharpened)
+        
+        if has_alpha:
+            sharpened = np.concatenate([sharpened, alpha], axis=-1)
+        
+        output_tensor = torch.from_numpy(sharpened).float()
         
         return (output_tensor,)
 
@@ -1293,6 +2248,17 @@ class FXTDDownscale32bit:
                 }),
                 "process_in_linear": ("BOOLEAN", {"default": True}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
+                "backend": (["torch (batched)", "numpy (reference)"],),
+                "memory_limit_mb": ("INT", {
+                    "default": 4096,
+                    "min": 256,
+                    "max": 131072,
+                    "step": 256
+                }),
+                "mip_pyramid": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Reduce by exact 2x area averages first, then resample the last step with the chosen method. Levels are reused across nodes downscaling the same image."
+                }),
             }
         }
     
@@ -1304,43 +2270,60 @@ class FXTDDownscale32bit:
     
     def downscale(self, image: torch.Tensor, scale_factor: float, method: str,
                   antialiasing: float = 0.5, pre_blur: float = 0.0,
-                  process_in_linear: bool = True, use_gpu: bool = True):
+                  process_in_linear: bool = True, use_gpu: bool = True,
+                  backend: str = "torch (batched)", memory_limit_mb: int = 4096,
+                  mip_pyramid: bool = False):
         
-        batch_size = image.shape[0]
         h, w = image.shape[1], image.shape[2]
         new_h = max(1, int(h * scale_factor))
         new_w = max(1, int(w * scale_factor))
+        num_levels = len(mip_level_sizes(h, w, new_h, new_w)) if mip_pyramid else 0
         
-        # Try GPU path
-        if use_gpu and torch.cuda.is_available():
-            try:
-                device = torch.device("cuda")
-                img = image.to(device).float()
-                
-                # Permute to BCHW for interpolate
-                img_bchw = img.permute(0, 3, 1, 2)
-                
-                # Use bicubic if lanczos requested (torch doesn't support lanczos)
-                mode = 'bicubic' if 'lanczos' in method or method == 'mitchell' else method
-                if mode not in ['nearest', 'bilinear', 'bicubic']:
-                    mode = 'bicubic'
-                
-                # Downscale
-                result = torch.nn.functional.interpolate(
-                    img_bchw, size=(new_h, new_w), mode=mode, 
-                    align_corners=False if mode != 'nearest' else None
-                )
-                
-                # Permute back to BHWC
-                result = result.permute(0, 2, 3, 1)
-                result = torch.clamp(result, 0, 1)
-                
-                return (result.cpu(), new_w, new_h)
-                
-            except RuntimeError:
-                torch.cuda.empty_cache()
+        if backend == "numpy (reference)":
+            output_tensor = self._downscale_reference(image, new_h, new_w, method,
+                                                      pre_blur, process_in_linear, num_levels)
+            return (output_tensor, new_w, new_h)
+        
+        has_alpha = image.shape[-1] == 4
+        
+        def prepare(frames):
+            # Into the working space; alpha is carried through untouched
+            img = frames[..., :3] if has_alpha else frames
+            if process_in_linear:
+                img = srgb_to_linear_torch(img)
+            if pre_blur > 0:
+                img = gaussian_blur(img, pre_blur, pad_mode=BLUR_PAD_MODE)
+            return torch.cat([img, frames[..., 3:]], dim=-1) if has_alpha else img
+        
+        def finish(frames):
+            img = frames[..., :3] if has_alpha else frames
+            downscaled = torch_resize_32bit(img, new_h, new_w, method)
+            if process_in_linear:
+                downscaled = linear_to_srgb_torch(downscaled)
+            
+            if has_alpha:
+                alpha_down = torch_resize_32bit(frames[..., 3:4], new_h, new_w, 'lanczos')
+                downscaled = torch.cat([downscaled, alpha_down], dim=-1)
+            return downscaled
+        
+        device = get_batch_device(use_gpu)
+        if num_levels:
+            source = get_mip_level(image, num_levels, prepare, (process_in_linear, pre_blur),
+                                   device, memory_limit_mb)
+            pipeline = finish
+        else:
+            source = image
+            pipeline = lambda frames: finish(prepare(frames))
+        
+        output_tensor = run_batched_torch(source, new_h, new_w, pipeline, device, memory_limit_mb)
+        
+        return (output_tensor, new_w, new_h)
+    
+    def _downscale_reference(self, image, new_h, new_w, method, pre_blur, process_in_linear,
+                             num_levels=0):
+        """Per-frame numpy pipeline; the reference the batched path is checked against."""
+        batch_size = image.shape[0]
         
-        # CPU fallback
         results = []
         
         for b in range(batch_size):
@@ -1357,19 +2340,13 @@ class FXTDDownscale32bit:
             
             # Pre-blur for anti-aliasing
             if pre_blur > 0:
-                from PIL import ImageFilter
-                for c in range(3):
-                    channel = img[..., c]
-                    ch_min, ch_max = channel.min(), channel.max()
-                    ch_range = ch_max - ch_min if ch_max != ch_min else 1.0
-                    
-                    ch_norm = np.clip((channel - ch_min) / ch_range * 255, 0, 255).astype(np.uint8)
-                    ch_pil = Image.fromarray(ch_norm)
-                    ch_pil = ch_pil.filter(ImageFilter.GaussianBlur(radius=pre_blur))
-                    if ch_pil.size != (w, h):
-                        ch_pil = ch_pil.resize((w, h), Image.BILINEAR)
-                    
-                    img[..., c] = np.array(ch_pil).astype(np.float32) / 255.0 * ch_range + ch_min
+                img = gaussian_blur_array(img, pre_blur, pad_mode=BLUR_PAD_MODE)
+            
+            # Exact 2x area reductions down to the last level above the target
+            for _ in range(num_levels):
+                img = box_reduce_2x_32bit(img)
+                if has_alpha:
+                    alpha = box_reduce_2x_32bit(alpha)
             
             # Downscale
             downscaled = separable_resize_32bit(img, new_h, new_w, method)
@@ -1389,7 +2366,7 @@ class FXTDDownscale32bit:
         output = np.stack(results, axis=0)
         output_tensor = torch.from_numpy(output).float()
         
-        return (output_tensor, new_w, new_h)
+        return output_tensor
 
 
 class FXTDBitDepthConvert:
@@ -1405,16 +2382,20 @@ class FXTDBitDepthConvert:
         return {
             "required": {
                 "image": ("IMAGE",),
-                "output_depth": (["32-bit Float", "16-bit Float", "16-bit Int", "10-bit", "8-bit"],),
+                "output_depth": (["32-bit Float", "16-bit Float", "16-bit Int", "12-bit", "10-bit", "8-bit"],),
             },
             "optional": {
-                "dithering": (["None", "Floyd-Steinberg", "Ordered", "Blue Noise"],),
+                "dithering": (["None", "Floyd-Steinberg", "Jarvis", "Stucki", "Ordered", "Blue Noise"],),
                 "dither_strength": ("FLOAT", {
                     "default": 1.0,
                     "min": 0.0,
                     "max": 2.0,
                     "step": 0.1
                 }),
+                "serpentine": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Alternate scan direction per row for error diffusion. Rows then run one after another, several times slower than raster order"
+                }),
             }
         }
     
@@ -1422,95 +2403,31 @@ class FXTDBitDepthConvert:
     RETURN_NAMES = ("converted_image", "bit_depth_info")
     FUNCTION = "convert"
     CATEGORY = "FXTD Studios/Radiance/Upscale"
-    DESCRIPTION = "Convert between bit depths with optional dithering."
+    DESCRIPTION = "Convert between bit depths with optional error-diffusion, ordered or blue-noise dithering."
+    
+    LEVELS = {"16-bit Int": 65535, "12-bit": 4095, "10-bit": 1023, "8-bit": 255}
     
     def convert(self, image: torch.Tensor, output_depth: str,
-                dithering: str = "None", dither_strength: float = 1.0):
+                dithering: str = "None", dither_strength: float = 1.0,
+                serpentine: bool = False):
         
-        batch_size = image.shape[0]
-        results = []
+        img = image.cpu().numpy().astype(np.float32)
         
-        for b in range(batch_size):
-            img = image[b].cpu().numpy().astype(np.float32)
-            
-            # Determine quantization levels
-            if output_depth == "32-bit Float":
-                # No quantization needed
-                results.append(img)
-                continue
-            elif output_depth == "16-bit Float":
-                # Convert to float16 and back
-                result = img.astype(np.float16).astype(np.float32)
-            elif output_depth == "16-bit Int":
-                levels = 65535
-            elif output_depth == "10-bit":
-                levels = 1023
-            else:  # 8-bit
-                levels = 255
-            
-            if output_depth not in ["32-bit Float", "16-bit Float"]:
-                # Apply dithering
-                if dithering != "None":
-                    img = self._apply_dither(img, levels, dithering, dither_strength)
-                
-                # Quantize
-                result = np.round(img * levels) / levels
-                result = np.clip(result, 0, 1)
-            
-            results.append(result)
+        if output_depth == "32-bit Float":
+            output = img
+        elif output_depth == "16-bit Float":
+            output = img.astype(np.float16).astype(np.float32)
+        else:
+            output, used = dither_quantize_32bit(img, self.LEVELS[output_depth],
+                                                 dithering, dither_strength, serpentine)
         
-        output = np.stack(results, axis=0)
-        output_tensor = torch.from_numpy(output).float()
+        output_tensor = torch.from_numpy(np.ascontiguousarray(output)).float()
         
         info = f"Converted to {output_depth}"
-        if dithering != "None":
-            info += f" with {dithering} dithering"
+        if dithering != "None" and output_depth in self.LEVELS:
+            info += f" with {used} dithering"
         
         return (output_tensor, info)
-    
-    def _apply_dither(self, img: np.ndarray, levels: int, 
-                      method: str, strength: float) -> np.ndarray:
-        """Apply dithering before quantization."""
-        h, w = img.shape[:2]
-        
-        if method == "Floyd-Steinberg":
-            # Simple error diffusion approximation
-            result = img.copy()
-            noise = np.random.randn(h, w, 1) * (strength / levels)
-            result = result + noise
-            
-        elif method == "Ordered":
-            # Bayer matrix dithering
-            bayer = np.array([
-                [0, 8, 2, 10],
-                [12, 4, 14, 6],
-                [3, 11, 1, 9],
-                [15, 7, 13, 5]
-            ]) / 16.0 - 0.5
-            
-            # Tile bayer matrix
-            bayer_tiled = np.tile(bayer, (h // 4 + 1, w // 4 + 1))[:h, :w]
-            noise = bayer_tiled[..., np.newaxis] * (strength / levels)
-            result = img + noise
-            
-        elif method == "Blue Noise":
-            # Approximation using high-frequency noise
-            noise1 = np.random.randn(h, w, 1)
-            noise2 = np.random.randn(h // 2 + 1, w // 2 + 1, 1)
-            
-            # Upsample noise2 and subtract
-            from PIL import Image as PILImage
-            n2_pil = PILImage.fromarray(((noise2[..., 0] * 127.5 + 127.5).clip(0, 255)).astype(np.uint8))
-            n2_pil = n2_pil.resize((w, h), PILImage.BILINEAR)
-            noise2_up = (np.array(n2_pil).astype(np.float32) - 127.5) / 127.5
-            
-            blue_noise = noise1[..., 0] - noise2_up * 0.5
-            blue_noise = blue_noise[..., np.newaxis] * (strength / levels)
-            result = img + blue_noise
-        else:
-            result = img
-        
-        return result
 
 
 
@@ -1518,6 +2435,273 @@ class FXTDBitDepthConvert:
 # AI UPSCALER INTEGRATION
 # =============================================================================
 
+# Rough activation bytes per input pixel for ESRGAN/SwinIR-class models in
+# fp32 under no_grad; halved for fp16/bf16. Used to size tiles automatically.
+AI_TILE_BYTES_PER_PIXEL = 16384
+AI_MAX_TILE_BATCH = 16
+
+
+def get_available_memory(device: torch.device) -> Optional[int]:
+    """Free bytes on ``device`` (None if unknown)."""
+    if device.type == "cuda":
+        try:
+            free, _ = torch.cuda.mem_get_info(device)
+            return int(free)
+        except Exception:
+            return None
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE"))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_ai_tile_size(device: torch.device, dtype: torch.dtype = torch.float32) -> int:
+    """Largest tile (multiple of 64, 128-1024) whose activations fit in half the free memory."""
+    free = get_available_memory(device)
+    if free is None:
+        return 512
+    bytes_per_px = AI_TILE_BYTES_PER_PIXEL // (2 if dtype != torch.float32 else 1)
+    side = int(math.sqrt(free * 0.5 / bytes_per_px)) // 64 * 64
+    return max(128, min(1024, side))
+
+
+def _autocast_context(device: torch.device, dtype: torch.dtype):
+    """Autocast for reduced precision, or a no-op context for fp32."""
+    import contextlib
+    if dtype == torch.float32:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=device.type, dtype=dtype)
+
+
+def ai_upscale_tiled(model, image: torch.Tensor, tile_size: int = 512, overlap: int = 32,
+                     device: torch.device = None, dtype: torch.dtype = torch.float32,
+                     tile_batch: int = 0) -> torch.Tensor:
+    """
+    Overlapping tiled inference for an image-to-image upscale model.
+
+    ``image`` is BHWC in 0-1. Every frame is cut on the same tile grid, so
+    tiles from all frames are stacked and run through ``model`` together,
+    ``tile_batch`` at a time (0 = as many as fit in free memory), optionally
+    under fp16/bf16 autocast. The model's scale is read from the first
+    output. Tiles are blended on the CPU in float32 with feathered windows,
+    so seams between tiles are invisible. ``overlap`` is clamped below half
+    a tile. Returns BHWC float32 on the CPU.
+    """
+    if device is None:
+        device = torch.device("cpu")
+    
+    overlap = clamp_tile_overlap(tile_size, overlap)
+    b, h, w, c = image.shape
+    tiles = get_tile_grid(h, w, tile_size, overlap)
+    jobs = [(f, t) for f in range(b) for t in tiles]
+    src = image.permute(0, 3, 1, 2).float()
+    
+    if tile_batch <= 0:
+        th, tw = tiles[0][2], tiles[0][3]
+        free = get_available_memory(device)
+        bytes_per_px = AI_TILE_BYTES_PER_PIXEL // (2 if dtype != torch.float32 else 1)
+        tile_batch = 1 if free is None else int(free * 0.5 // (th * tw * bytes_per_px))
+        tile_batch = max(1, min(AI_MAX_TILE_BATCH, tile_batch))
+    
+    output = None
+    weights = None
+    windows = {}
+    scale = None
+    
+    for start in range(0, len(jobs), tile_batch):
+        chunk = jobs[start:start + tile_batch]
+        batch = torch.stack([src[f, :, y:y + th, x:x + tw] for f, (y, x, th, tw) in chunk])
+        
+        with torch.no_grad(), _autocast_context(device, dtype):
+            result = model(batch.to(device))
+        result = result.float().cpu()
+        
+        if scale is None:
+            scale = result.shape[-2] / batch.shape[-2]
+            out_overlap = int(round(overlap * scale))
+            output = torch.zeros(b, result.shape[1], int(round(h * scale)), int(round(w * scale)))
+            weights = torch.zeros(1, 1, output.shape[2], output.shape[3])
+        
+        for (f, (y, x, th, tw)), tile_out in zip(chunk, result):
+            oy, ox = int(round(y * scale)), int(round(x * scale))
+            oh = min(tile_out.shape[1], output.shape[2] - oy)
+            ow = min(tile_out.shape[2], output.shape[3] - ox)
+            key = (oh, ow, y > 0, y + th < h, x > 0, x + tw < w)
+            if key not in windows:
+                wy = torch.from_numpy(_blend_ramp(oh, out_overlap, key[2], key[3]))
+                wx = torch.from_numpy(_blend_ramp(ow, out_overlap, key[4], key[5]))
+                windows[key] = wy[:, None] * wx[None, :]
+            window = windows[key]
+            output[f, :, oy:oy + oh, ox:ox + ow] += tile_out[:, :oh, :ow] * window
+            if f == 0:
+                weights[0, 0, oy:oy + oh, ox:ox + ow] += window
+    
+    output /= weights.clamp_min(1e-10)
+    return output.permute(0, 2, 3, 1).contiguous()
+
+
+class _CachedUpscaleModel:
+    """One resident upscale model and its bookkeeping."""
+
+    def __init__(self, key, model, meta: Dict[str, Any], dtype: torch.dtype):
+        self.key = key
+        self.model = model
+        self.meta = meta
+        self.dtype = dtype
+        self.device = torch.device("cpu")
+        self.nbytes = sum(t.numel() * t.element_size()
+                          for t in list(model.parameters()) + list(model.buffers()))
+
+
+class UpscaleModelCache:
+    """
+    Process-wide residency cache for upscale models.
+
+    Entries are keyed by (checkpoint path, mtime, weight dtype) so an edited
+    checkpoint is reloaded and fp16/fp32 copies coexist. When VRAM use goes
+    over ``vram_budget_mb`` the least recently used models are offloaded to
+    the CPU; when RAM use goes over ``ram_budget_mb`` they are dropped.
+    """
+
+    def __init__(self, ram_budget_mb: float = 8192, vram_budget_mb: float = 4096):
+        self.ram_budget_mb = ram_budget_mb
+        self.vram_budget_mb = vram_budget_mb
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def set_budget(self, ram_mb: float = None, vram_mb: float = None):
+        """Change the RAM and/or VRAM budget and evict down to it."""
+        with self._lock:
+            if ram_mb is not None:
+                self.ram_budget_mb = ram_mb
+            if vram_mb is not None:
+                self.vram_budget_mb = vram_mb
+            self._enforce_budget(pinned=None)
+
+    def _usage_mb(self, on_cuda: bool) -> float:
+        total = sum(e.nbytes for e in self._entries.values() if (e.device.type == "cuda") == on_cuda)
+        return total / (1024 * 1024)
+
+    def _enforce_budget(self, pinned):
+        # Offload least recently used models from VRAM, then drop from RAM
+        for key in list(self._entries):
+            if self._usage_mb(True) <= self.vram_budget_mb:
+                break
+            entry = self._entries[key]
+            if key != pinned and entry.device.type == "cuda":
+                entry.model.to("cpu")
+                entry.device = torch.device("cpu")
+        for key in list(self._entries):
+            if self._usage_mb(False) <= self.ram_budget_mb:
+                break
+            if key != pinned and self._entries[key].device.type != "cuda":
+                del self._entries[key]
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def get(self, path: str, loader, dtype: torch.dtype = torch.float32,
+            device: torch.device = None):
+        """
+        Return ``(entry, message)`` for the checkpoint at ``path``.
+
+        ``loader(path)`` must return ``(model, meta)`` or ``(None, error)``.
+        A new dtype copy is made from the resident fp32 copy when that one is
+        on the CPU, and from a fresh ``loader(path)`` otherwise, so weights
+        are never derived from a reduced-precision copy or duplicated in
+        VRAM. A dtype the model's ``meta`` doesn't support falls back to fp32.
+        """
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            # Drop copies of an older version of this checkpoint
+            for key in [k for k in self._entries if k[0] == path and k[1] != mtime]:
+                del self._entries[key]
+
+            model = None
+            base = next((e for k, e in self._entries.items() if k[:2] == (path, mtime)), None)
+            if base is None:
+                model, meta = loader(path)
+                if model is None:
+                    return None, meta
+            else:
+                meta = base.meta
+
+            if dtype == torch.float16 and not meta.get("supports_half", True):
+                dtype = torch.float32
+            if dtype == torch.bfloat16 and not meta.get("supports_bfloat16", True):
+                dtype = torch.float32
+
+            key = (path, mtime, dtype)
+            entry = self._entries.get(key)
+            if entry is None:
+                if model is None:
+                    master = self._entries.get((path, mtime, torch.float32))
+                    if master is not None and master.device.type == "cpu":
+                        import copy
+                        model = copy.deepcopy(master.model)
+                    else:
+                        model, meta = loader(path)
+                        if model is None:
+                            return None, meta
+                entry = _CachedUpscaleModel(key, model.to("cpu").to(dtype).eval(), meta, dtype)
+                self._entries[key] = entry
+                message = f"Loaded: {os.path.basename(path)} ({meta.get('loader', 'unknown')})"
+            else:
+                message = f"Cached: {os.path.basename(path)}"
+            self._entries.move_to_end(key)
+
+            if device is not None and entry.device != device:
+                entry.model.to(device)
+                entry.device = device
+            self._enforce_budget(pinned=key)
+            return entry, message
+
+    def offload(self, path: str = None):
+        """Move cached models (all, or those for ``path``) off the GPU."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if (path is None or key[0] == path) and entry.device.type == "cuda":
+                    entry.model.to("cpu")
+                    entry.device = torch.device("cpu")
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._entries.clear()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def info(self) -> str:
+        with self._lock:
+            return (f"{len(self._entries)} models, "
+                    f"{self._usage_mb(True):.0f}/{self.vram_budget_mb:.0f} MB VRAM, "
+                    f"{self._usage_mb(False):.0f}/{self.ram_budget_mb:.0f} MB RAM")
+
+
+# Shared by every FXTDAIUpscale instance in the process
+UPSCALE_MODEL_CACHE = UpscaleModelCache()
+
+
+def prewarm_upscale_models(model_names: List[str], dtype: torch.dtype = torch.float32,
+                           device: torch.device = None) -> List[str]:
+    """
+    Load upscale models into UPSCALE_MODEL_CACHE ahead of use.
+
+    Accepts names from FXTDAIUpscale.AI_MODELS or checkpoint paths. Models
+    are placed on ``device`` (CPU RAM when None), subject to the cache
+    budget. Returns one status line per model.
+    """
+    node = FXTDAIUpscale()
+    status = []
+    for name in model_names:
+        name = name.strip()
+        if not name:
+            continue
+        entry, message = node._get_cached_model(name, dtype, device)
+        status.append(message)
+    return status
+
 
 class FXTDAIUpscale:
     """
@@ -1549,8 +2733,7 @@ class FXTDAIUpscale:
     }
 
     def __init__(self):
-        self.model = None
-        self.current_model_name = None
+        pass
 
     @classmethod
     def INPUT_TYPES(cls):
@@ -1558,12 +2741,17 @@ class FXTDAIUpscale:
             "required": {
                 "image": ("IMAGE",),
                 "model_name": (cls.AI_MODELS, {"default": "RealESRGAN_x4plus"}),
-                "tile_size": ("INT", {"default": 512, "min": 128, "max": 1024, "step": 64}),
+                "tile_size": ("INT", {"default": 512, "min": 0, "max": 1024, "step": 64, "tooltip": "0 = pick from free memory"}),
                 "tile_overlap": ("INT", {"default": 32, "min": 0, "max": 128, "step": 8}),
                 "auto_download": ("BOOLEAN", {"default": True}),
             },
             "optional": {
                 "unload_model": ("BOOLEAN", {"default": False, "tooltip": "Unload model from VRAM after processing to free memory"}),
+                "precision": (["auto", "fp32", "fp16", "bf16"], {"default": "auto", "tooltip": "auto = fp16 on CUDA when the model supports it, else fp32"}),
+                "tile_batch": ("INT", {"default": 0, "min": 0, "max": 64, "step": 1, "tooltip": "Tiles per forward pass across all frames (0 = fit to free memory)"}),
+                "cache_vram_mb": ("INT", {"default": 4096, "min": 0, "max": 131072, "step": 256, "tooltip": "VRAM kept for resident upscale models; least recently used are offloaded to RAM"}),
+                "cache_ram_mb": ("INT", {"default": 8192, "min": 0, "max": 262144, "step": 256, "tooltip": "RAM kept for cached upscale models; least recently used are dropped"}),
+                "prewarm_models": ("STRING", {"default": "", "tooltip": "Comma-separated model names to keep loaded for later runs"}),
             }
         }
 
@@ -1589,12 +2777,13 @@ class FXTDAIUpscale:
             print(f"[FXTD AI Upscale] Download failed: {e}")
             return False
 
-    def _load_model(self, model_name: str):
-        """Load an upscale model."""
+    def _find_model_path(self, model_name: str):
+        """Resolve a model name (or checkpoint path) to a file, downloading if possible."""
+        if os.path.isfile(model_name):
+            return model_name, None
+        
         try:
             import folder_paths
-            from comfy import model_management
-            import comfy.utils
         except ImportError:
             return None, "ComfyUI modules not available"
 
@@ -1613,6 +2802,23 @@ class FXTDAIUpscale:
                 model_path = target_path
             else:
                 return None, f"Model {model_name} not found. Place in models/upscale_models/"
+        
+        return model_path, None
+
+    def _get_cached_model(self, model_name: str, dtype: torch.dtype = torch.float32,
+                          device: torch.device = None):
+        """``(cache entry, message)`` for a model, loading it through UPSCALE_MODEL_CACHE."""
+        model_path, error = self._find_model_path(model_name)
+        if model_path is None:
+            return None, error
+        return UPSCALE_MODEL_CACHE.get(model_path, self._load_model, dtype, device)
+
+    def _load_model(self, model_path: str):
+        """Load an upscale model file. Returns ``(model, meta)`` or ``(None, error)``."""
+        try:
+            import comfy.utils
+        except ImportError:
+            return None, "ComfyUI modules not available"
 
         # Load the model using spandrel (modern) or fallback
         try:
@@ -1622,8 +2828,14 @@ class FXTDAIUpscale:
             try:
                 import spandrel
                 try:
-                    upscale_model = spandrel.ModelLoader().load_from_state_dict(sd).model.eval()
-                    return upscale_model, f"Loaded: {model_name} (spandrel)"
+                    descriptor = spandrel.ModelLoader().load_from_state_dict(sd)
+                    meta = {
+                        "loader": "spandrel",
+                        "scale": getattr(descriptor, "scale", None),
+                        "supports_half": getattr(descriptor, "supports_half", True),
+                        "supports_bfloat16": getattr(descriptor, "supports_bfloat16", True),
+                    }
+                    return descriptor.model.eval(), meta
                 except Exception as spandrel_err:
                     err_name = type(spandrel_err).__name__
                     if "UnsupportedModelError" in err_name or "ValueError" in err_name:
@@ -1640,7 +2852,7 @@ class FXTDAIUpscale:
                 warnings.filterwarnings('ignore', message='.*deprecated.*')
                 from comfy_extras.chainner_models import model_loading
                 upscale_model = model_loading.load_state_dict(sd).eval()
-                return upscale_model, f"Loaded: {model_name} (legacy)"
+                return upscale_model, {"loader": "legacy"}
             except ImportError:
                 pass
             
@@ -1686,44 +2898,69 @@ class FXTDAIUpscale:
         
         return (torch.stack(result_images), f"Lanczos {scale}x (AI model not available)")
 
+    def _resolve_dtype(self, precision: str, device: torch.device) -> torch.dtype:
+        """Requested inference dtype (the cache falls back to fp32 where unsupported)."""
+        if precision == "fp16":
+            return torch.float16
+        if precision == "bf16":
+            return torch.bfloat16
+        if precision == "auto" and device.type == "cuda":
+            return torch.float16
+        return torch.float32
+
     def upscale(self, image, model_name: str = "RealESRGAN_x4plus",
                 tile_size: int = 512, tile_overlap: int = 32,
-                auto_download: bool = True, unload_model: bool = False):
+                auto_download: bool = True, unload_model: bool = False,
+                precision: str = "auto", tile_batch: int = 0,
+                cache_vram_mb: int = 4096, cache_ram_mb: int = 8192,
+                prewarm_models: str = ""):
         """Upscale image using AI model."""
         
-        # Load model if needed
-        if self.model is None or self.current_model_name != model_name:
-            self.model, load_info = self._load_model(model_name)
-            self.current_model_name = model_name
-            
-            if self.model is None:
-                print(f"[FXTD AI Upscale] {load_info}")
-                return self._fallback_upscale(image, model_name)
-
         try:
             from comfy import model_management
             device = model_management.get_torch_device()
-            self.model = self.model.to(device)
-            
-            result_images = []
-            
-            for i in range(image.shape[0]):
-                img = image[i:i+1].permute(0, 3, 1, 2).to(device)
-                
-                with torch.no_grad():
-                    output = self.model(img)
-                
-                output = output.permute(0, 2, 3, 1).cpu()
-                result_images.append(output[0])
-            
-            result = torch.stack(result_images)
-            info = f"Upscaled with {model_name}"
+        except ImportError:
+            device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
+        
+        dtype = self._resolve_dtype(precision, device)
+        UPSCALE_MODEL_CACHE.set_budget(ram_mb=cache_ram_mb, vram_mb=cache_vram_mb)
+        
+        # Load model (or reuse the resident copy)
+        entry, load_info = self._get_cached_model(model_name, dtype, device)
+        if entry is None:
+            print(f"[FXTD AI Upscale] {load_info}")
+            return self._fallback_upscale(image, model_name)
+        
+        # Stage other models for the queue in RAM so switching skips the disk load
+        if prewarm_models.strip():
+            for line in prewarm_upscale_models(prewarm_models.split(","), dtype):
+                print(f"[FXTD AI Upscale] Prewarm: {line}")
+
+        try:
+            dtype = entry.dtype
+            if tile_size <= 0:
+                tile_size = auto_ai_tile_size(device, dtype)
             
-            # Unload model if requested to free VRAM
+            # Tiled inference; halve the tile on OOM until it fits
+            while True:
+                try:
+                    result = ai_upscale_tiled(entry.model, image, tile_size, tile_overlap,
+                                              device=device, dtype=dtype, tile_batch=tile_batch)
+                    break
+                except torch.cuda.OutOfMemoryError:
+                    torch.cuda.empty_cache()
+                    if tile_size <= 128:
+                        raise
+                    tile_size = max(128, tile_size // 2)
+                    tile_batch = 1
+                    print(f"[FXTD AI Upscale] Out of memory, retrying with {tile_size}px tiles")
+            
+            info = f"Upscaled with {model_name} ({tile_size}px tiles, {str(dtype).replace('torch.', '')})\n"
+            info += f"{load_info}; cache: {UPSCALE_MODEL_CACHE.info()}"
+            
+            # Unload model if requested to free VRAM (it stays cached in RAM)
             if unload_model:
-                self.model = None
-                self.current_model_name = None
-                torch.cuda.empty_cache()
+                UPSCALE_MODEL_CACHE.offload(entry.key[0])
                 info += " (model unloaded)"
                 print(f"[FXTD AI Upscale] Model unloaded from VRAM")
             
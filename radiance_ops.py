@@ -0,0 +1,631 @@
+"""
+FXTD Radiance Ops - Shared processing helpers for the Radiance nodes
+Author: FXTD Studios
+
+Building blocks used by more than one node module:
+- Counter-based (Philox4x32-10) random streams keyed by seed, frame and
+  channel, identical on numpy and torch (CPU or CUDA)
+- Gaussian blur engine for any radius (direct / pyramid / FFT), and FFT
+  convolution with arbitrary kernels whose spectra are cached
+- Byte-capped LRU cache of sampling grids and masks, keyed by frame size,
+  device, dtype and effect parameters
+- CPU thread sizing for torch paths that run without CUDA
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+# =============================================================================
+# COUNTER-BASED RNG
+# =============================================================================
+# Every value is a pure function of (seed, stream, frame, channel, index), so
+# frames can be rendered out of order or split across workers and still come
+# out bit-identical. Nothing here touches np.random or torch's global state.
+
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+
+_MASK32 = 0xFFFFFFFF
+
+# Stream ids keep independent consumers of the same seed decorrelated.
+STREAM_GRAIN = 1
+STREAM_GRAIN_PLATE = 2
+STREAM_WEAVE = 3
+STREAM_SHAKE = 4
+STREAM_NOISE = 5
+STREAM_GRAIN_OFFSET = 6
+
+Array = Union[np.ndarray, torch.Tensor]
+
+
+def philox4x32(c0: Array, c1: Array, c2: Array, c3: Array,
+               k0: int, k1: int) -> Tuple[Array, Array, Array, Array]:
+    """
+    Philox4x32-10 block function on 32-bit words.
+
+    Works on numpy uint64 arrays or torch int64 tensors holding values in
+    [0, 2**32); products are exact in 64 bits (torch wraps, and only the
+    masked bits are kept), so both backends give the same words.
+    """
+    is_torch = isinstance(c0, torch.Tensor)
+    const = (lambda v: v) if is_torch else np.uint64
+    m0, m1, mask, shift = const(PHILOX_M0), const(PHILOX_M1), const(_MASK32), const(32)
+
+    for r in range(PHILOX_ROUNDS):
+        if r:
+            k0 = (k0 + PHILOX_W0) & _MASK32
+            k1 = (k1 + PHILOX_W1) & _MASK32
+        p0 = c0 * m0
+        p1 = c2 * m1
+        c0, c1, c2, c3 = (((p1 >> shift) & mask) ^ c1 ^ const(k0),
+                          p1 & mask,
+                          ((p0 >> shift) & mask) ^ c3 ^ const(k1),
+                          p0 & mask)
+    return c0, c1, c2, c3
+
+
+def counter_bits_planes(seed: int, frames, channels, count: int, stream: int = 0,
+                        device: Optional[torch.device] = None) -> Array:
+    """
+    ``count`` random 32-bit words for every (frame, channel) pair in one
+    vectorized pass, shape (len(frames), len(channels), count).
+
+    Plane [i, j] equals counter_bits(seed, frames[i], channels[j], count).
+    Returns numpy uint64 when ``device`` is None, else an int64 tensor.
+    """
+    seed = int(seed)
+    k0 = seed & _MASK32
+    k1 = ((seed >> 32) + int(stream) * PHILOX_W0) & _MASK32
+    blocks = (count + 3) // 4
+    frames = [int(f) & _MASK32 for f in frames]
+    channels = [int(c) & _MASK32 for c in channels]
+
+    if device is None:
+        idx = np.arange(blocks, dtype=np.uint64)[None, None, :]
+        c2 = np.array(frames, dtype=np.uint64)[:, None, None]
+        c3 = np.array(channels, dtype=np.uint64)[None, :, None]
+        words = np.stack(philox4x32(idx & np.uint64(_MASK32), idx >> np.uint64(32), c2, c3, k0, k1),
+                         axis=-1)
+    else:
+        idx = torch.arange(blocks, dtype=torch.int64, device=device)[None, None, :]
+        c2 = torch.tensor(frames, dtype=torch.int64, device=device)[:, None, None]
+        c3 = torch.tensor(channels, dtype=torch.int64, device=device)[None, :, None]
+        words = torch.stack(philox4x32(idx & _MASK32, idx >> 32, c2, c3, k0, k1), dim=-1)
+    return words.reshape(len(frames), len(channels), -1)[..., :count]
+
+
+def counter_bits(seed: int, frame: int, channel: int, count: int, stream: int = 0,
+                 device: Optional[torch.device] = None) -> Array:
+    """
+    ``count`` random 32-bit words for (seed, stream, frame, channel).
+
+    Returns numpy uint64 when ``device`` is None, else an int64 tensor.
+    """
+    return counter_bits_planes(seed, [frame], [channel], count, stream, device)[0, 0]
+
+
+def counter_uniform(seed: int, frame: int, channel: int, shape, stream: int = 0,
+                    device: Optional[torch.device] = None) -> Array:
+    """float32 uniforms in (0, 1) with 24-bit resolution, numpy or torch."""
+    shape = tuple(shape)
+    count = int(np.prod(shape)) if shape else 1
+    bits = counter_bits(seed, frame, channel, count, stream, device)
+    if device is None:
+        u = ((bits >> np.uint64(8)).astype(np.float32) + np.float32(0.5)) * np.float32(2.0 ** -24)
+    else:
+        u = ((bits >> 8).to(torch.float32) + 0.5) * (2.0 ** -24)
+    return u.reshape(shape)
+
+
+def _box_muller_planes(seed: int, frames, channels, shape, stream: int,
+                       device: Optional[torch.device]) -> Array:
+    """
+    float32 normals for every (frame, channel) pair in one vectorized pass.
+
+    The Box-Muller transform runs in float64 before rounding to float32, so
+    both backends agree except for rare last-bit libm differences.
+    """
+    count = int(np.prod(shape)) if shape else 1
+    pairs = (count + 1) // 2
+    bits = counter_bits_planes(seed, frames, channels, pairs * 2, stream, device)
+    out_shape = (len(frames), len(channels)) + shape
+
+    if device is None:
+        u = (bits.astype(np.float64) + 0.5) * 2.0 ** -32
+        radius = np.sqrt(-2.0 * np.log(u[..., 0::2]))
+        angle = (2.0 * math.pi) * u[..., 1::2]
+        z = np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=-1)
+        z = z.reshape(len(frames), len(channels), -1)[..., :count]
+        return z.astype(np.float32).reshape(out_shape)
+
+    u = (bits.to(torch.float64) + 0.5) * 2.0 ** -32
+    radius = torch.sqrt(-2.0 * torch.log(u[..., 0::2]))
+    angle = (2.0 * math.pi) * u[..., 1::2]
+    z = torch.stack([radius * torch.cos(angle), radius * torch.sin(angle)], dim=-1)
+    z = z.reshape(len(frames), len(channels), -1)[..., :count]
+    return z.to(torch.float32).reshape(out_shape)
+
+
+def counter_normal_planes(seed: int, frames, channels, shape, stream: int = 0,
+                          device: Optional[torch.device] = None) -> Array:
+    """
+    float32 standard normals for every (frame, channel) pair, shape
+    (len(frames), len(channels), *shape); plane [i, j] equals
+    counter_normal(seed, frames[i], channels[j], shape).
+
+    On CUDA all planes are generated in one launch. On CPU the transform is
+    memory-bound, so planes are generated one at a time while their float64
+    temporaries still fit in cache.
+    """
+    shape = tuple(shape)
+    if device is not None and device.type == "cuda":
+        return _box_muller_planes(seed, frames, channels, shape, stream, device)
+
+    out_shape = (len(frames), len(channels)) + shape
+    if device is None:
+        out = np.empty(out_shape, dtype=np.float32)
+    else:
+        out = torch.empty(out_shape, dtype=torch.float32, device=device)
+    for i, frame in enumerate(frames):
+        for j, channel in enumerate(channels):
+            out[i, j] = _box_muller_planes(seed, [frame], [channel], shape, stream, device)[0, 0]
+    return out
+
+
+def counter_normal(seed: int, frame: int, channel: int, shape, stream: int = 0,
+                   device: Optional[torch.device] = None) -> Array:
+    """float32 standard normals for (seed, stream, frame, channel), numpy or torch."""
+    return _box_muller_planes(seed, [frame], [channel], tuple(shape), stream, device)[0, 0]
+
+
+# =============================================================================
+# GAUSSIAN BLUR ENGINE
+# =============================================================================
+# One entry point for every blur radius. Small sigmas use a direct separable
+# convolution with an untruncated (3 sigma) kernel, medium sigmas blur a
+# 2x area pyramid level and upsample, and sigmas too large for the frame's
+# pyramid depth multiply by the Gaussian's transfer function in the
+# frequency domain. Everything stays float32. The crossover points come from
+# benchmark_gaussian_blur() on CPU: the pyramid overtakes the direct blur
+# around sigma 6, and stays ahead of the FFT until the frame is too small to
+# reduce far enough.
+
+BLUR_DIRECT_MAX_SIGMA = 6.0
+
+# Sigma (in level pixels) left for the direct blur at the chosen pyramid level
+BLUR_PYRAMID_LEVEL_SIGMA = 3.0
+
+# Above this many level pixels of residual sigma the FFT is cheaper
+BLUR_FFT_MIN_LEVEL_SIGMA = 12.0
+
+BLUR_METHODS = ("auto", "direct", "pyramid", "fft")
+
+
+def _pyramid_levels(sigma: float, h: int, w: int) -> int:
+    """2x reductions used for ``sigma``, capped so the level keeps >= 16 px."""
+    if sigma <= BLUR_PYRAMID_LEVEL_SIGMA:
+        return 0
+    levels = int(math.floor(math.log2(sigma / BLUR_PYRAMID_LEVEL_SIGMA)))
+    return max(0, min(levels, int(math.log2(max(1, min(h, w) // 16)))))
+
+
+def select_blur_method(sigma: float, h: int, w: int) -> str:
+    """Strategy ``gaussian_blur`` uses for ``sigma`` on an h x w plane in auto mode."""
+    if sigma <= BLUR_DIRECT_MAX_SIGMA:
+        return "direct"
+    if sigma / 2 ** _pyramid_levels(sigma, h, w) > BLUR_FFT_MIN_LEVEL_SIGMA:
+        return "fft"
+    return "pyramid"
+
+
+def _reflect_index(n: int, before: int, after: int, device) -> torch.Tensor:
+    """Indices of a mirror (reflect-101) extension of any width."""
+    idx = torch.arange(-before, n + after, device=device)
+    if n == 1:
+        return torch.zeros_like(idx)
+    period = 2 * (n - 1)
+    idx = idx.remainder(period)
+    return torch.where(idx >= n, period - idx, idx)
+
+
+def _pad_2d(x: torch.Tensor, left: int, right: int, top: int, bottom: int,
+            mode: str = "reflect") -> torch.Tensor:
+    """Pad the last two dims. Reflect keeps mirroring when the pad exceeds the size."""
+    h, w = x.shape[-2:]
+    if mode != "reflect" or (max(left, right) < w and max(top, bottom) < h):
+        return F.pad(x, (left, right, top, bottom), mode=mode)
+    if left or right:
+        x = x.index_select(-1, _reflect_index(w, left, right, x.device))
+    if top or bottom:
+        x = x.index_select(-2, _reflect_index(h, top, bottom, x.device))
+    return x
+
+
+def _fft_size(n: int) -> int:
+    """Smallest 5-smooth integer >= n (fast FFT length)."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _blur_direct(x: torch.Tensor, sigma: float, kernel_size: Optional[int] = None,
+                 pad_mode: str = "reflect") -> torch.Tensor:
+    """Separable convolution of an (N, 1, H, W) tensor."""
+    if kernel_size is None:
+        kernel_size = 2 * int(math.ceil(3.0 * sigma)) + 1
+    radius = kernel_size // 2
+    taps = torch.arange(kernel_size, dtype=torch.float64) - radius
+    kernel = torch.exp(-taps ** 2 / (2.0 * sigma ** 2))
+    kernel = kernel / kernel.sum()
+
+    if x.device.type == "cuda":
+        kernel = kernel.to(device=x.device, dtype=x.dtype)
+        x = F.conv2d(_pad_2d(x, radius, radius, 0, 0, pad_mode), kernel.view(1, 1, 1, -1))
+        return F.conv2d(_pad_2d(x, 0, 0, radius, radius, pad_mode), kernel.view(1, 1, -1, 1))
+
+    # conv2d is slow for single-channel planes on CPU; shifted multiply-adds
+    # over contiguous slices are several times faster
+    weights = kernel.tolist()
+    h, w = x.shape[-2:]
+    xp = _pad_2d(x, radius, radius, 0, 0, pad_mode)
+    out = xp[..., 0:w] * weights[0]
+    for i in range(1, kernel_size):
+        out.add_(xp[..., i:i + w], alpha=weights[i])
+    xp = _pad_2d(out, 0, 0, radius, radius, pad_mode)
+    out = xp[..., 0:h, :] * weights[0]
+    for i in range(1, kernel_size):
+        out.add_(xp[..., i:i + h, :], alpha=weights[i])
+    return out
+
+
+def _blur_pyramid(x: torch.Tensor, sigma: float, pad_mode: str = "reflect") -> torch.Tensor:
+    """Blur at a 2^k area-reduced level, then bilinear upsample."""
+    h, w = x.shape[-2:]
+    levels = _pyramid_levels(sigma, h, w)
+    if levels == 0:
+        return _blur_direct(x, sigma, pad_mode=pad_mode)
+
+    # Extend the edges at full resolution (a whole number of level pixels
+    # covering the kernel), so the border mode is honoured exactly instead of
+    # being applied to coarse level pixels
+    scale = 2 ** levels
+    pad = -(-int(math.ceil(3.0 * sigma)) // scale) * scale
+    small = _pad_2d(x, pad, pad, pad, pad, pad_mode)
+    for _ in range(levels):
+        small = _pad_2d(small, 0, small.shape[-1] % 2, 0, small.shape[-2] % 2, "replicate")
+        small = F.avg_pool2d(small, 2)
+
+    # Variance already contributed by the box reductions and the bilinear
+    # upsample, in full-resolution pixels
+    spent = (scale ** 2 - 1) / 3.0 + scale ** 2 / 6.0
+    residual = math.sqrt(max(sigma ** 2 - spent, 0.0)) / scale
+    if residual >= 0.1:
+        small = _blur_direct(small, residual, pad_mode=pad_mode)
+
+    up = F.interpolate(small, size=(small.shape[-2] * scale, small.shape[-1] * scale),
+                       mode="bilinear", align_corners=False)
+    return up[..., pad:pad + h, pad:pad + w]
+
+
+def _blur_fft(x: torch.Tensor, sigma: float, pad_mode: str = "reflect") -> torch.Tensor:
+    """Multiply by the Gaussian transfer function on a padded FFT grid."""
+    h, w = x.shape[-2:]
+    pad = int(math.ceil(3.0 * sigma))
+    fh, fw = _fft_size(h + 2 * pad), _fft_size(w + 2 * pad)
+    xp = _pad_2d(x, pad, fw - w - pad, pad, fh - h - pad, pad_mode)
+
+    fy = torch.fft.fftfreq(fh, device=x.device, dtype=torch.float32)[:, None]
+    fx = torch.fft.rfftfreq(fw, device=x.device, dtype=torch.float32)[None, :]
+    response = torch.exp(-2.0 * (math.pi * sigma) ** 2 * (fy ** 2 + fx ** 2))
+
+    spectrum = torch.fft.rfft2(xp.float()) * response
+    out = torch.fft.irfft2(spectrum, s=(fh, fw))
+    return out[..., pad:pad + h, pad:pad + w].to(x.dtype)
+
+
+def gaussian_blur(tensor: torch.Tensor, sigma: float, method: str = "auto",
+                  kernel_size: Optional[int] = None, pad_mode: str = "reflect") -> torch.Tensor:
+    """
+    Gaussian blur of any radius, on the tensor's device.
+
+    Accepts BHWC (last dim 1, 3 or 4), BCHW, HWC or HW tensors and returns the
+    same layout. ``method`` is one of BLUR_METHODS; an explicit
+    ``kernel_size`` forces a direct convolution of that size.
+    """
+    if sigma < 0.1:
+        return tensor
+
+    channels_last = tensor.dim() >= 3 and tensor.shape[-1] in (1, 3, 4)
+    x = torch.movedim(tensor, -1, -3) if channels_last else tensor
+    lead = x.shape[:-2]
+    x = x.reshape(-1, 1, *x.shape[-2:])
+    if not x.is_floating_point():
+        x = x.float()
+
+    if kernel_size is not None:
+        method = "direct"
+    elif method == "auto":
+        method = select_blur_method(sigma, *x.shape[-2:])
+
+    if method == "fft":
+        out = _blur_fft(x, sigma, pad_mode)
+    elif method == "pyramid":
+        out = _blur_pyramid(x, sigma, pad_mode)
+    else:
+        out = _blur_direct(x, sigma, kernel_size, pad_mode)
+
+    out = out.reshape(*lead, *out.shape[-2:])
+    return torch.movedim(out, -3, -1) if channels_last else out
+
+
+def gaussian_blur_array(img: np.ndarray, sigma: float, method: str = "auto",
+                        device: Optional[torch.device] = None,
+                        pad_mode: str = "reflect") -> np.ndarray:
+    """gaussian_blur for float numpy arrays (HW, HWC or BHWC), float32 out."""
+    tensor = torch.from_numpy(np.ascontiguousarray(img, dtype=np.float32))
+    if device is not None:
+        tensor = tensor.to(device)
+    return gaussian_blur(tensor, sigma, method, pad_mode=pad_mode).cpu().numpy()
+
+
+def fft_convolve(x: torch.Tensor, radius: int, kind: str, params, build_kernel,
+                 pad_mode: str = "constant") -> torch.Tensor:
+    """
+    Convolve the last two dims of ``x`` with a (2 radius + 1)^2 kernel via FFT.
+
+    ``build_kernel()`` returns the kernel; its spectrum on the padded FFT grid
+    is kept in GRID_CACHE under (``kind``, grid size, ``params``), so frames
+    and layers that share a kernel only transform the image.
+    """
+    h, w = x.shape[-2:]
+    fh, fw = _fft_size(h + 2 * radius), _fft_size(w + 2 * radius)
+
+    def build():
+        kernel = build_kernel().to(device=x.device, dtype=torch.float32)
+        padded = F.pad(kernel, (0, fw - kernel.shape[-1], 0, fh - kernel.shape[-2]))
+        return torch.fft.rfft2(torch.roll(padded, (-radius, -radius), dims=(0, 1)))
+
+    spectrum = cached_grid(kind, fh, fw, x.device, torch.float32, (radius,) + tuple(params), build)
+    xp = _pad_2d(x.float(), radius, fw - w - radius, radius, fh - h - radius, pad_mode)
+    out = torch.fft.irfft2(torch.fft.rfft2(xp) * spectrum, s=(fh, fw))
+    return out[..., radius:radius + h, radius:radius + w].to(x.dtype)
+
+
+def benchmark_gaussian_blur(height: int = 1080, width: int = 1920, channels: int = 3,
+                            sigmas=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+                            device: Optional[torch.device] = None,
+                            repeats: int = 3) -> list:
+    """
+    Time each blur strategy across ``sigmas`` on one frame and report the
+    fastest, plus each approximation's max error against the direct blur.
+
+    Returns rows of (sigma, {method: ms}, {method: max_abs_error}, fastest)
+    and prints a table; run ``python radiance_ops.py`` for the CPU numbers
+    BLUR_DIRECT_MAX_SIGMA and BLUR_FFT_MIN_LEVEL_SIGMA are based on.
+    """
+    import time
+
+    device = device or torch.device("cpu")
+    gen = torch.Generator().manual_seed(0)
+    frame = torch.rand(1, height, width, channels, generator=gen).to(device)
+    rows = []
+    print(f"[FXTD Blur] {width}x{height}x{channels} on {device}")
+    print(f"{'sigma':>7} | {'direct ms':>10} {'pyramid ms':>11} {'fft ms':>9} | "
+          f"{'pyr err':>8} {'fft err':>8} | fastest")
+
+    for sigma in sigmas:
+        times, outputs = {}, {}
+        for method in ("direct", "pyramid", "fft"):
+            best = float("inf")
+            for _ in range(repeats):
+                if device.type == "cuda":
+                    torch.cuda.synchronize(device)
+                start = time.perf_counter()
+                outputs[method] = gaussian_blur(frame, sigma, method)
+                if device.type == "cuda":
+                    torch.cuda.synchronize(device)
+                best = min(best, time.perf_counter() - start)
+            times[method] = best * 1000
+        errors = {m: float((outputs[m] - outputs["direct"]).abs().max())
+                  for m in ("pyramid", "fft")}
+        fastest = min(times, key=times.get)
+        auto = select_blur_method(sigma, height, width)
+        rows.append((sigma, times, errors, fastest))
+        print(f"{sigma:>7} | {times['direct']:>10.1f} {times['pyramid']:>11.1f} {times['fft']:>9.1f} | "
+              f"{errors['pyramid']:>8.4f} {errors['fft']:>8.4f} | {fastest:<8} (auto: {auto})")
+    return rows
+
+
+# =============================================================================
+# SAMPLING GRID CACHE
+# =============================================================================
+# Warp grids, radial maps and masks depend only on the frame size and the
+# effect parameters, so re-running a shot at a fixed resolution can reuse
+# them instead of rebuilding meshgrids every call. Entries are keyed by
+# (kind, H, W, device, dtype, params), bounded in bytes and evicted oldest
+# first. Cached tensors are shared: callers must not modify them in place.
+#
+# The cap is a module setting rather than a node input, since the cache is
+# shared by every node: GRID_CACHE_MB sets the size at import, and
+# GRID_CACHE.set_limit(mb) changes it at runtime (0 disables and clears it).
+
+GRID_CACHE_MB = 512
+
+
+def _cached_bytes(value) -> int:
+    """Bytes held by a cached tensor, or by the tensors in a tuple/list."""
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(_cached_bytes(v) for v in value)
+    return 0
+
+
+class SamplingGridCache:
+    """
+    Process-wide LRU of sampling grids and masks, capped at ``max_mb``
+    (0 disables caching).
+    """
+
+    def __init__(self, max_mb: float = GRID_CACHE_MB):
+        self.max_mb = max_mb
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, h: int, w: int, device, dtype, params, build):
+        """Cached value for the key, calling ``build()`` on a miss."""
+        if self.max_mb <= 0:
+            return build()
+        key = (kind, int(h), int(w), str(device), str(dtype), params)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+        value = build()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self._bytes += _cached_bytes(value)
+                self._evict()
+        return value
+
+    def set_limit(self, max_mb: float):
+        """Change the byte cap, evicting down to it."""
+        with self._lock:
+            self.max_mb = max_mb
+            self._evict()
+
+    def _evict(self):
+        limit = self.max_mb * 1024 * 1024
+        while self._entries and (self._bytes > limit or self.max_mb <= 0):
+            _, oldest = self._entries.popitem(last=False)
+            self._bytes -= _cached_bytes(oldest)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+GRID_CACHE = SamplingGridCache()
+
+
+def cached_grid(kind: str, h: int, w: int, device, dtype, params, build):
+    """GRID_CACHE.get(); ``params`` must be hashable."""
+    return GRID_CACHE.get(kind, h, w, device, dtype, params, build)
+
+
+def linspace_grid(h: int, w: int, device=None,
+                  dtype: torch.dtype = torch.float32) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Cached (yy, xx) meshgrid of linspace(-1, 1), each (H, W)."""
+    def build():
+        y = torch.linspace(-1, 1, h, device=device, dtype=dtype)
+        x = torch.linspace(-1, 1, w, device=device, dtype=dtype)
+        return torch.meshgrid(y, x, indexing='ij')
+    return cached_grid("linspace", h, w, device, dtype, (), build)
+
+
+def pixel_centre_axes(h: int, w: int, device=None,
+                      dtype: torch.dtype = torch.float32) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Cached normalised pixel-centre coordinates (ys (H,), xs (W,)), as grid_sample
+    with align_corners=False sees them."""
+    def build():
+        ys = (torch.arange(h, device=device, dtype=dtype) * 2 + 1) / h - 1
+        xs = (torch.arange(w, device=device, dtype=dtype) * 2 + 1) / w - 1
+        return ys, xs
+    return cached_grid("pixel_centre", h, w, device, dtype, (), build)
+
+
+def affine_sampling_grid(theta, h: int, w: int, device=None,
+                         dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """Cached affine_grid (align_corners=False) for one 2x3 ``theta``, shape (1, H, W, 2)."""
+    params = tuple(float(v) for row in theta for v in row)
+
+    def build():
+        matrix = torch.tensor(params, device=device, dtype=dtype).view(1, 2, 3)
+        return F.affine_grid(matrix, (1, 1, h, w), align_corners=False)
+    return cached_grid("affine", h, w, device, dtype, params, build)
+
+
+def transformed_sampling_grid(theta, h: int, w: int, device=None,
+                              dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """
+    affine_sampling_grid for a one-off ``theta``: the cached identity grid
+    mapped through the matrix, with only the identity grid kept in the cache.
+    Use it for per-sample transforms (motion blur taps) that would otherwise
+    fill the cache with grids each used once per call.
+    """
+    base = affine_sampling_grid(((1, 0, 0), (0, 1, 0)), h, w, device, dtype)
+    (a, b, tx), (c, d, ty) = ((float(v) for v in row) for row in theta)
+    offset = torch.tensor((tx, ty), device=device, dtype=dtype)
+    if (a, b, c, d) == (1.0, 0.0, 0.0, 1.0):
+        return base + offset
+    matrix = torch.tensor(((a, c), (b, d)), device=device, dtype=dtype)
+    return torch.matmul(base, matrix).add_(offset)
+
+
+# =============================================================================
+# CPU THREADING
+# =============================================================================
+# torch sizes its intra-op pool from the host's physical cores, which
+# oversubscribes containers limited by affinity or a cgroup CPU quota.
+
+def cpu_thread_count() -> int:
+    """CPUs this process can actually use (OMP_NUM_THREADS, affinity, cgroup quota)."""
+    env = os.environ.get("OMP_NUM_THREADS", "")
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            count = min(count, max(1, int(int(quota) / int(period) + 0.5)))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+@contextmanager
+def torch_cpu_threads(num_threads: int = 0):
+    """Run a block with torch's intra-op thread count set (0 = cpu_thread_count())."""
+    previous = torch.get_num_threads()
+    count = num_threads if num_threads > 0 else cpu_thread_count()
+    if count != previous:
+        torch.set_num_threads(count)
+    try:
+        yield count
+    finally:
+        if count != previous:
+            torch.set_num_threads(previous)
+
+
+if __name__ == "__main__":
+    benchmark_gaussian_blur()
+    benchmark_gaussian_blur(256, 256, sigmas=(8, 16, 32, 64, 128, 256))
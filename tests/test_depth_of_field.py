@@ -0,0 +1,54 @@
+"""Depth of field blurs against their target responses."""
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from radiance.nodes_camera import (FXTDDepthOfField, aperture_kernel, bokeh_blur,
+                                   variable_gaussian_blur)
+
+
+@pytest.mark.parametrize("sigma", [0.3, 1.5, 3.0, 4.5, 9.0, 14.0])
+def test_variable_blur_impulse_sigma(sigma):
+    n = 161
+    impulse = torch.zeros(1, 1, n, n)
+    impulse[..., n // 2, n // 2] = 1
+
+    response = variable_gaussian_blur(impulse, torch.full((1, 1, n, n), sigma))[0, 0].double()
+
+    d = torch.arange(n, dtype=torch.float64) - n // 2
+    mass = response.sum()
+    assert mass.item() == pytest.approx(1.0, abs=1e-4)
+    for profile in (response.sum(0), response.sum(1)):
+        measured = ((profile * d * d).sum() / mass).sqrt().item()
+        assert measured == pytest.approx(sigma, rel=0.02)
+
+
+def test_variable_blur_keeps_constant_image():
+    image = torch.full((1, 3, 90, 120), 0.37)
+    sigma = torch.rand(1, 1, 90, 120, generator=torch.Generator().manual_seed(0)) * 20
+
+    torch.testing.assert_close(variable_gaussian_blur(image, sigma), image, rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("shape", FXTDDepthOfField.BOKEH_SHAPES)
+@pytest.mark.parametrize("coc", [4.0, -8.0, 12.0])
+def test_uniform_bokeh_matches_direct_convolution(shape, coc):
+    image = torch.rand(2, 3, 48, 64, generator=torch.Generator().manual_seed(0))
+
+    result = bokeh_blur(image, torch.full((1, 1, 48, 64), coc), shape)
+
+    # A single in-range layer: the aperture convolution, normalised by the
+    # coverage so the frame edges are not darkened
+    kernel = aperture_kernel(shape, abs(coc))[None, None]
+    pad = kernel.shape[-1] // 2
+    color = F.conv2d(image.reshape(-1, 1, 48, 64), kernel, padding=pad).reshape(image.shape)
+    cover = F.conv2d(torch.ones(1, 1, 48, 64), kernel, padding=pad)
+    torch.testing.assert_close(result, color / cover, rtol=0, atol=1e-5)
+
+
+def test_bokeh_keeps_constant_image():
+    image = torch.full((1, 3, 60, 80), 0.37)
+    coc = (torch.rand(1, 1, 60, 80, generator=torch.Generator().manual_seed(0)) - 0.5) * 40
+
+    torch.testing.assert_close(bokeh_blur(image, coc, "Hexagon"), image, rtol=0, atol=1e-6)
@@ -0,0 +1,43 @@
+"""Error diffusion must match a plain pixel-by-pixel scan."""
+
+import numpy as np
+import pytest
+
+from radiance.nodes_upscale import ERROR_DIFFUSION_KERNELS, error_diffusion_dither
+
+
+def diffuse_serially(img, levels, kernel, strength, serpentine):
+    """Reference: visit every pixel in scan order and push its error forward."""
+    taps, divisor = ERROR_DIFFUSION_KERNELS[kernel]
+    b, h, w, c = img.shape
+    buf = img.astype(np.float32).copy()
+    out = np.empty_like(buf)
+    for f in range(b):
+        for ch in range(c):
+            plane = buf[f, :, :, ch]
+            for y in range(h):
+                reverse = serpentine and y % 2 == 1
+                for x in (range(w - 1, -1, -1) if reverse else range(w)):
+                    v = plane[y, x]
+                    q = np.float32(np.floor(np.clip(v, 0, 1) * levels + 0.5) / levels)
+                    out[f, y, x, ch] = q
+                    err = (v - q) * np.float32(strength)
+                    for dy, dx, wt in taps:
+                        ty, tx = y + dy, x + (-dx if reverse else dx)
+                        if ty < h and 0 <= tx < w:
+                            plane[ty, tx] += err * np.float32(wt / divisor)
+    return out
+
+
+@pytest.mark.parametrize("kernel", sorted(ERROR_DIFFUSION_KERNELS))
+@pytest.mark.parametrize("serpentine", [False, True], ids=["raster", "serpentine"])
+@pytest.mark.parametrize("frames", [2, 11])  # below and above SERPENTINE_VECTOR_LANES
+def test_matches_serial_scan(kernel, serpentine, frames):
+    img = np.random.default_rng(0).random((frames, 9, 17, 3), dtype=np.float32)
+
+    result = error_diffusion_dither(img, 7, kernel, strength=0.9, serpentine=serpentine)
+    expected = diffuse_serially(img, 7, kernel, 0.9, serpentine)
+
+    # Errors reach a pixel in a different order, so allow float rounding; a
+    # wrong tap or scan order would move whole quantisation steps
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-5)
@@ -0,0 +1,49 @@
+"""FXTDProFilmEffects streaming: chunked renders match a single pass."""
+
+import torch
+
+from radiance.nodes_filmgrain import FXTDProFilmEffects, effect_chunk_frames, stream_frame_chunks
+
+
+def _render(image, **kwargs):
+    node = FXTDProFilmEffects()
+    preset = node.INPUT_TYPES()["required"]["master_preset"][0][0]
+    return node.apply_effects(image, preset, 1.0, use_gpu=False, seed=7, **kwargs)
+
+
+def test_tiny_chunks_match_single_chunk():
+    image = torch.rand(5, 96, 128, 3, generator=torch.Generator().manual_seed(0))
+    frames = list(range(10, 15))
+    # 1 MB holds less than one frame of the effect stack: one frame per chunk
+    assert effect_chunk_frames(96, 128, 3, torch.device("cpu"), 1) == 1
+
+    def process(chunk, chunk_frames):
+        # Depends on the sequence frame, so a misrouted chunk shows up
+        return chunk * 0.5 + torch.tensor(chunk_frames, dtype=chunk.dtype).view(-1, 1, 1, 1)
+
+    chunked, chunk = stream_frame_chunks(image, frames, process, torch.device("cpu"), 1)
+    single, _ = stream_frame_chunks(image, frames, process, torch.device("cpu"), 5)
+
+    assert chunk == 1
+    torch.testing.assert_close(chunked, single, rtol=0, atol=0)
+
+
+def test_chunked_render_matches_single_pass():
+    image = torch.rand(5, 96, 128, 3, generator=torch.Generator().manual_seed(0))
+
+    chunked, chunked_info = _render(image, chunk_memory_mb=1)
+    single, single_info = _render(image)
+
+    assert "(1 frames/chunk)" in chunked_info
+    assert "frames/chunk" not in single_info
+    torch.testing.assert_close(chunked, single, rtol=0, atol=0)
+
+
+def test_input_image_is_not_modified():
+    image = torch.rand(2, 32, 40, 3, generator=torch.Generator().manual_seed(1))
+    original = image.clone()
+
+    # No geometry warp, so the effect stack starts from the chunk itself
+    _render(image, weave_enable=False, distortion_enable=False, ca_enable=False)
+
+    torch.testing.assert_close(image, original, rtol=0, atol=0)
@@ -0,0 +1,81 @@
+"""Motion blur engines against direct references."""
+
+import math
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from radiance.nodes_camera import (_doubling_passes, line_box_filter, radial_blur_torch,
+                                   zoom_blur_torch)
+
+
+@pytest.mark.parametrize("length", [1.0, 3.0, 7.3, 20.6])
+@pytest.mark.parametrize("dim", [-1, -2])
+def test_line_box_impulse_response(length, dim):
+    impulse = torch.zeros(1, 1, 1, 101)
+    impulse[..., 50] = 1
+    if dim == -2:
+        impulse = impulse.transpose(-1, -2)
+
+    response = line_box_filter(impulse, length, dim).flatten().double()
+
+    # Each pixel gets the part of the centred window that overlaps it
+    d = torch.arange(101, dtype=torch.float64) - 50
+    overlap = (torch.clamp(d + 0.5, max=length / 2) - torch.clamp(d - 0.5, min=-length / 2))
+    expected = overlap.clamp(min=0) / length
+    torch.testing.assert_close(response, expected, rtol=0, atol=1e-6)
+
+
+def test_line_box_keeps_constant_image():
+    image = torch.full((1, 3, 40, 500), 0.61)
+    for dim in (-1, -2):
+        torch.testing.assert_close(line_box_filter(image, 37.4, dim), image, rtol=0, atol=1e-6)
+
+
+def average_of_taps(img, thetas, weights):
+    """Reference: one border-clamped grid_sample per tap."""
+    b, c, h, w = img.shape
+    out = 0
+    for theta, weight in zip(thetas, weights):
+        grid = F.affine_grid(torch.tensor(theta, dtype=img.dtype).expand(b, 2, 3), (b, c, h, w),
+                             align_corners=False)
+        out = out + weight * F.grid_sample(img, grid, mode='bilinear', padding_mode='border',
+                                           align_corners=False)
+    return out / sum(weights)
+
+
+@pytest.fixture
+def smooth_image():
+    # Smooth content keeps the extra bilinear smoothing of the doubling passes
+    # small, so what is left to compare is the tap geometry and the edges
+    coarse = torch.rand(2, 3, 7, 9, generator=torch.Generator().manual_seed(0))
+    return F.interpolate(coarse, size=(70, 90), mode='bicubic', align_corners=False)
+
+
+def test_radial_blur_matches_taps(smooth_image):
+    amount, cx, cy, samples = 60, 0.1, -0.3, 16
+    taps = 2 ** _doubling_passes(samples)
+    span = amount * 0.02
+    thetas = []
+    for j in range(taps):
+        phi = -span / 2 + j * span / (taps - 1)
+        cos_r, sin_r = math.cos(phi), math.sin(phi)
+        thetas.append(((cos_r, -sin_r, cx * (1 - cos_r) + cy * sin_r),
+                       (sin_r, cos_r, cy * (1 - cos_r) - cx * sin_r)))
+
+    expected = average_of_taps(smooth_image, thetas, [1.0] * taps)
+    torch.testing.assert_close(radial_blur_torch(smooth_image, amount, cx, cy, samples),
+                               expected, rtol=0, atol=0.02)
+
+
+def test_zoom_blur_matches_taps(smooth_image):
+    amount, cx, cy, samples = 60, 0.1, -0.3, 16
+    taps = 2 ** _doubling_passes(samples)
+    low, high = 1.0 - amount * 0.005, 1.0 + amount * 0.005
+    scales = [low * (high / low) ** (j / (taps - 1)) for j in range(taps)]
+    thetas = [((s, 0, cx * (1 - s)), (0, s, cy * (1 - s))) for s in scales]
+
+    expected = average_of_taps(smooth_image, thetas, scales)
+    torch.testing.assert_close(zoom_blur_torch(smooth_image, amount, cx, cy, samples),
+                               expected, rtol=0, atol=0.02)
@@ -0,0 +1,41 @@
+"""A composed warp field must match applying its stages one after another."""
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from radiance.nodes_camera import (affine_warp, apply_composed_warp, gain_stage,
+                                   pixel_centre_coords)
+
+
+def apply_sequentially(img, stages):
+    """Reference: one grid_sample (or mask multiply) per stage."""
+    b, h, w, c = img.shape
+    x, y = pixel_centre_coords(h, w, img.device, img.dtype)
+    out = img
+    for kind, fn, padding in stages:
+        if kind == "gain":
+            out = out * fn(x, y).permute(0, 2, 3, 1)
+            continue
+        gx, gy = torch.broadcast_tensors(*fn(x.clone(), y.clone(), slice(None)))
+        grid = torch.stack([gx, gy], dim=-1)[:, 0].expand(b, -1, -1, -1)
+        out = F.grid_sample(out.permute(0, 3, 1, 2), grid, mode='bilinear',
+                            padding_mode=padding, align_corners=False).permute(0, 2, 3, 1)
+    return out
+
+
+def vignette(x, y):
+    return (1 - 0.4 * (x * x + y * y)).clamp(min=0)
+
+
+@pytest.mark.parametrize("padding", ["border", "reflection"])
+def test_gain_sees_clamp_of_following_warp(padding):
+    b, h, w = 2, 40, 48
+    img = torch.rand(b, h, w, 3, generator=torch.Generator().manual_seed(0))
+    # Whole-pixel shifts keep every bilinear tap on a pixel centre, so both
+    # paths are exact and the edge handling is all that can differ
+    shift = torch.tensor([[1.0, 0.0, 2 * 11 / w], [0.0, 1.0, -2 * 7 / h]], dtype=torch.float64)
+    stages = [gain_stage(vignette), affine_warp(shift.expand(b, 2, 3), padding)]
+
+    torch.testing.assert_close(apply_composed_warp(img, stages),
+                               apply_sequentially(img, stages), rtol=0, atol=1e-5)